@@ -0,0 +1,92 @@
+"""ヘッドレス一括ステータス取得(batch.py)の所要時間を計測する
+
+使い方:
+    python benchmarks/bench_batch_status.py [--repos 50] [--jobs 4]
+
+一時ディレクトリに repos 個のリポジトリ(一部は変更あり・1つは壊れたもの)を作り、
+run_batch_status で最初の結果が出るまでの時間と全体の時間を計測する。
+あわせて次を確認する(満たさなければ失敗する)。
+    - import batch で PySide6 が読み込まれない
+    - 壊れたリポジトリがあっても、他のリポジトリの結果がすべて出力される
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+
+def _check_no_qt():
+    """import batch で PySide6 が読み込まれないこと"""
+    code = "import batch, sys; assert 'PySide6' not in sys.modules, 'PySide6 loaded'"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=SRC_DIR)
+
+
+def _make_repos(root: str, count: int):
+    """count 個のリポジトリと、壊れたリポジトリ(.git が空のファイル)を作成"""
+    for i in range(count):
+        path = os.path.join(root, f"group{i % 5}", f"repo{i}")
+        os.makedirs(path)
+        subprocess.run(["git", "init", "-q", path], check=True)
+        Path(path, "README").write_text(f"{i}\n")
+        if i % 3 == 0:
+            Path(path, "new.txt").write_text("new\n")
+    broken = os.path.join(root, "broken")
+    os.makedirs(broken)
+    Path(broken, ".git").write_text("")
+
+
+class _TimedWriter:
+    """書き込まれた行と、最初の行が書き込まれた時刻を記録する"""
+
+    def __init__(self):
+        self.lines = []
+        self.first_at = None
+
+    def write(self, text: str):
+        if self.first_at is None:
+            self.first_at = time.perf_counter()
+        self.lines.append(text)
+
+    def flush(self):
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repos", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    _check_no_qt()
+    print("import batch: PySide6 は読み込まれていません")
+
+    from core.batch_status import run_batch_status
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_repos(tmp, args.repos)
+        out = _TimedWriter()
+        start = time.perf_counter()
+        failures = run_batch_status(tmp, out, jobs=args.jobs)
+        elapsed = time.perf_counter() - start
+
+    results = [json.loads(line) for line in out.lines]
+    assert len(results) == args.repos + 1, f"{len(results)} 件しか出力されていません"
+    assert failures == 1, f"失敗が {failures} 件です(壊れたリポジトリのみのはず)"
+    print(f"{'repos':>8}{'first':>10}{'total':>10}{'failures':>10}")
+    print(
+        f"{len(results):>8}{(out.first_at - start) * 1000:>8.0f}ms"
+        f"{elapsed * 1000:>8.0f}ms{failures:>10}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""ローカルのベアリポジトリをリモートにして、バックグラウンドのfetchを検証・計測する
+
+使い方:
+    python benchmarks/bench_fetch.py [--runs 10]
+
+一時ディレクトリにベアリポジトリ(remote.git)と2つのクローンを作る。
+    work  : LeafGitで開く側。ローカルで1コミットする(ahead 1)
+    other : 別の開発者の代わり。2コミットしてプッシュする(behind 2)
+work に対して fetch_and_compare を実行し、ahead/behind が期待通りか確認する
+(満たさなければ失敗する)。リモートの無いリポジトリでは None になることも確認し、
+最後に fetch_and_compare を runs 回実行した時間を表示する。
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+_GIT_ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME="bench",
+    GIT_AUTHOR_EMAIL="bench@example.com",
+    GIT_COMMITTER_NAME="bench",
+    GIT_COMMITTER_EMAIL="bench@example.com",
+)
+
+
+def _git(*args: str):
+    subprocess.run(["git", *args], check=True, env=_GIT_ENV, capture_output=True)
+
+
+def _commit(path: str, name: str):
+    """ファイルを1つ追加してコミット"""
+    Path(path, name).write_text(f"{name}\n")
+    _git("-C", path, "add", name)
+    _git("-C", path, "commit", "-qm", name)
+
+
+def _make_repos(root: str):
+    """ベアリポジトリと、それをリモートにした2つのクローンを作成"""
+    remote = os.path.join(root, "remote.git")
+    work = os.path.join(root, "work")
+    other = os.path.join(root, "other")
+    _git("init", "-q", "--bare", "-b", "main", remote)
+    _git("clone", "-q", remote, other)
+    _git("-C", other, "checkout", "-q", "-b", "main")
+    _commit(other, "initial")
+    _git("-C", other, "push", "-q", "-u", "origin", "main")
+    _git("clone", "-q", remote, work)
+
+    _commit(work, "local")
+    for name in ("remote1", "remote2"):
+        _commit(other, name)
+    _git("-C", other, "push", "-q")
+    return work
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    from core.fetch_scheduler import fetch_and_compare
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = _make_repos(tmp)
+        status = fetch_and_compare(work)
+        assert status is not None, "リモートが見つかりません"
+        assert status["remote"] == "origin", status
+        assert (status["ahead"], status["behind"]) == (1, 2), status
+        print(f"ahead/behind: {status['ahead']}/{status['behind']} (期待通り)")
+
+        standalone = os.path.join(tmp, "standalone")
+        _git("init", "-q", standalone)
+        assert fetch_and_compare(standalone) is None, "リモートが無いのに結果があります"
+
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            fetch_and_compare(work)
+            times.append(time.perf_counter() - start)
+    print(
+        f"fetch_and_compare: 中央値 {statistics.median(times) * 1000:.0f}ms"
+        f" / 最大 {max(times) * 1000:.0f}ms ({args.runs}回)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
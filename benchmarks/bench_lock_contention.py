@@ -0,0 +1,128 @@
+"""LeafGitの読み取りとターミナルのgitが index.lock を奪い合う回数を計測する
+
+使い方:
+    python benchmarks/bench_lock_contention.py [--files 2000] [--seconds 10]
+
+一時リポジトリに対して、次の2つを同時にループで実行する。
+    LeafGit : ワーカースレッドでステータスを読み取る(バックグラウンドの再検証と同じ処理)
+    CLI     : ファイルの更新時刻を変えて git add / git reset する(ターミナルの操作の代わり)
+CLI側が "Unable to create index.lock" で失敗した回数を数える。
+optional-locks は読み取りがインデックスを書き換えていた従来の動作、
+no-optional-locks は現在の動作(GIT_OPTIONAL_LOCKS=0)、
++idle-refresh はそれに加えてアイドル時のインデックスの更新も繰り返した場合
+(CLIが使い続けているので、通常は更新を見送る)。
++forced-refresh は見送りの判定を外して更新した場合で、更新は index.lock を
+短時間持つため、CLI側の失敗がいくらか出る。
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+_GIT_ENV = dict(
+    os.environ,
+    GIT_AUTHOR_NAME="bench",
+    GIT_AUTHOR_EMAIL="bench@example.com",
+    GIT_COMMITTER_NAME="bench",
+    GIT_COMMITTER_EMAIL="bench@example.com",
+)
+
+
+def _make_repo(path: str, file_count: int):
+    """file_count 個のファイルをコミットしたリポジトリを作成"""
+    subprocess.run(["git", "init", "-q", path], check=True, env=_GIT_ENV)
+    for i in range(file_count):
+        Path(path, f"file{i}.txt").write_text(f"{i}\n")
+    subprocess.run(["git", "-C", path, "add", "."], check=True, env=_GIT_ENV)
+    subprocess.run(
+        ["git", "-C", path, "commit", "-qm", "init"], check=True, env=_GIT_ENV
+    )
+
+
+def _reader(repo_path: str, stop: threading.Event, refresh: str, stats: dict):
+    from core.git_operations import GitOperations
+    from core.index_refresher import refresh_index_if_needed
+
+    while not stop.is_set():
+        with GitOperations.open_repository(repo_path) as git_ops:
+            try:
+                git_ops.read_changed_files()
+            except Exception:
+                stats["reader_errors"] += 1
+        stats["reads"] += 1
+        if refresh and stats["reads"] % 5 == 0:
+            kwargs = {"quiet_seconds": 0} if refresh == "forced" else {}
+            result = refresh_index_if_needed(repo_path, [], **kwargs)
+            if result is not None:
+                stats["refreshes"] += 1
+
+
+def _cli(repo_path: str, file_count: int, seconds: float, stats: dict):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        path = os.path.join(repo_path, f"file{random.randrange(file_count)}.txt")
+        # 内容は同じまま更新時刻だけ変え、status にインデックスを書き換えさせる
+        os.utime(path)
+        for args in (["add", path], ["reset", "-q", "--", path]):
+            proc = subprocess.run(
+                ["git", "-C", repo_path, *args],
+                capture_output=True,
+                text=True,
+                env=_GIT_ENV,
+            )
+            stats["cli"] += 1
+            if proc.returncode != 0 and "index.lock" in proc.stderr:
+                stats["lock_failures"] += 1
+
+
+def _run(repo_path: str, args, optional_locks: bool, refresh: str) -> dict:
+    from core import git_process
+
+    git_process.READ_ENV["GIT_OPTIONAL_LOCKS"] = "1" if optional_locks else "0"
+    stats = dict(reads=0, reader_errors=0, refreshes=0, cli=0, lock_failures=0)
+    stop = threading.Event()
+    reader = threading.Thread(target=_reader, args=(repo_path, stop, refresh, stats))
+    reader.start()
+    try:
+        _cli(repo_path, args.files, args.seconds, stats)
+    finally:
+        stop.set()
+        reader.join()
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':<34}{'読み取り':>8}{'CLI':>8}{'lock失敗':>10}{'更新':>6}")
+    modes = [
+        ("optional-locks", True, ""),
+        ("no-optional-locks", False, ""),
+        ("no-optional-locks+idle-refresh", False, "idle"),
+        ("no-optional-locks+forced-refresh", False, "forced"),
+    ]
+    for name, optional_locks, refresh in modes:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo_path = os.path.join(tmp, "repo")
+            _make_repo(repo_path, args.files)
+            stats = _run(repo_path, args, optional_locks, refresh)
+        print(
+            f"{name:<34}{stats['reads']:>10}{stats['cli']:>8}"
+            f"{stats['lock_failures']:>12}{stats['refreshes']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""リポジトリを繰り返し開閉し、メモリと子プロセス数が増えないことを確認する
+
+使い方:
+    python benchmarks/bench_repo_lifecycle.py [REPO_PATH] [--iterations 1000]
+
+REPO_PATH を省略した場合は一時リポジトリを作成する。
+RSSまたは子プロセス数が許容値を超えて増えた場合は終了コード1を返す。
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.git_operations import GitOperations  # noqa: E402
+
+
+def _rss_kb() -> int:
+    """現在のRSS(KB)を取得"""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        pass
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _child_count() -> int:
+    """このプロセスの子プロセス数を取得"""
+    try:
+        import psutil
+
+        return len(psutil.Process().children(recursive=True))
+    except ImportError:
+        pass
+    pid = str(os.getpid())
+    count = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[1] == pid:
+            count += 1
+    return count
+
+
+def _make_repo(path: str):
+    """テスト用のリポジトリを作成"""
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="bench",
+        GIT_AUTHOR_EMAIL="bench@example.com",
+        GIT_COMMITTER_NAME="bench",
+        GIT_COMMITTER_EMAIL="bench@example.com",
+    )
+    subprocess.run(["git", "init", "-q", path], check=True, env=env)
+    for i in range(50):
+        Path(path, f"file{i}.txt").write_text(f"{i}\n" * 100)
+    subprocess.run(["git", "-C", path, "add", "."], check=True, env=env)
+    subprocess.run(["git", "-C", path, "commit", "-qm", "init"], check=True, env=env)
+    Path(path, "file0.txt").write_text("changed\n")
+
+
+def _cycle(repo_path: str):
+    """1回分の open -> 読み取り -> close"""
+    with GitOperations.open_repository(repo_path) as git_ops:
+        git_ops.get_changed_files()
+        git_ops.get_current_branch()
+        # cat-file の常駐プロセスを起動させる
+        git_ops.repo.head.commit.tree
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("repo", nargs="?", help="対象リポジトリ")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument(
+        "--max-rss-growth-kb", type=int, default=8 * 1024, help="許容するRSS増加量"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo_path = args.repo
+        if repo_path is None:
+            repo_path = os.path.join(tmp, "repo")
+            _make_repo(repo_path)
+
+        # ウォームアップ(インポートや初回キャッシュの影響を除く)
+        for _ in range(20):
+            _cycle(repo_path)
+        gc.collect()
+        base_rss = _rss_kb()
+        base_children = _child_count()
+
+        for i in range(args.iterations):
+            _cycle(repo_path)
+            if (i + 1) % 100 == 0:
+                print(
+                    f"{i + 1:>6} 回: RSS {_rss_kb() - base_rss:+} KB, "
+                    f"子プロセス {_child_count()}"
+                )
+
+        gc.collect()
+        rss_growth = _rss_kb() - base_rss
+        children = _child_count()
+
+    print(f"RSS増加: {rss_growth} KB / 子プロセス: {base_children} -> {children}")
+    if rss_growth > args.max_rss_growth_kb or children > base_children:
+        print("NG: リソースが解放されていません")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""ビルド形式ごとのバイナリサイズと起動時間を計測する
+
+使い方:
+    python benchmarks/bench_startup.py --build          # onefile/onedir をビルドして計測
+    python benchmarks/bench_startup.py --runs 10 --json result.json
+
+計測項目:
+    size          : onefileは実行ファイル、onedirはディレクトリ全体のサイズ
+    to_main       : プロセス起動から main.py の実行開始まで
+                    (onefileでは一時ディレクトリへの展開時間を含む)
+    unpack        : onefile と onedir の to_main の差(展開にかかった時間の推定値)
+    to_window     : プロセス起動から最初のウィンドウ表示まで
+
+ビルド済みのバイナリは dist/<mode>/ に置く。source は python src/main.py の計測。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DIST_DIR = PROJECT_DIR / "dist"
+BUILD_DIR = PROJECT_DIR / "build"
+MODES = ["onefile", "onedir"]
+EXE_NAME = "leafgit.exe" if sys.platform == "win32" else "leafgit"
+
+
+def build(mode: str):
+    """指定した形式でビルド"""
+    env = dict(os.environ, LEAFGIT_BUILD_MODE=mode)
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "PyInstaller",
+            str(PROJECT_DIR / "leafgit.spec"),
+            "--noconfirm",
+            "--distpath",
+            str(DIST_DIR / mode),
+            "--workpath",
+            str(BUILD_DIR / mode),
+        ],
+        check=True,
+        env=env,
+        cwd=PROJECT_DIR,
+    )
+
+
+def command_for(mode: str):
+    """計測対象を起動するコマンドとサイズ計測対象のパス"""
+    if mode == "source":
+        return [sys.executable, str(PROJECT_DIR / "src" / "main.py")], None
+    if mode == "onefile":
+        target = DIST_DIR / mode / EXE_NAME
+        return [str(target)], target
+    target = DIST_DIR / mode / "leafgit"
+    return [str(target / EXE_NAME)], target
+
+
+def measure_size(path: Path) -> int:
+    """ファイルまたはディレクトリのサイズ(バイト)"""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def run_once(command, timeout: float) -> dict:
+    """1回起動して各区間の時間(秒)を取得"""
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = Path(tmp) / "probe.json"
+        env = dict(
+            os.environ,
+            LEAFGIT_STARTUP_PROBE=str(probe),
+            LEAFGIT_DATA_DIR=tmp,
+            QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+        )
+        spawned = time.time()
+        subprocess.run(command, env=env, timeout=timeout, check=True)
+        exited = time.time()
+        data = json.loads(probe.read_text(encoding="utf-8"))
+
+    return {
+        "to_main": data["main_started"] - spawned,
+        "imports": data["imports_done"] - data["main_started"],
+        "to_window": data["window_shown"] - spawned,
+        "total": exited - spawned,
+    }
+
+
+def summarize(samples):
+    """各区間の中央値"""
+    return {
+        key: statistics.median(sample[key] for sample in samples) for key in samples[0]
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--build", action="store_true", help="計測前にビルドする")
+    parser.add_argument("--runs", type=int, default=5, help="各形式の起動回数")
+    parser.add_argument(
+        "--modes", nargs="+", default=MODES + ["source"], help="計測する形式"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        if args.build and mode in MODES:
+            build(mode)
+        command, target = command_for(mode)
+        if target is not None and not target.exists():
+            print(f"{mode}: {target} がありません(--build でビルドしてください)")
+            continue
+
+        # 初回はOSのファイルキャッシュの影響が大きいため除外する
+        run_once(command, args.timeout)
+        samples = [run_once(command, args.timeout) for _ in range(args.runs)]
+        result = summarize(samples)
+        result["size"] = measure_size(target) if target is not None else None
+        results[mode] = result
+
+    if "onefile" in results and "onedir" in results:
+        results["onefile"]["unpack"] = (
+            results["onefile"]["to_main"] - results["onedir"]["to_main"]
+        )
+
+    print(f"{'mode':<8} {'size(MB)':>9} {'to_main':>8} {'unpack':>8} {'window':>8}")
+    for mode, result in results.items():
+        size = f"{result['size'] / 1024 / 1024:.1f}" if result["size"] else "-"
+        unpack = f"{result['unpack']:.3f}" if "unpack" in result else "-"
+        print(
+            f"{mode:<8} {size:>9} {result['to_main']:>8.3f} {unpack:>8} "
+            f"{result['to_window']:>8.3f}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
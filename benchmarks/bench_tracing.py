@@ -0,0 +1,67 @@
+"""トレースを記録していない時・記録している時の計測処理の負荷を計測する
+
+使い方:
+    python benchmarks/bench_tracing.py [--count 200000]
+
+metrics.timed で囲んだ空の処理、tracing.span、シグナルの送出を count 回
+実行し、1回あたりの時間を記録なし/記録ありで比較する。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+def _per_call(fn, count: int) -> float:
+    """fn を count 回呼んだ時の1回あたりの時間(ナノ秒)"""
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+
+    from PySide6.QtCore import QObject, Signal
+
+    from utils import metrics, tracing
+
+    class Emitter(QObject):
+        changed = Signal(object)
+
+    emitter = Emitter()
+    tracing.watch_signals(emitter, "Emitter")
+
+    @metrics.timed("bench.timed")
+    def timed_call():
+        pass
+
+    def span_call():
+        with tracing.span("bench.span", "bench"):
+            pass
+
+    def emit_call():
+        emitter.changed.emit(None)
+
+    cases = [("timed", timed_call), ("span", span_call), ("emit", emit_call)]
+    print(f"{'':<8}{'off':>10}{'on':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in cases:
+            off = _per_call(fn, args.count)
+            tracing.start()
+            on = _per_call(fn, args.count)
+            tracing.stop(os.path.join(tmp, "trace.json"))
+            print(f"{name:<8}{off:>8.0f}ns{on:>8.0f}ns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
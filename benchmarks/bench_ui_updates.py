@@ -0,0 +1,196 @@
+"""大量の操作結果・状態変化が届いた時にGUIスレッドが占有される時間を計測する
+
+使い方:
+    python benchmarks/bench_ui_updates.py [--count 10000] [--files 2000]
+
+一時リポジトリを開いたメインウィンドウ(画面には表示しない)に対して、
+    history : command_executed を count 回
+    status  : 別々のファイルを1つずつステージする status_changed を count 回
+    worker  : ワーカースレッドから command_executed を count 回
+送り、すべて画面に反映されるまでGUIスレッドが処理していた時間を計測する。
+throttled は1フレームごとにまとめて反映する現在の動作、unthrottled は
+1件ごとに反映した場合(従来の動作)。status では、最後に表示されている
+ファイルの状態が両者で一致することも確認する(一致しなければ失敗する)。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _make_repo(path: str, file_count: int):
+    """未追跡ファイルを file_count 個持つリポジトリを作成"""
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="bench",
+        GIT_AUTHOR_EMAIL="bench@example.com",
+        GIT_COMMITTER_NAME="bench",
+        GIT_COMMITTER_EMAIL="bench@example.com",
+    )
+    subprocess.run(["git", "init", "-q", path], check=True, env=env)
+    Path(path, "README").write_text("bench\n")
+    subprocess.run(["git", "-C", path, "add", "."], check=True, env=env)
+    subprocess.run(["git", "-C", path, "commit", "-qm", "init"], check=True, env=env)
+    for i in range(file_count):
+        Path(path, f"file{i}.txt").write_text(f"{i}\n")
+
+
+class Scenario:
+    """1回分の計測(反映回数を数え、すべて反映されるまで待つ)"""
+
+    def __init__(self, app, window, throttled: bool):
+        self.app = app
+        self.window = window
+        self.throttled = throttled
+        self.flushes = 0
+        window._throttler.history_ready.connect(self._count)
+        window._throttler.status_ready.connect(self._count)
+        window._throttler.rebuild_requested.connect(self._count)
+
+    def _count(self, *args):
+        self.flushes += 1
+
+    def deliver(self, emit):
+        """emit() で1件送る(unthrottled では即座に反映する)"""
+        emit()
+        if not self.throttled:
+            self.window._throttler.flush()
+
+    def wait_idle(self, done=lambda: True):
+        """すべて届いて反映されるまでイベントを処理"""
+        while not done() or self.window._throttler.has_pending:
+            self.app.processEvents()
+
+
+def _bench_history(scenario, controller, count: int) -> float:
+    from models import CommandResult
+
+    start = time.perf_counter()
+    for i in range(count):
+        result = CommandResult(True, f"git add file{i}.txt", "ファイルをステージ")
+        scenario.deliver(lambda: controller.command_executed.emit(result))
+    scenario.wait_idle()
+    return time.perf_counter() - start
+
+
+def _bench_status(scenario, controller, count: int) -> float:
+    """
+    別々のパスをステージする差分を送る
+
+    同じパスのステージとアンステージはまとめる時に打ち消し合うため使わない。
+    大きな差分では一覧をコントローラのスナップショットから作り直すので、
+    (再検証はせずに)スナップショットにも同じ差分を適用しておく
+    """
+    from models.status import StatusDelta
+
+    status = controller.git._status
+    start = time.perf_counter()
+    for i in range(count):
+        path = f"file{i}.txt"
+        delta = StatusDelta({"staged": [path]}, {"untracked": [path]}, True)
+        status.apply(delta)
+        scenario.deliver(lambda: controller.status_changed.emit(delta))
+    scenario.wait_idle()
+    return time.perf_counter() - start
+
+
+def _displayed_status(window) -> tuple:
+    """変更一覧とファイルツリーに表示されている状態"""
+    lists = tuple(
+        sorted(widget.item(row).text() for row in range(widget.count()))
+        for widget in (window.staged_list, window.unstaged_list)
+    )
+    tree = sorted(
+        (node.path, tuple(node.statuses))
+        for node in window.file_tree_model._root.iter_files()
+    )
+    return lists, tree
+
+
+def _bench_worker(scenario, controller, count: int) -> float:
+    """ワーカースレッドから届く結果(GUIスレッドの処理時間だけを数える)"""
+    from models import CommandResult
+
+    received = []
+    if not scenario.throttled:
+        # 届くたびに反映する
+        controller.command_executed.connect(
+            lambda result: scenario.window._throttler.flush()
+        )
+    controller.command_executed.connect(received.append)
+
+    def produce():
+        for i in range(count):
+            controller.command_executed.emit(
+                CommandResult(True, f"git fetch #{i}", "バックグラウンドでフェッチ")
+            )
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    thread.join()
+
+    start = time.perf_counter()
+    scenario.wait_idle(lambda: len(received) >= count)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--files", type=int, default=2000)
+    args = parser.parse_args()
+    # status では count 個の別々のファイルをステージする
+    args.files = max(args.files, args.count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LEAFGIT_DATA_DIR"] = os.path.join(tmp, "data")
+        repo_path = os.path.join(tmp, "repo")
+        _make_repo(repo_path, args.files)
+
+        from PySide6.QtWidgets import QApplication
+
+        app = QApplication([])
+        from core import AppController
+        from ui import MainWindow
+
+        print(f"{'':<8}{'mode':<14}{'GUI busy':>10}{'反映回数':>10}")
+        displayed = {}
+        for name in ("history", "status", "worker"):
+            for throttled in (True, False):
+                controller = AppController()
+                window = MainWindow(controller)
+                window.show()
+                controller.git.open_repository(repo_path)
+                controller.git.fetch_scheduler.stop()
+                scenario = Scenario(app, window, throttled)
+                scenario.wait_idle()
+                scenario.flushes = 0
+
+                if name == "history":
+                    elapsed = _bench_history(scenario, controller, args.count)
+                elif name == "status":
+                    elapsed = _bench_status(scenario, controller, args.count)
+                    displayed[throttled] = _displayed_status(window)
+                else:
+                    elapsed = _bench_worker(scenario, controller, args.count)
+
+                mode = "throttled" if throttled else "unthrottled"
+                print(f"{name:<8}{mode:<14}{elapsed:>9.3f}s{scenario.flushes:>10}")
+                controller.git.close_repository()
+                window.close()
+                window.deleteLater()
+                app.processEvents()
+    assert displayed[True] == displayed[False], "status の最終的な表示が一致しません"
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
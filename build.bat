@@ -31,9 +31,13 @@ echo 既存のビルド成果物をクリーンアップ中...
 if exist "build" rmdir /s /q "build"
 if exist "dist" rmdir /s /q "dist"
 
+REM ビルド形式: build.bat --onedir でディレクトリ形式(起動が速い)
+set LEAFGIT_BUILD_MODE=onefile
+if "%~1"=="--onedir" set LEAFGIT_BUILD_MODE=onedir
+
 REM PyInstallerでビルド
 echo.
-echo ビルド中...
+echo ビルド中... (形式: %LEAFGIT_BUILD_MODE%)
 pyinstaller leafgit.spec
 
 echo.
@@ -9,6 +9,12 @@ BUILD_DIR="$PROJECT_DIR/build"
 DIST_DIR="$PROJECT_DIR/dist"
 SPEC_FILE="$PROJECT_DIR/leafgit.spec"
 
+# ビルド形式: ./build.sh --onedir でディレクトリ形式(起動が速い)
+export LEAFGIT_BUILD_MODE="onefile"
+if [ "$1" = "--onedir" ]; then
+    export LEAFGIT_BUILD_MODE="onedir"
+fi
+
 echo "================================"
 echo "LeafGit バイナリビルドスクリプト"
 echo "================================"
@@ -35,7 +41,7 @@ rm -rf "$BUILD_DIR" "$DIST_DIR" "build" "*.pyc"
 
 # PyInstallerでビルド
 echo ""
-echo "ビルド中..."
+echo "ビルド中... (形式: $LEAFGIT_BUILD_MODE)"
 pyinstaller "$SPEC_FILE" --distpath "$DIST_DIR" --workpath "$BUILD_DIR"
 
 echo ""
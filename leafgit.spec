@@ -1,4 +1,128 @@
 # -*- mode: python ; coding: utf-8 -*-
+#
+# ビルドモードは環境変数 LEAFGIT_BUILD_MODE で切り替える
+#   onefile (既定): 単一の実行ファイル。起動のたびに一時ディレクトリへ展開される
+#   onedir        : ディレクトリ形式。展開が不要なため起動が速い
+import os
+
+BUILD_MODE = os.environ.get('LEAFGIT_BUILD_MODE', 'onefile')
+ONEFILE = BUILD_MODE != 'onedir'
+
+# src で使っていないQtモジュール(QtCore/QtGui/QtWidgets 以外)
+QT_EXCLUDES = [
+    'PySide6.Qt3DAnimation',
+    'PySide6.Qt3DCore',
+    'PySide6.Qt3DExtras',
+    'PySide6.Qt3DInput',
+    'PySide6.Qt3DLogic',
+    'PySide6.Qt3DRender',
+    'PySide6.QtBluetooth',
+    'PySide6.QtCharts',
+    'PySide6.QtConcurrent',
+    'PySide6.QtDataVisualization',
+    'PySide6.QtDesigner',
+    'PySide6.QtGraphs',
+    'PySide6.QtHelp',
+    'PySide6.QtHttpServer',
+    'PySide6.QtLocation',
+    'PySide6.QtMultimedia',
+    'PySide6.QtMultimediaWidgets',
+    'PySide6.QtNetwork',
+    'PySide6.QtNetworkAuth',
+    'PySide6.QtNfc',
+    'PySide6.QtOpenGL',
+    'PySide6.QtOpenGLWidgets',
+    'PySide6.QtPdf',
+    'PySide6.QtPdfWidgets',
+    'PySide6.QtPositioning',
+    'PySide6.QtPrintSupport',
+    'PySide6.QtQml',
+    'PySide6.QtQuick',
+    'PySide6.QtQuick3D',
+    'PySide6.QtQuickControls2',
+    'PySide6.QtQuickWidgets',
+    'PySide6.QtRemoteObjects',
+    'PySide6.QtScxml',
+    'PySide6.QtSensors',
+    'PySide6.QtSerialBus',
+    'PySide6.QtSerialPort',
+    'PySide6.QtSpatialAudio',
+    'PySide6.QtSql',
+    'PySide6.QtStateMachine',
+    'PySide6.QtSvg',
+    'PySide6.QtSvgWidgets',
+    'PySide6.QtTest',
+    'PySide6.QtTextToSpeech',
+    'PySide6.QtUiTools',
+    'PySide6.QtWebChannel',
+    'PySide6.QtWebEngineCore',
+    'PySide6.QtWebEngineQuick',
+    'PySide6.QtWebEngineWidgets',
+    'PySide6.QtWebSockets',
+    'PySide6.QtXml',
+]
+
+# 使わない標準ライブラリ・依存パッケージ
+PY_EXCLUDES = [
+    'tkinter',
+    'unittest',
+    'pydoc',
+    'github',
+    'cryptography',
+]
+
+# 同梱しないQtプラグイン・データ(パスの一部で判定)
+QT_DATA_EXCLUDES = [
+    'translations',
+    'qml',
+    'plugins/multimedia',
+    'plugins/sqldrivers',
+    'plugins/printsupport',
+    'plugins/qmltooling',
+    'plugins/position',
+    'plugins/sensors',
+    'plugins/tls',
+    'plugins/networkinformation',
+    'plugins/imageformats/libqpdf',
+    'plugins/imageformats/libqsvg',
+    'plugins/imageformats/libqtiff',
+    'plugins/imageformats/libqwebp',
+    'plugins/imageformats/libqicns',
+    'plugins/imageformats/qpdf',
+    'plugins/imageformats/qsvg',
+    'plugins/imageformats/qtiff',
+    'plugins/imageformats/qwebp',
+    'plugins/imageformats/qicns',
+    'plugins/platforminputcontexts/libqtvirtualkeyboardplugin',
+    'plugins/platforminputcontexts/qtvirtualkeyboardplugin',
+    'plugins/egldeviceintegrations',
+    'plugins/generic',
+    'plugins/platforms/libqvnc',
+    'plugins/platforms/libqeglfs',
+    'plugins/platforms/libqminimalegl',
+    'plugins/platforms/libqlinuxfb',
+    'plugins/platforms/qdirect2d',
+]
+
+# 上記プラグイン経由でしか使われないQtライブラリ(ファイル名の一部で判定)
+QT_LIB_EXCLUDES = [
+    'Qt6Quick',
+    'Qt6Qml',
+    'Qt6Pdf',
+    'Qt6VirtualKeyboard',
+    'Qt6Network',
+    'Qt6EglFS',
+]
+
+
+def _keep(entry):
+    dest = entry[0].replace('\\', '/')
+    if any(f'/{pattern}' in dest for pattern in QT_DATA_EXCLUDES):
+        return False
+    name = dest.rsplit('/', 1)[-1]
+    return not any(pattern in name for pattern in QT_LIB_EXCLUDES)
+
+
 a = Analysis(
     ['src/main.py'],
     pathex=['src'],
@@ -7,36 +131,67 @@ a = Analysis(
         ('src/resources', 'resources'),
     ],
     hiddenimports=[
-        'PySide6',
         'git',
-        'github',
-        'cryptography',
     ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludedimports=[],
+    excludes=QT_EXCLUDES + PY_EXCLUDES,
     noarchive=False,
+    # バイトコードを最適化レベル1で事前コンパイル(assert のみ除去、docstringは残す)
+    optimize=1,
 )
 
+a.binaries = [entry for entry in a.binaries if _keep(entry)]
+a.datas = [entry for entry in a.datas if _keep(entry)]
+
 pyz = PYZ(a.pure, a.zipped_data, cipher=None)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name='leafgit',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    console=False,
-    disable_windowed_traceback=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon='src/resources/icons/icon.ico'
-)
+if ONEFILE:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        name='leafgit',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        console=False,
+        disable_windowed_traceback=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        icon='src/resources/icons/icon.ico'
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='leafgit',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        # 展開が無いため、UPXで圧縮すると逆に読み込みが遅くなる
+        upx=False,
+        console=False,
+        disable_windowed_traceback=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        icon='src/resources/icons/icon.ico'
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=False,
+        name='leafgit',
+    )
@@ -40,6 +40,7 @@ setup(
     entry_points={
         "console_scripts": [
             "leafgit=main:main",
+            "leafgit-batch=batch:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,47 @@
+"""LeafGit - ヘッドレス一括ステータス取得のエントリーポイント
+
+使い方:
+    python src/batch.py ~/work --jobs 8 > status.jsonl
+"""
+
+import argparse
+import logging
+import sys
+
+from core.batch_status import run_batch_status
+from utils import setup_logger
+
+
+def main(argv=None) -> int:
+    """ヘッドレス実行のメイン関数(Qtは読み込まない)"""
+    parser = argparse.ArgumentParser(
+        prog="leafgit-batch",
+        description="ディレクトリ配下の全リポジトリの状態をJSON Linesで出力します",
+    )
+    parser.add_argument("root", help="探索を開始するディレクトリ")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="並列数(既定: CPUコア数)"
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=None, help="探索する最大の深さ"
+    )
+    parser.add_argument(
+        "--files", action="store_true", help="件数ではなくファイル一覧を出力"
+    )
+    args = parser.parse_args(argv)
+
+    # 標準出力はJSON Lines専用にするため、ログはファイルのみに出す
+    setup_logger("leafgit", level=logging.WARNING, console=False)
+
+    failures = run_batch_status(
+        args.root,
+        sys.stdout,
+        jobs=args.jobs,
+        max_depth=args.max_depth,
+        include_files=args.files,
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,18 @@
 """Core package - ビジネスロジック"""
 
 from .git_operations import GitOperations
-from .app_controller import AppController
 
 __all__ = [
     "GitOperations",
     "AppController",
 ]
+
+
+def __getattr__(name):
+    # AppControllerはPySide6に依存するため、ヘッドレス実行時に
+    # Qtを読み込まないよう参照された時点でインポートする
+    if name == "AppController":
+        from .app_controller import AppController
+
+        return AppController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
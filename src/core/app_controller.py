@@ -1,10 +1,29 @@
 """アプリケーション全体を制御するController"""
 
-from typing import Optional, List
-from PySide6.QtCore import QObject, Signal
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, List
+from PySide6.QtCore import QObject, QTimer, Signal
 
 from core.git_operations import GitOperations
+from core.blame import BlameLoader
+from core.diffstat import DiffStatLoader
+from core.fetch_scheduler import FetchScheduler
+from core.content_search import ContentSearcher
+from core.history_search import HistorySearcher
+from core.index_refresher import IndexRefresher
+from core.jobs import JobRunner
+from core.repository_cache import RepositoryCache
+from core.stage_guard import DEFAULT_THRESHOLD, scan_stage_paths
+from core.submodules import SubmoduleLoader
+from core.worktrees import WorktreeLoader
+from core.write_queue import BUSY_MESSAGE, LOCKED_MESSAGE, LockFile, WriteQueue
 from models import CommandResult, Glossary, GlossaryTerm
+from models.stage import StageScan
+from models.status import StatusSnapshot
+from models.worktree import Worktree
+from utils import metrics, tracing
 from utils.logger import get_logger
 
 from git.exc import (
@@ -26,9 +45,18 @@ class AppController(QObject):
         self.repository_opened = self.git.repository_opened
         self.repository_closed = self.git.repository_closed
         self.command_executed = self.git.command_executed
+        self.command_output = self.git.command_output
+        self.commit_finished = self.git.commit_finished
         self.files_changed = self.git.files_changed
+        self.status_changed = self.git.status_changed
+        self.remote_status_changed = self.git.remote_status_changed
+        self.status_stale_changed = self.git.status_stale_changed
         self.branch_changed = self.git.branch_changed
         self.error_occurred = self.git.error_occurred
+        self.stale_lock_detected = self.git.stale_lock_detected
+        self.stage_progress = self.git.stage_progress
+        self.stage_finished = self.git.stage_finished
+        self.write_busy_changed = self.git.write_busy_changed
 
         @property
         def is_repository_open(self) -> bool:
@@ -46,6 +74,19 @@ class AppController(QObject):
             return self.git.current_branch
 
 
+@dataclass
+class _PendingWrite:
+    """ロックの競合で再試行を待っている、GUIスレッドの書き込み"""
+
+    git_ops: GitOperations
+    write: Callable[[GitOperations], CommandResult]
+    on_done: Callable[[CommandResult], None]
+    result: CommandResult
+    deadline: float
+    delay: float
+
+
+@metrics.instrument_methods("GitController")
 class GitController(QObject):
     """
     アプリケーション全体を制御するController
@@ -58,9 +99,38 @@ class GitController(QObject):
     repository_opened = Signal(str)  # リポジトリが開かれた(パス)
     repository_closed = Signal()  # リポジトリが閉じられた
     command_executed = Signal(CommandResult)  # コマンドが実行された
-    files_changed = Signal(list)  # ファイル状態が変化した
+    command_output = Signal(str)  # 実行中のコマンド(フック等)の出力1行
+    commit_finished = Signal(CommandResult)  # コミットが完了した(成功・失敗とも)
+    files_changed = Signal(list)  # ファイル状態が変化した(全体を再取得)
+    status_changed = Signal(object)  # ファイル状態の差分(StatusDelta)
     branch_changed = Signal(str)  # ブランチが変化した
+    remote_status_changed = Signal(object)  # 上流との差分(dict)またはNone
+    status_stale_changed = Signal(bool)  # キャッシュの状態を表示中かどうか
     error_occurred = Signal(str)  # エラーが発生した
+    # 異常終了したgitのロックが残っている(LockFile)
+    stale_lock_detected = Signal(object)
+    stage_progress = Signal(object, object)  # ステージの進捗(完了・合計バイト数)
+    stage_finished = Signal(CommandResult)  # バックグラウンドのステージが完了した
+    # バックグラウンドの書き込み(コミット・ステージ・インデックスの更新、
+    # ロックの競合による再試行)を実行中かどうか
+    write_busy_changed = Signal(bool)
+
+    # これ以上の合計サイズのステージは、バックグラウンドで実行する
+    BACKGROUND_STAGE_SIZE = 8 * 1024 * 1024
+    # これ以上のファイル数のステージは、バックグラウンドでblobを並列に書き込む
+    PARALLEL_STAGE_FILES = 1000
+    # 上流ブランチをこの秒数以内にfetch済みなら、pull ではfetchせずにマージだけ行う
+    PULL_FETCH_MAX_AGE = FetchScheduler.DEFAULT_INTERVAL
+
+    # リポジトリごとにバックグラウンドで読み取るローダー(属性名)
+    _LOADERS = (
+        "diffstat",
+        "blame",
+        "history_search",
+        "content_search",
+        "submodules",
+        "worktrees",
+    )
 
     _EXCEPTIONS = {
         GitCommandError: "Gitコマンドの実行中にエラーが発生しました",
@@ -74,6 +144,66 @@ class GitController(QObject):
         self._git_ops: Optional[GitOperations] = None
         self._repo_path: Optional[str] = None
 
+        # ステータスのキャッシュと、バックグラウンドでの再検証
+        self._status: Optional[StatusSnapshot] = None
+        self._status_generation = 0
+        self._reconcile_running = False
+        self._reconcile_pending = False
+        self._jobs = JobRunner(parent=self)
+        self._commit_running = False
+        self._stage_running = False
+        self._large_file_threshold = DEFAULT_THRESHOLD
+
+        # 前回終了時の状態(起動直後に表示し、バックグラウンドで再検証する)
+        self._cache = RepositoryCache()
+        self._stale = False
+        self._cached_branches: Optional[List[str]] = None
+
+        # 変更一覧に表示する行数の増減
+        self.diffstat = DiffStatLoader(self._jobs, parent=self)
+
+        # ファイルの行ごとの最終変更コミット
+        self.blame = BlameLoader(parent=self)
+
+        # コミット履歴の検索
+        self.history_search = HistorySearcher(parent=self)
+
+        # 作業ツリーのファイル内容の検索
+        self.content_search = ContentSearcher(parent=self)
+
+        # サブモジュールの状態(親リポジトリのステータスとは別に並列で取得する)
+        self.submodules = SubmoduleLoader(parent=self)
+        self._recurse_submodules = False
+
+        # リンクされたワークツリーの一覧と状態
+        self.worktrees = WorktreeLoader(parent=self)
+
+        # 定期fetch
+        self.fetch_scheduler = FetchScheduler(self._jobs, parent=self)
+        self.fetch_scheduler.remote_status_changed.connect(
+            self.remote_status_changed.emit
+        )
+
+        # アイドル時のインデックスの更新(読み取りではインデックスを書き換えないため)
+        self.index_refresher = IndexRefresher(
+            self._jobs, changed_paths=self._known_changed_paths, parent=self
+        )
+        self.index_refresher.running_changed.connect(self._emit_write_busy)
+
+        # GUIスレッドの書き込みがロックと競合した時の再試行
+        self._pending_write: Optional[_PendingWrite] = None
+        self._write_retry_timer = QTimer(self)
+        self._write_retry_timer.setSingleShot(True)
+        self._write_retry_timer.timeout.connect(self._retry_write)
+
+        # 書き込みが残骸のロックファイルで失敗したら知らせる
+        self.command_executed.connect(self._check_stale_lock)
+
+        # トレースの記録中はシグナルの送出も記録する
+        tracing.watch_signals(self, "GitController")
+        for name in self._LOADERS:
+            tracing.watch_signals(getattr(self, name), f"GitController.{name}")
+
     @property
     def is_repository_open(self) -> bool:
         """リポジトリが開かれているかどうか"""
@@ -91,6 +221,11 @@ class GitController(QObject):
             return None
         return self._git_ops.get_current_branch()
 
+    @property
+    def is_status_stale(self) -> bool:
+        """表示中のステータスがキャッシュ(未検証)かどうか"""
+        return self._stale
+
     def _handle_error(
         self, e: Exception, command: str, description: str
     ) -> CommandResult:
@@ -98,12 +233,12 @@ class GitController(QObject):
         friendly_msg = ""
         for exc, msg in self._EXCEPTIONS.items():
             if isinstance(e, exc):
-                logger.error(f"{msg}: {e}")
+                logger.error("%s: %s", msg, e)
                 friendly_msg = msg
                 break
         else:
             friendly_msg = f"不明なエラーが発生しました: {str(e)}"
-            logger.error(f"{friendly_msg}: {e}")
+            logger.error("%s: %s", friendly_msg, e)
 
         result = CommandResult(
             success=False,
@@ -122,10 +257,17 @@ class GitController(QObject):
             if self._git_ops is not None:
                 self.close_repository()
             self._git_ops = GitOperations.open_repository(path)
+            self._git_ops.wait_for_lock = False
             self._repo_path = path
+            self._set_loaders_repository(path)
+            self._cache.add_recent(path)
             self.repository_opened.emit(path)
             self.branch_changed.emit(self.current_branch or "")
             self._refresh_files()
+            self._update_remote_status()
+            self.worktrees.refresh()
+            self.fetch_scheduler.start(path)
+            self.index_refresher.start(path)
             return CommandResult(
                 success=True,
                 command=f"cd {path}",
@@ -140,13 +282,105 @@ class GitController(QObject):
             )
             return result
 
+    def restore_last_repository(self) -> Optional[CommandResult]:
+        """
+        前回開いていたリポジトリを、保存された状態から即座に開き直す
+
+        Returns:
+            CommandResult or None: 開き直すリポジトリが無い場合はNone
+        """
+        recent = self._cache.get_recent()
+        if not recent:
+            return None
+        return self.open_repository_cached(recent[0])
+
+    def open_repository_cached(self, path: str) -> Optional[CommandResult]:
+        """
+        保存された状態を表示してからバックグラウンドで再検証する
+
+        キャッシュが無い場合は通常の open_repository() と同じ
+        """
+        snapshot = self._cache.load_snapshot(path)
+        hit = snapshot is not None
+        metrics.record_cache("repository_state", hits=int(hit), misses=int(not hit))
+        if not hit:
+            return self.open_repository(path)
+
+        try:
+            return self._open_with_snapshot(
+                path, snapshot, "リポジトリを開きました(前回の状態を表示中)"
+            )
+        except Exception as e:
+            # 移動・削除されたリポジトリは一覧から外す
+            logger.info("前回のリポジトリを開けませんでした: %s (%s)", path, e)
+            self._cache.remove_recent(path)
+            # 途中まで切り替えたハンドル・ローダー・定期処理を元に戻す
+            self.close_repository()
+            return None
+
+    def _open_with_snapshot(
+        self, path: str, snapshot: dict, description: str
+    ) -> CommandResult:
+        """
+        リポジトリを開き、保存された状態を表示してからバックグラウンドで再検証する
+
+        Raises:
+            Exception: リポジトリを開けなかった場合
+        """
+        if self._git_ops is not None:
+            self.close_repository()
+        self._git_ops = GitOperations.open_repository(path)
+        self._git_ops.wait_for_lock = False
+        self._repo_path = path
+
+        self._set_loaders_repository(path)
+        self._cache.add_recent(path)
+        self._status = StatusSnapshot(snapshot["files"])
+        self._cached_branches = snapshot.get("branches") or []
+        self._set_stale(True)
+
+        self.repository_opened.emit(path)
+        self.branch_changed.emit(snapshot.get("branch") or "")
+        self.files_changed.emit(self._status.all_files())
+
+        # 差分だけを反映する再検証
+        self._schedule_reconcile()
+        self.submodules.refresh()
+        self.worktrees.refresh()
+        self.fetch_scheduler.start(path)
+        self.index_refresher.start(path)
+        return CommandResult(
+            success=True,
+            command=f"cd {path}",
+            description=description,
+            output=f"リポジトリ: {path}",
+        )
+
+    def get_recent_repositories(self) -> List[str]:
+        """最近開いたリポジトリの一覧"""
+        return self._cache.get_recent()
+
+    def save_state(self):
+        """現在のリポジトリの状態をディスクに保存"""
+        if self._git_ops is None or self._status is None or self._stale:
+            return
+        self._cache.save_snapshot(
+            self._repo_path,
+            self._status.to_dict(),
+            self.current_branch,
+            self._git_ops.get_branches(),
+        )
+
     def init_repository(self, path: str) -> CommandResult:
         """新規リポジトリを作成"""
         try:
             if self._git_ops is not None:
                 self.close_repository()
             self._git_ops = GitOperations.init_repository(path)
+            self._git_ops.wait_for_lock = False
             self._repo_path = path
+            self._set_loaders_repository(path)
+            self._cache.add_recent(path)
             result = CommandResult(
                 success=True,
                 command=f"git init {path}",
@@ -169,8 +403,13 @@ class GitController(QObject):
     def clone_repository(self, url: str, destination: str) -> CommandResult:
         """リポジトリをクローン"""
         try:
+            if self._git_ops is not None:
+                self.close_repository()
             self._git_ops = GitOperations.clone_repository(url, destination)
+            self._git_ops.wait_for_lock = False
             self._repo_path = destination
+            self._set_loaders_repository(destination)
+            self._cache.add_recent(destination)
             result = CommandResult(
                 success=True,
                 command=f"git clone {url} {destination}",
@@ -180,6 +419,10 @@ class GitController(QObject):
             self.repository_opened.emit(destination)
             self.command_executed.emit(result)
             self._refresh_files()
+            self._update_remote_status()
+            self.worktrees.refresh()
+            self.fetch_scheduler.start(destination)
+            self.index_refresher.start(destination)
             return result
         except Exception as e:
             result = CommandResult(
@@ -193,57 +436,281 @@ class GitController(QObject):
 
     def close_repository(self):
         """リポジトリを閉じる"""
+        self.fetch_scheduler.stop()
+        self.index_refresher.stop()
+        if self._repo_path is not None:
+            self._jobs.cancel_stale(self._repo_path)
+        self.save_state()
+        if self._git_ops is not None:
+            # 常駐しているgitサブプロセスとキャッシュを即座に解放する
+            self._git_ops.close()
         self._git_ops = None
         self._repo_path = None
+        self._set_loaders_repository(None)
+        self._status = None
+        self._status_generation += 1
+        self._cached_branches = None
+        self._set_stale(False)
         self.repository_closed.emit()
 
     # ==================== ステージング操作 ====================
 
-    def stage_files(self, file_paths: List[str]) -> CommandResult:
-        """ファイルをステージング"""
+    def check_stage(self, file_paths: List[str]) -> StageScan:
+        """ステージする前に、大きなファイルやGit LFSのポインタファイルを調べる"""
+        if not self._ensure_repository():
+            return StageScan()
+        return scan_stage_paths(
+            self._git_ops.repo.working_tree_dir,
+            file_paths,
+            self._large_file_threshold,
+        )
+
+    def set_large_file_threshold(self, size: int):
+        """ステージ前に確認するファイルサイズ(バイト)を設定。0で確認しない"""
+        self._large_file_threshold = max(0, size)
+
+    @property
+    def large_file_threshold(self) -> int:
+        return self._large_file_threshold
+
+    def stage_files(
+        self, file_paths: List[str], scan: Optional[StageScan] = None
+    ) -> Optional[CommandResult]:
+        """
+        ファイルをステージング
+
+        合計 BACKGROUND_STAGE_SIZE 以上、または PARALLEL_STAGE_FILES 個以上の場合は
+        バックグラウンドで実行し、進捗を stage_progress、結果を stage_finished で通知する
+
+        Args:
+            file_paths: ステージするパス
+            scan: check_stage() の結果(省略時はここで調べる)
+
+        Returns:
+            CommandResult or None: バックグラウンドで実行した場合・
+                ロックの競合で再試行する場合(_run_write)はNone
+        """
         if not self._ensure_repository():
             return self._no_repository_error("git add")
+        if self.is_writing:
+            return self._write_busy_error("git add")
+
+        if scan is None:
+            scan = self.check_stage(file_paths)
+        if (
+            scan.total_size < self.BACKGROUND_STAGE_SIZE
+            and len(file_paths) < self.PARALLEL_STAGE_FILES
+        ):
+            paths = list(file_paths)
+            return self._run_write(
+                lambda git_ops: git_ops.stage_files(paths),
+                lambda result: self._on_stage_finished(paths, result, notify=False),
+            )
 
-        result = self._git_ops.stage_files(file_paths)
-        self.command_executed.emit(result)
-        if result.success:
-            self._refresh_files()
-        return result
+        self._stage_running = True
+        self.write_busy_changed.emit(True)
+        paths = list(file_paths)
+        repo_path = self._repo_path
+        self._jobs.submit(
+            "stage",
+            _stage_parallel if self._use_parallel_stage(paths) else _stage_streaming,
+            self._repo_path,
+            paths,
+            scan.sizes,
+            priority="interactive",
+            repo=self._repo_path,
+            write=True,
+            on_finished=lambda result: self._on_stage_finished(
+                paths, result, repo_path
+            ),
+            on_failed=lambda error: self._on_stage_finished(
+                paths,
+                CommandResult(
+                    success=False,
+                    command="git add",
+                    description="ファイルのステージングに失敗しました",
+                    error_message=error,
+                ),
+                repo_path,
+            ),
+            on_progress=lambda progress: self.stage_progress.emit(*progress),
+        )
+        return None
 
-    def unstage_files(self, file_paths: List[str]) -> CommandResult:
-        """ファイルをアンステージ"""
+    def _use_parallel_stage(self, file_paths: List[str]) -> bool:
+        """blobを並列に書き込むかどうか(1コアでは git add と変わらないため使わない)"""
+        return (
+            len(file_paths) >= self.PARALLEL_STAGE_FILES and (os.cpu_count() or 1) > 1
+        )
+
+    @property
+    def is_staging(self) -> bool:
+        """バックグラウンドでステージ中かどうか"""
+        return self._stage_running
+
+    def _on_stage_finished(
+        self,
+        file_paths: List[str],
+        result: CommandResult,
+        repo_path: Optional[str] = None,
+        notify: bool = True,
+    ):
+        if self._stage_running:
+            self._stage_running = False
+            self.write_busy_changed.emit(self.is_writing)
+        self.command_executed.emit(result)
+        # バックグラウンドで実行中に別のリポジトリに切り替えた場合は反映しない
+        same_repository = repo_path is None or repo_path == self._repo_path
+        if result.success and same_repository and self._git_ops is not None:
+            self._apply_optimistic(lambda status: status.stage_delta(file_paths))
+        if notify:
+            self.stage_finished.emit(result)
+
+    def unstage_files(self, file_paths: List[str]) -> Optional[CommandResult]:
+        """ファイルをアンステージ(ロックの競合で再試行する場合はNoneを返す)"""
         if not self._ensure_repository():
             return self._no_repository_error("git reset")
+        if self.is_writing:
+            return self._write_busy_error("git reset")
 
-        result = self._git_ops.unstage_files(file_paths)
-        self.command_executed.emit(result)
-        if result.success:
-            self._refresh_files()
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                classify = self._unstaged_classifier()
+                self._apply_optimistic(
+                    lambda status: status.unstage_delta(file_paths, classify)
+                )
+
+        return self._run_write(lambda git_ops: git_ops.unstage_files(file_paths), done)
 
     # ==================== コミット操作 ====================
 
-    def commit(self, message: str) -> CommandResult:
-        """変更をコミット"""
+    def commit(self, message: str) -> Optional[CommandResult]:
+        """
+        変更をコミット
+
+        フックがある場合やインデックスが大きい場合は git commit を
+        バックグラウンドで実行し、フックの出力を command_output で逐次通知する。
+        結果はどちらの場合も commit_finished で通知される
+
+        Returns:
+            CommandResult or None: バックグラウンドで実行した場合・
+                ロックの競合で再試行する場合(_run_write)はNone
+        """
         if not self._ensure_repository():
-            return self._no_repository_error("git commit")
+            result = self._no_repository_error("git commit")
+            self.commit_finished.emit(result)
+            return result
+        if self._commit_running:
+            # 実行中のコミットの完了が commit_finished で通知される
+            return None
+        if self.is_writing:
+            result = self._write_busy_error("git commit")
+            self.commit_finished.emit(result)
+            return result
 
-        result = self._git_ops.commit_changes(message)
+        if not self._git_ops.prefers_native_commit():
+            return self._run_write(
+                lambda git_ops: git_ops.commit_changes(message),
+                self._on_commit_finished,
+            )
+
+        self._commit_running = True
+        self.write_busy_changed.emit(True)
+        self._jobs.submit(
+            "commit",
+            _commit_native,
+            self._repo_path,
+            message,
+            priority="interactive",
+            repo=self._repo_path,
+            write=True,
+            on_finished=self._on_commit_finished,
+            on_failed=lambda error: self._on_commit_finished(
+                CommandResult(
+                    success=False,
+                    command="git commit -F -",
+                    description="変更を保存に失敗しました",
+                    error_message=error,
+                )
+            ),
+            on_progress=self.command_output.emit,
+        )
+        return None
+
+    @property
+    def is_committing(self) -> bool:
+        """バックグラウンドでコミット中かどうか"""
+        return self._commit_running
+
+    @property
+    def is_writing(self) -> bool:
+        """
+        書き込み(コミット・ステージ・インデックスの更新)を実行中か、
+        ロックの競合で書き込みを再試行しているかどうか
+
+        実行中はリポジトリの書き込みロックが使われているため、GUIスレッドからの
+        書き込みは待たずにエラーにする(_write_busy_error)
+        """
+        return (
+            self._commit_running
+            or self._stage_running
+            or self._pending_write is not None
+            or self.index_refresher.is_running
+        )
+
+    def _on_commit_finished(self, result: CommandResult):
+        if self._commit_running:
+            self._commit_running = False
+            self.write_busy_changed.emit(self.is_writing)
         self.command_executed.emit(result)
-        if result.success:
-            self._refresh_files()
-        return result
+        if result.success and self._git_ops is not None:
+            self._apply_optimistic(lambda status: status.commit_delta())
+            self._update_remote_status()
+        self.commit_finished.emit(result)
+
+    # ==================== 履歴の参照 ====================
+
+    def blame_file(self, file_path: str) -> bool:
+        """
+        ファイルの blame をバックグラウンドで開始(結果は self.blame のシグナルで通知)
+
+        Returns:
+            bool: 開始できたかどうか(コミットが1つも無い場合はFalse)
+        """
+        if not self._ensure_repository():
+            self._no_repository_error("git blame")
+            return False
+        repo = self._git_ops.repo
+        if not repo.head.is_valid():
+            self.error_occurred.emit("コミットがまだありません")
+            return False
+        self.blame.blame(file_path, repo.head.commit.hexsha)
+        return True
+
+    def get_tracked_files(self) -> List[str]:
+        """インデックスに登録されているファイルの一覧"""
+        if self._git_ops is None:
+            return []
+        try:
+            return list(self._git_ops.read_index().paths())
+        except Exception as e:
+            logger.warning("インデックスの読み込みに失敗: %s", e)
+            return []
 
     # ==================== リモート操作 ====================
 
-    def connect_remote(self, url: str, name: str = "origin") -> CommandResult:
+    def connect_remote(self, url: str, name: str = "origin") -> Optional[CommandResult]:
         """リモートリポジトリに接続"""
         if not self._ensure_repository():
             return self._no_repository_error("git remote")
+        if self.is_writing:
+            return self._write_busy_error("git remote")
 
-        result = self._git_ops.connect_remote(url, name)
-        self.command_executed.emit(result)
-        return result
+        return self._run_write(
+            lambda git_ops: git_ops.connect_remote(url, name),
+            self.command_executed.emit,
+        )
 
     def push(self, remote: str = "origin", branch: str = None) -> CommandResult:
         """変更をプッシュ"""
@@ -255,100 +722,276 @@ class GitController(QObject):
 
         result = self._git_ops.push_changes(remote, branch)
         self.command_executed.emit(result)
+        if result.success:
+            self._update_remote_status()
         return result
 
-    def pull(self, remote: str = "origin", branch: str = None) -> CommandResult:
+    def pull(
+        self, remote: str = "origin", branch: str = None
+    ) -> Optional[CommandResult]:
         """変更をプル"""
         if not self._ensure_repository():
             return self._no_repository_error("git pull")
+        if self.is_writing:
+            return self._write_busy_error("git pull")
 
         if branch is None:
             branch = self.current_branch or "main"
 
-        result = self._git_ops.pull_changes(remote, branch)
-        self.command_executed.emit(result)
-        if result.success:
-            self._refresh_files()
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                self._refresh_files()
+                self._update_remote_status()
+
+        recurse = self._recurse_submodules
+        fetched = self.fetch_scheduler.fetched_within(remote, self.PULL_FETCH_MAX_AGE)
+        if fetched and self._git_ops.get_upstream() == (remote, branch):
+            # バックグラウンドのfetchで取得済みなので、通信せずにマージする
+            return self._run_write(
+                lambda git_ops: git_ops.merge_upstream(recurse), done
+            )
+        return self._run_write(
+            lambda git_ops: git_ops.pull_changes(remote, branch, recurse), done
+        )
+
+    def fetch_now(self):
+        """バックグラウンドでfetchして上流との差分を更新"""
+        if self._ensure_repository():
+            self.fetch_scheduler.fetch_now()
+
+    def set_fetch_interval(self, seconds: int):
+        """自動fetchの間隔(秒)を設定。0で無効"""
+        self.fetch_scheduler.set_interval(seconds)
+
+    def set_recurse_submodules(self, enabled: bool):
+        """fetch/pull でサブモジュールも(並列に)処理するかどうかを設定"""
+        self._recurse_submodules = enabled
+        self.fetch_scheduler.set_recurse_submodules(enabled)
 
     # ==================== ブランチ操作 ====================
 
-    def create_branch(self, branch_name: str) -> CommandResult:
+    def create_branch(self, branch_name: str) -> Optional[CommandResult]:
         """新規ブランチを作成"""
         if not self._ensure_repository():
             return self._no_repository_error("git checkout -b")
+        if self.is_writing:
+            return self._write_busy_error("git checkout -b")
 
-        result = self._git_ops.create_branch(branch_name)
-        self.command_executed.emit(result)
-        if result.success:
-            self.branch_changed.emit(branch_name)
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                self.branch_changed.emit(branch_name)
+                self._update_remote_status()
 
-    def switch_branch(self, branch_name: str) -> CommandResult:
+        return self._run_write(lambda git_ops: git_ops.create_branch(branch_name), done)
+
+    def switch_branch(self, branch_name: str) -> Optional[CommandResult]:
         """ブランチを切り替え"""
         if not self._ensure_repository():
             return self._no_repository_error("git checkout")
+        if self.is_writing:
+            return self._write_busy_error("git checkout")
 
-        result = self._git_ops.switch_branch(branch_name)
-        self.command_executed.emit(result)
-        if result.success:
-            self.branch_changed.emit(branch_name)
-            self._refresh_files()
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                self.branch_changed.emit(branch_name)
+                self._refresh_files()
+                self._update_remote_status()
+
+        return self._run_write(lambda git_ops: git_ops.switch_branch(branch_name), done)
 
-    def delete_branch(self, branch_name: str) -> CommandResult:
+    def delete_branch(self, branch_name: str) -> Optional[CommandResult]:
         """ブランチを削除"""
         if not self._ensure_repository():
             return self._no_repository_error("git branch -d")
+        if self.is_writing:
+            return self._write_busy_error("git branch -d")
 
-        result = self._git_ops.delete_branch(branch_name)
-        self.command_executed.emit(result)
-        if result.success:
-            self.branch_changed.emit(self.current_branch or "")
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                self.branch_changed.emit(self.current_branch or "")
+
+        return self._run_write(lambda git_ops: git_ops.delete_branch(branch_name), done)
 
     def merge_branch(
         self, source_branch: str, target_branch: str = None
-    ) -> CommandResult:
+    ) -> Optional[CommandResult]:
         """ブランチをマージ"""
         if not self._ensure_repository():
             return self._no_repository_error("git merge")
+        if self.is_writing:
+            return self._write_busy_error("git merge")
 
-        result = self._git_ops.merge_branch(source_branch, target_branch)
-        self.command_executed.emit(result)
-        if result.success:
-            self._refresh_files()
-        return result
+        def done(result: CommandResult):
+            self.command_executed.emit(result)
+            if result.success:
+                self._refresh_files()
+
+        return self._run_write(
+            lambda git_ops: git_ops.merge_branch(source_branch, target_branch), done
+        )
 
     def get_branches(self) -> List[str]:
         """ブランチ一覧を取得"""
         if not self._ensure_repository():
             return []
 
+        if self._stale and self._cached_branches is not None:
+            return list(self._cached_branches)
         result = self._git_ops.get_branches()
         return result
 
+    # ==================== ワークツリー操作 ====================
+
+    def get_worktrees(self) -> List[Worktree]:
+        """取得済みのワークツリーの一覧(状態はバックグラウンドで更新される)"""
+        return self.worktrees.worktrees()
+
+    def add_worktree(
+        self, path: str, branch: str = None, new_branch: str = None
+    ) -> Optional[CommandResult]:
+        """ワークツリーを追加"""
+        if not self._ensure_repository():
+            return self._no_repository_error("git worktree add")
+        if self.is_writing:
+            return self._write_busy_error("git worktree add")
+
+        return self._run_write(
+            lambda git_ops: git_ops.add_worktree(path, branch, new_branch),
+            self._on_worktrees_changed,
+        )
+
+    def remove_worktree(
+        self, path: str, force: bool = False
+    ) -> Optional[CommandResult]:
+        """ワークツリーを削除(開いているワークツリーは削除できない)"""
+        if not self._ensure_repository():
+            return self._no_repository_error("git worktree remove")
+        if self.is_writing:
+            return self._write_busy_error("git worktree remove")
+
+        if os.path.realpath(path) == os.path.realpath(self._repo_path):
+            result = CommandResult(
+                success=False,
+                command=f"git worktree remove {path}",
+                description="ワークツリーを削除",
+                error_message="開いているワークツリーは削除できません",
+            )
+            self.command_executed.emit(result)
+            return result
+        return self._run_write(
+            lambda git_ops: git_ops.remove_worktree(path, force),
+            self._on_worktrees_changed,
+        )
+
+    def _on_worktrees_changed(self, result: CommandResult):
+        self.command_executed.emit(result)
+        if result.success:
+            self.worktrees.refresh()
+
+    def switch_worktree(self, path: str) -> CommandResult:
+        """
+        別のワークツリーに切り替える(チェックアウトはしない)
+
+        バックグラウンドで取得済みの状態があればそれをすぐに表示し、
+        開いた後で再検証する
+        """
+        if not self._ensure_repository():
+            return self._no_repository_error(f"cd {path}")
+
+        worktree = self.worktrees.get(path)
+        if worktree is None or worktree.files is None:
+            return self.open_repository(path)
+        # ブランチはすべてのワークツリーで共通
+        snapshot = {
+            "files": worktree.files,
+            "branch": worktree.branch,
+            "branches": self.get_branches(),
+        }
+        try:
+            return self._open_with_snapshot(
+                worktree.path, snapshot, "ワークツリーを切り替えました"
+            )
+        except Exception as e:
+            return self._handle_error(e, f"cd {path}", "ワークツリーを切り替え")
+
     # ==================== 情報取得 ====================
 
     def get_changed_files(self) -> dict:
         """
         変更されたファイルを取得
 
+        キャッシュ済みのスナップショットがあればそれを返す
+
         Returns:
             dict: {
                 'staged': [...],    # ステージされたファイル
                 'unstaged': [...],  # 変更されているがステージされていないファイル
                 'untracked': [...]  # 未追跡ファイル
+                'deleted': [...]    # 削除されたファイル
             }
         """
         if not self._ensure_repository():
-            return {"staged": [], "unstaged": [], "untracked": []}
+            return {"staged": [], "unstaged": [], "untracked": [], "deleted": []}
+
+        hit = self._status is not None
+        metrics.record_cache("status", hits=int(hit), misses=int(not hit))
+        if not hit:
+            with metrics.timed("status.refresh"):
+                self._status = StatusSnapshot(self._git_ops.get_changed_files())
+        return self._status.to_dict()
+
+    def job_metrics(self) -> dict:
+        """バックグラウンドジョブのキューの状態(優先度ごとの待ち数・待ち時間等)"""
+        return self._jobs.metrics()
+
+    def refresh_status(self):
+        """ステータスを再取得してファイル一覧を更新"""
+        if not self._ensure_repository():
+            return
+        self._refresh_files()
+
+    def remove_stale_lock(self) -> CommandResult:
+        """異常終了したgitが残したロックファイルを削除(使われている可能性があれば削除しない)"""
+        if not self._ensure_repository():
+            return self._no_repository_error("rm index.lock")
 
-        result = self._git_ops.get_changed_files()
+        command = "rm index.lock"
+        description = "残っていたロックファイルを削除"
+        try:
+            lock = self._git_ops.write_queue.remove_stale_lock()
+        except OSError as e:
+            return self._handle_error(e, command, description)
+        if lock is None:
+            result = CommandResult(
+                success=False,
+                command=command,
+                description=description,
+                error_message="ロックファイルは使用中の可能性があるため削除しませんでした",
+            )
+        else:
+            result = CommandResult(
+                success=True,
+                command=f"rm {lock.path}",
+                description=description,
+            )
+        self.command_executed.emit(result)
         return result
 
     # ==================== プライベートメソッド ====================
 
+    def _check_stale_lock(self, result: CommandResult):
+        if isinstance(result.data, LockFile) and result.data.stale:
+            self.stale_lock_detected.emit(result.data)
+
+    def _set_loaders_repository(self, path: Optional[str]):
+        """バックグラウンドで読み取るローダー(_LOADERS)の対象リポジトリを切り替える"""
+        for name in self._LOADERS:
+            getattr(self, name).set_repository(path)
+
     def _ensure_repository(self) -> bool:
         """リポジトリが開かれているか確認"""
         return self._git_ops is not None
@@ -364,11 +1007,243 @@ class GitController(QObject):
         self.error_occurred.emit("リポジトリが選択されていません")
         return result
 
+    def _write_busy_error(self, command: str) -> CommandResult:
+        """バックグラウンドの書き込みの実行中に、書き込もうとした時のエラーを生成"""
+        result = CommandResult(
+            success=False,
+            command=command,
+            description="操作を実行",
+            error_message=BUSY_MESSAGE,
+        )
+        self.command_executed.emit(result)
+        return result
+
+    # ==================== GUIスレッドの書き込み ====================
+
+    def _run_write(
+        self,
+        write: Callable[[GitOperations], CommandResult],
+        on_done: Callable[[CommandResult], None],
+    ) -> Optional[CommandResult]:
+        """
+        GUIスレッドで書き込みを実行し、結果を on_done に渡す
+
+        _git_ops はロックの解放を待たない(wait_for_lock=False)ため、GUIは止まらない。
+        他のgit(ターミナル等)や他の書き込みと競合した場合は、QTimer で間隔を
+        延ばしながら WriteQueue.MAX_WAIT 秒まで再試行する。再試行中は is_writing が
+        Trueになり、最後まで失敗した場合は error_occurred でも通知する
+
+        Args:
+            write: GitOperations を受け取り書き込みを行う関数
+            on_done: 結果を受け取る関数
+
+        Returns:
+            CommandResult or None: 再試行する場合はNone
+        """
+        result = write(self._git_ops)
+        if not self._is_write_contention(result):
+            on_done(result)
+            return result
+        self._pending_write = _PendingWrite(
+            git_ops=self._git_ops,
+            write=write,
+            on_done=on_done,
+            result=result,
+            deadline=time.monotonic() + WriteQueue.MAX_WAIT,
+            delay=WriteQueue.INITIAL_DELAY,
+        )
+        self._emit_write_busy()
+        self._write_retry_timer.start(int(WriteQueue.INITIAL_DELAY * 1000))
+        return None
+
+    def _retry_write(self):
+        pending = self._pending_write
+        if pending is None:
+            return
+        # 再試行を待つ間にリポジトリを切り替えた場合は、最後の失敗を結果とする
+        if pending.git_ops is self._git_ops:
+            pending.result = pending.write(pending.git_ops)
+            pending.delay = min(pending.delay * 2, WriteQueue.MAX_DELAY)
+            if (
+                self._is_write_contention(pending.result)
+                and time.monotonic() + pending.delay <= pending.deadline
+            ):
+                self._write_retry_timer.start(int(pending.delay * 1000))
+                return
+        self._pending_write = None
+        self._emit_write_busy()
+        pending.on_done(pending.result)
+        if not pending.result.success:
+            # 呼び出し元には結果を返せなかったため
+            self.error_occurred.emit(pending.result.error_message)
+
+    @staticmethod
+    def _is_write_contention(result: CommandResult) -> bool:
+        """待てば書き込めそうな失敗かどうか(残骸のロックは待っても消えない)"""
+        return not result.success and result.error_message in (
+            LOCKED_MESSAGE,
+            BUSY_MESSAGE,
+        )
+
+    def _emit_write_busy(self, *_):
+        self.write_busy_changed.emit(self.is_writing)
+
+    def _known_changed_paths(self) -> List[str]:
+        """変更されているとわかっているパス(インデックスの更新の判定用)"""
+        if self._status is None:
+            return []
+        files = self._status.to_dict()
+        return files["unstaged"] + files["deleted"]
+
+    def _update_remote_status(self):
+        """取得済みのリモート追跡ブランチとの差分を通知(通信はしない)"""
+        ahead_behind = self._git_ops.get_ahead_behind()
+        if ahead_behind is None:
+            self.remote_status_changed.emit(None)
+            return
+        ahead, behind = ahead_behind
+        self.remote_status_changed.emit({"ahead": ahead, "behind": behind})
+
     def _refresh_files(self):
         """ファイル一覧を更新してシグナルを発行"""
-        files = self.get_changed_files()
-        all_files = files["staged"] + files["unstaged"] + files["untracked"]
-        self.files_changed.emit(all_files)
+        self._status_generation += 1
+        self._jobs.cancel_stale(self._repo_path)
+        with metrics.timed("status.refresh"):
+            self._status = StatusSnapshot(self._git_ops.get_changed_files())
+        self._set_stale(False)
+        self.files_changed.emit(self._status.all_files())
+        self.submodules.refresh()
+
+    # ==================== 楽観的なステータス更新 ====================
+
+    def _apply_optimistic(self, make_delta):
+        """
+        操作の結果をキャッシュに即座に反映し、差分を通知する
+
+        反映後はバックグラウンドで実際のステータスと照合する
+
+        Args:
+            make_delta: StatusSnapshot を受け取り StatusDelta を返す関数
+        """
+        if self._status is None:
+            self._refresh_files()
+            return
+
+        delta = make_delta(self._status)
+        self._status.apply(delta)
+        self._status_generation += 1
+        self._jobs.cancel_stale(self._repo_path)
+        if delta:
+            self.status_changed.emit(delta)
+        self._schedule_reconcile()
+
+    def _unstaged_classifier(self):
+        """アンステージ後のパスの分類先を決める関数を返す"""
+        work_dir = self._git_ops.repo.working_tree_dir
+        head_valid = self._git_ops.repo.head.is_valid()
+
+        def classify(path: str) -> str:
+            if not os.path.lexists(os.path.join(work_dir, path)):
+                return "deleted"
+            # HEADに存在しない新規ファイルは再検証で untracked に補正される
+            return "unstaged" if head_valid else "untracked"
+
+        return classify
+
+    def _schedule_reconcile(self):
+        """バックグラウンドでステータスを再取得し、キャッシュと照合する"""
+        if self._reconcile_running:
+            self._reconcile_pending = True
+            return
+
+        self._reconcile_running = True
+        self._reconcile_pending = False
+        generation = self._status_generation
+        self._jobs.submit(
+            "status-reconcile",
+            _read_status,
+            self._repo_path,
+            on_finished=lambda files: self._on_reconciled(generation, files),
+            on_failed=lambda _: self._on_reconcile_failed(),
+            on_cancelled=self._on_reconcile_cancelled,
+            repo=self._repo_path,
+            stale_on_write=True,
+        )
+
+    def _on_reconciled(self, generation: int, files: dict):
+        """再検証の結果を反映"""
+        # 実行中に別の操作が行われた場合は結果を捨てて再検証し直す
+        if generation == self._status_generation and self._status is not None:
+            actual = StatusSnapshot(files)
+            correction = self._status.diff(actual)
+            if correction:
+                logger.debug("ステータスを補正しました: %d件", correction.size)
+                self._status = actual
+                self.status_changed.emit(correction)
+        elif self._status is not None:
+            self._reconcile_pending = True
+        self._on_reconcile_done()
+
+    def _on_reconcile_cancelled(self):
+        # 操作によって古くなったので中断された。操作の後で取得し直す
+        self._reconcile_pending = True
+        self._on_reconcile_done()
+
+    def _on_reconcile_failed(self):
+        # キャッシュ表示中に再検証できなければ、同期的に取得し直す
+        if self._stale and self._git_ops is not None:
+            self._refresh_files()
+            self.branch_changed.emit(self.current_branch or "")
+        self._on_reconcile_done()
+
+    def _on_reconcile_done(self):
+        self._reconcile_running = False
+        if self._reconcile_pending and self._status is not None:
+            self._schedule_reconcile()
+        elif self._stale and self._git_ops is not None:
+            # キャッシュの検証が終わったので、ブランチ情報も実際の値に更新する
+            self._set_stale(False)
+            self._cached_branches = None
+            self.branch_changed.emit(self.current_branch or "")
+            self._update_remote_status()
+
+    def _set_stale(self, stale: bool):
+        if self._stale != stale:
+            self._stale = stale
+            self.status_stale_changed.emit(stale)
+
+
+def _commit_native(repo_path: str, message: str, progress) -> CommandResult:
+    """ワーカースレッドでリポジトリを開き、git commit を実行"""
+    with GitOperations.open_repository(repo_path) as git_ops:
+        return git_ops.commit_changes_native(message, on_output=progress)
+
+
+def _stage_streaming(
+    repo_path: str, file_paths: List[str], sizes: dict, progress
+) -> CommandResult:
+    """ワーカースレッドでリポジトリを開き、git add を実行"""
+    with GitOperations.open_repository(repo_path) as git_ops:
+        return git_ops.stage_files_streaming(
+            file_paths, sizes, on_progress=lambda done, total: progress((done, total))
+        )
+
+
+def _stage_parallel(
+    repo_path: str, file_paths: List[str], sizes: dict, progress
+) -> CommandResult:
+    """ワーカースレッドでリポジトリを開き、blobを並列に書き込んでステージ"""
+    with GitOperations.open_repository(repo_path) as git_ops:
+        return git_ops.stage_files_parallel(
+            file_paths, sizes, on_progress=lambda done, total: progress((done, total))
+        )
+
+
+def _read_status(repo_path: str) -> dict:
+    """ワーカースレッドでリポジトリを開き、ステータスを取得"""
+    with metrics.timed("status.reconcile"):
+        with GitOperations.open_repository(repo_path) as git_ops:
+            return git_ops.read_changed_files()
 
 
 # ==================== 用語集操作 ====================
@@ -0,0 +1,158 @@
+"""複数リポジトリの状態をQtなしで一括取得する"""
+
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterator, Optional, TextIO
+
+from core.git_operations import GitOperations
+
+# 探索しないディレクトリ
+_SKIP_DIRS = {"node_modules", ".venv", "venv", "__pycache__", ".tox"}
+
+
+def discover_repositories(
+    root: str, max_depth: Optional[int] = None, nested: bool = False
+) -> Iterator[str]:
+    """
+    ディレクトリ配下のGitリポジトリを探索
+
+    Args:
+        root: 探索を開始するディレクトリ
+        max_depth: 探索する最大の深さ(Noneなら無制限)
+        nested: Trueならリポジトリの内側もさらに探索する
+
+    Yields:
+        str: 見つかったリポジトリ(作業ツリー)のパス
+    """
+    stack = [(os.path.abspath(root), 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            continue
+
+        # .git はディレクトリ(通常)またはファイル(worktree/submodule)
+        is_repo = any(entry.name == ".git" for entry in entries)
+        if is_repo:
+            yield path
+            if not nested:
+                continue
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        for entry in sorted(entries, key=lambda e: e.name, reverse=True):
+            if entry.name == ".git" or entry.name in _SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append((entry.path, depth + 1))
+
+
+def _init_worker():
+    """ワーカープロセスのログ出力を標準エラーに切り替える"""
+    root_logger = logging.getLogger()
+    root_logger.handlers.clear()
+    root_logger.addHandler(logging.StreamHandler(sys.stderr))
+    root_logger.setLevel(logging.WARNING)
+
+
+def collect_status(path: str, include_files: bool = False) -> dict:
+    """
+    1つのリポジトリの状態を取得(プロセスプールのワーカーで実行される)
+
+    Args:
+        path: リポジトリのパス
+        include_files: Trueならファイル一覧も含める
+
+    Returns:
+        dict: JSONに変換可能な状態
+    """
+    started = time.perf_counter()
+    result = {"path": path}
+    try:
+        with GitOperations.open_repository(path) as git_ops:
+            files = git_ops.get_changed_files()
+            ahead_behind = git_ops.get_ahead_behind()
+            result["branch"] = git_ops.get_current_branch()
+
+        for key, paths in files.items():
+            result[key] = paths if include_files else len(paths)
+        result["ahead"], result["behind"] = ahead_behind or (None, None)
+        result["clean"] = not any(files.values())
+    except Exception as e:
+        result["error"] = str(e)
+
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def run_batch_status(
+    root: str,
+    out: TextIO,
+    jobs: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    include_files: bool = False,
+) -> int:
+    """
+    root配下のリポジトリの状態を並列に取得し、JSON Linesで出力
+
+    見つかったリポジトリから順にワーカーに渡し(探索の完了を待たない)、
+    結果は完了した順に1行ずつ書き出す。取得中に例外が起きたリポジトリは
+    そのリポジトリの error として出力し、他のリポジトリの取得は続ける
+
+    Args:
+        root: 探索を開始するディレクトリ
+        out: 出力先
+        jobs: ワーカープロセス数(Noneならコア数)
+        max_depth: 探索する最大の深さ
+        include_files: Trueならファイル一覧も含める
+
+    Returns:
+        int: 取得に失敗したリポジトリの数
+    """
+    failures = 0
+    pending = {}
+    # ワーカーの管理スレッドから完了した future を受け取る
+    done: "queue.SimpleQueue[Future]" = queue.SimpleQueue()
+
+    def write(result: dict):
+        nonlocal failures
+        if "error" in result:
+            failures += 1
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+    def write_done(block: bool):
+        while pending:
+            try:
+                future = done.get(block=block)
+            except queue.Empty:
+                return
+            path = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                # ワーカープロセスの異常終了等
+                result = {"path": path, "error": str(e) or type(e).__name__}
+            write(result)
+
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for path in discover_repositories(root, max_depth):
+            try:
+                future = executor.submit(collect_status, path, include_files)
+            except Exception as e:
+                write({"path": path, "error": str(e) or type(e).__name__})
+                continue
+            pending[future] = path
+            future.add_done_callback(done.put)
+            # 探索を続けながら、完了したものから書き出す
+            write_done(block=False)
+        write_done(block=True)
+    return failures
@@ -0,0 +1,255 @@
+"""git blame --incremental を逐次読み取り、行ごとの最終変更コミットを集める"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_process import CancelToken, GitProcess
+from core.jobs import JobRunner
+from models.blame import BlameChunk, BlameCommit
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 受け取った行をまとめてGUIに通知する間隔(秒)
+_EMIT_INTERVAL = 0.05
+# gitと同様、先頭8000バイトにNULがあればバイナリとみなす
+_BINARY_PROBE_SIZE = 8000
+
+
+class IncrementalBlameParser:
+    """
+    git blame --incremental の出力を1行ずつ受け取り、BlameChunk を組み立てる
+
+    出力形式:
+        <sha> <元の行> <現在の行> <行数>
+        author ... / summary ... 等(そのコミットが初めて現れた時のみ)
+        filename <パス>            ← 1つのチャンクの終わり
+    """
+
+    def __init__(self):
+        self._commits: Dict[str, BlameCommit] = {}
+        self._header: Optional[tuple] = None
+
+    def feed(self, line: str) -> Optional[BlameChunk]:
+        """1行を処理し、チャンクが完成したら返す"""
+        if self._header is None:
+            parts = line.split(" ")
+            if len(parts) != 4:
+                return None
+            sha, orig, final, count = parts
+            commit = self._commits.get(sha)
+            if commit is None:
+                commit = self._commits[sha] = BlameCommit(sha)
+            self._header = (commit, int(orig), int(final), int(count))
+            return None
+
+        key, _, value = line.partition(" ")
+        commit = self._header[0]
+        if key == "filename":
+            commit, orig, final, count = self._header
+            self._header = None
+            return BlameChunk(commit, orig, final, count, value)
+        if key == "author":
+            commit.author = value
+        elif key == "author-mail":
+            commit.author_mail = value.strip("<>")
+        elif key == "author-time":
+            commit.author_time = int(value)
+        elif key == "summary":
+            commit.summary = value
+        elif key == "boundary":
+            commit.boundary = True
+        return None
+
+
+def read_blob_lines(
+    repo_path: str, revision: str, file_path: str, token: CancelToken = None
+) -> List[str]:
+    """
+    指定したコミット時点のファイルの内容を行ごとに取得
+
+    Raises:
+        ValueError: バイナリファイルの場合
+    """
+    proc = GitProcess(
+        repo_path, ["cat-file", "blob", f"{revision}:{file_path}"], token=token
+    )
+    # gitと同じく改行(LF)で行を数える(最後の改行の後ろは行にしない)
+    lines = list(proc.iter_chunks())
+    proc.wait()
+    if lines and b"\0" in b"\n".join(lines[:200])[:_BINARY_PROBE_SIZE]:
+        raise ValueError("バイナリファイルは表示できません")
+    return [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in lines]
+
+
+def run_blame(
+    repo_path: str,
+    file_path: str,
+    revision: str,
+    token: CancelToken,
+    progress: Callable,
+) -> List[BlameChunk]:
+    """
+    ワーカースレッドで blame を実行し、途中経過を progress で通知する
+
+    progress には ("content", 行のリスト) を最初に1回、
+    その後 ("chunks", BlameChunkのリスト) を一定間隔でまとめて渡す
+
+    Returns:
+        list: すべての BlameChunk
+    """
+    progress(("content", read_blob_lines(repo_path, revision, file_path, token)))
+
+    parser = IncrementalBlameParser()
+    chunks: List[BlameChunk] = []
+    batch: List[BlameChunk] = []
+    last_emit = time.monotonic()
+    proc = GitProcess(
+        repo_path,
+        ["blame", "--incremental", revision, "--", file_path],
+        token=token,
+    )
+    for line in proc.iter_lines():
+        chunk = parser.feed(line)
+        if chunk is None:
+            continue
+        chunks.append(chunk)
+        batch.append(chunk)
+        now = time.monotonic()
+        if now - last_emit >= _EMIT_INTERVAL:
+            progress(("chunks", batch))
+            batch = []
+            last_emit = now
+    proc.wait()
+    if batch:
+        progress(("chunks", batch))
+    return chunks
+
+
+class BlameLoader(QObject):
+    """
+    ファイルの blame をバックグラウンドで実行し、結果を逐次通知する
+
+    blame は履歴の長いファイルでは時間がかかるため、ステータス取得等と
+    スレッドを取り合わないよう専用のスレッドで実行する。
+    結果は (ファイル, コミット) ごとにキャッシュし、HEADが動いたら破棄する
+    """
+
+    content_ready = Signal(str, list)  # パス, ファイルの行
+    chunks_ready = Signal(str, list)  # パス, BlameChunkのリスト
+    finished = Signal(str)  # パス
+    failed = Signal(str, str)  # パス, エラーメッセージ
+
+    CACHE_SIZE = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = JobRunner(max_threads=1, parent=self)
+        self._repo_path: Optional[str] = None
+        self._head: Optional[str] = None
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._token: Optional[CancelToken] = None
+        self._current: Optional[tuple] = None
+        self._lines: List[str] = []
+
+    @property
+    def current_path(self) -> Optional[str]:
+        """表示中(または実行中)のファイル"""
+        return self._current[0] if self._current else None
+
+    @property
+    def is_running(self) -> bool:
+        return self._token is not None
+
+    def set_repository(self, repo_path: Optional[str]):
+        """対象のリポジトリを切り替え(実行中のblameは中断し、キャッシュは破棄)"""
+        self.cancel()
+        self._repo_path = repo_path
+        self._head = None
+        self._cache.clear()
+        self._current = None
+
+    def blame(self, file_path: str, head: str):
+        """
+        ファイルの blame を開始
+
+        実行中の blame は中断される。キャッシュがあれば即座に通知する
+
+        Args:
+            file_path: リポジトリルートからの相対パス
+            head: 現在のHEADのコミットID
+        """
+        if self._repo_path is None:
+            return
+        self.cancel()
+        if head != self._head:
+            # HEADが動いたら以前の結果は使わない
+            self._cache.clear()
+            self._head = head
+
+        key = (file_path, head)
+        self._current = key
+        cached = self._cache.get(key)
+        hit = cached is not None
+        metrics.record_cache("blame", hits=int(hit), misses=int(not hit))
+        if hit:
+            self._cache.move_to_end(key)
+            lines, chunks = cached
+            self.content_ready.emit(file_path, lines)
+            self.chunks_ready.emit(file_path, chunks)
+            self.finished.emit(file_path)
+            return
+
+        token = CancelToken()
+        self._token = token
+        self._lines = []
+        self._jobs.submit(
+            "blame",
+            run_blame,
+            self._repo_path,
+            file_path,
+            head,
+            token,
+            on_progress=lambda data: self._on_progress(token, data),
+            on_finished=lambda chunks: self._on_finished(token, key, chunks),
+            on_failed=lambda error: self._on_failed(token, error),
+        )
+
+    def cancel(self):
+        """実行中の blame を中断"""
+        if self._token is not None:
+            logger.debug("blameを中断します: %s", self.current_path)
+            self._token.cancel()
+            self._token = None
+
+    # ==================== プライベートメソッド ====================
+
+    def _on_progress(self, token: CancelToken, data: tuple):
+        if token is not self._token:
+            return
+        kind, value = data
+        path = self.current_path
+        if kind == "content":
+            self._lines = value
+            self.content_ready.emit(path, value)
+        else:
+            self.chunks_ready.emit(path, value)
+
+    def _on_finished(self, token: CancelToken, key: tuple, chunks: list):
+        if token is not self._token:
+            return
+        self._token = None
+        self._cache[key] = (self._lines, chunks)
+        while len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        self.finished.emit(key[0])
+
+    def _on_failed(self, token: CancelToken, error: str):
+        if token is not self._token:
+            return
+        self._token = None
+        self.failed.emit(self.current_path, error)
@@ -0,0 +1,101 @@
+"""多数のファイルのblobを、複数のgitプロセスで並列にオブジェクトDBへ書き込む"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from core.git_process import CancelToken, GitProcess, GitProcessError
+from utils import metrics
+
+# 1つの git hash-object に渡すファイル数
+# (stdinを書き終えるまで出力を読まないので、出力がパイプに収まる数にする)
+HASH_BATCH_FILES = 500
+
+
+def can_hash_path(path: str) -> bool:
+    """--stdin-paths で渡せるパスかどうか(改行や引用符で始まるパスはクォートされる)"""
+    return "\n" not in path and not path.startswith('"')
+
+
+def write_blobs(
+    work_dir: str,
+    file_paths: List[str],
+    max_workers: int,
+    big_file_threshold: int,
+    token: Optional[CancelToken] = None,
+    on_batch: Optional[Callable[[List[str]], None]] = None,
+) -> Dict[str, str]:
+    """
+    ファイルの内容をblobとして書き込み、オブジェクトIDを返す
+
+    HASH_BATCH_FILES 個ずつ git hash-object -w --stdin-paths に渡し、
+    最大 max_workers 個のプロセスを同時に実行する。.gitattributes のフィルタ
+    (改行コードの変換やGit LFS)はパスに応じて適用され、インデックスには触れない
+
+    Args:
+        work_dir: 作業ツリーのパス
+        file_paths: 作業ツリーからの相対パス(can_hash_path() を満たすこと)
+        max_workers: 同時に実行するプロセスの数
+        big_file_threshold: これ以上のファイルはメモリに読み込まずにpackへ書き込む
+        token: 中断用のトークン
+        on_batch: 書き込み終えたパスのリストを受け取る関数(呼び出し元のスレッドで呼ぶ)
+
+    Returns:
+        Dict[str, str]: パスごとのオブジェクトID
+    """
+    token = token or CancelToken()
+    batches = [
+        file_paths[i : i + HASH_BATCH_FILES]
+        for i in range(0, len(file_paths), HASH_BATCH_FILES)
+    ]
+    oids: Dict[str, str] = {}
+    if not batches:
+        return oids
+
+    with metrics.timed("stage.hash"):
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(batches))),
+            thread_name_prefix="hash-object",
+        ) as pool:
+            futures = {
+                pool.submit(_hash_batch, work_dir, batch, big_file_threshold, token): (
+                    batch
+                )
+                for batch in batches
+            }
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    oids.update(zip(batch, future.result()))
+                    if on_batch is not None:
+                        on_batch(batch)
+            except BaseException:
+                # 残りのプロセスも終了させてから抜ける
+                token.cancel()
+                raise
+    return oids
+
+
+def _hash_batch(
+    work_dir: str, file_paths: List[str], big_file_threshold: int, token: CancelToken
+) -> List[str]:
+    proc = GitProcess(
+        work_dir,
+        [
+            "-c",
+            f"core.bigFileThreshold={big_file_threshold}",
+            "hash-object",
+            "-w",
+            "--stdin-paths",
+        ],
+        stdin_data=b"".join(
+            path.encode("utf-8", "surrogateescape") + b"\n" for path in file_paths
+        ),
+        token=token,
+    )
+    oids = [line for line in proc.iter_lines() if line]
+    proc.wait()
+    if len(oids) != len(file_paths):
+        raise GitProcessError(
+            proc.args, 0, f"hash-object returned {len(oids)}/{len(file_paths)} ids"
+        )
+    return oids
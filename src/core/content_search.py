@@ -0,0 +1,181 @@
+"""作業ツリーのファイル内容を git grep で並列に検索する"""
+
+import os
+import time
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_process import CancelToken, GitProcess, GitProcessError
+from core.jobs import JobRunner
+from models.grep import GrepMatch
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 見つかった行をまとめてGUIに通知する間隔(秒)
+_EMIT_INTERVAL = 0.05
+# 1行がこれより長い場合は表示用に切り詰める(minifyされたファイル等)
+_MAX_LINE_LENGTH = 500
+
+
+def run_grep(
+    repo_path: str,
+    pattern: str,
+    fixed_string: bool,
+    ignore_case: bool,
+    untracked: bool,
+    max_hits: int,
+    token: CancelToken,
+    progress: Callable,
+) -> int:
+    """
+    ワーカースレッドで git grep を実行し、見つかった行を progress で逐次通知する
+
+    git grep は複数スレッドで検索してもファイルの順に結果を出力するため、
+    同じファイルの行は続けて届く。max_hits 件に達したら git を打ち切る
+
+    Returns:
+        int: 見つかった行数
+    """
+    args = [
+        "grep",
+        "-z",  # パス\0行番号\0内容 の形式(パスに何が含まれていても区切れる)
+        "-n",
+        "-I",  # バイナリファイルは対象外
+        "--no-color",
+        f"--threads={os.cpu_count() or 1}",
+        "-F" if fixed_string else "-E",
+    ]
+    if ignore_case:
+        args.append("-i")
+    if untracked:
+        # 追跡されていないファイルも対象にする(.gitignore の対象は除く)
+        args.append("--untracked")
+    args += ["-e", pattern, "--"]
+
+    proc = GitProcess(repo_path, args, token=token)
+    batch: List[GrepMatch] = []
+    count = 0
+    last_emit = 0.0
+    for record in proc.iter_chunks(b"\n"):
+        fields = record.split(b"\0", 2)
+        if len(fields) != 3:
+            continue
+        path, line_number, text = fields
+        text = text.rstrip(b"\r").decode("utf-8", errors="replace")
+        batch.append(
+            GrepMatch(
+                path.decode("utf-8", errors="replace"),
+                int(line_number),
+                text[:_MAX_LINE_LENGTH],
+            )
+        )
+        count += 1
+        if count >= max_hits:
+            proc.cancel()
+            break
+        now = time.monotonic()
+        if now - last_emit >= _EMIT_INTERVAL:
+            progress(batch)
+            batch = []
+            last_emit = now
+
+    returncode = proc.wait(check=False)
+    if token.cancelled:
+        raise GitProcessError(proc.args, returncode, "cancelled", cancelled=True)
+    # 1 は「一致なし」、上限で打ち切った場合は kill による終了コードになる
+    if returncode not in (0, 1) and not proc.cancelled:
+        raise GitProcessError(proc.args, returncode, proc.stderr)
+    if batch:
+        progress(batch)
+    return count
+
+
+class ContentSearcher(QObject):
+    """
+    リポジトリ内検索をバックグラウンドで実行し、見つかった行を逐次通知する
+
+    新しい検索を始めると、実行中の検索は中断される
+    """
+
+    results_ready = Signal(list)  # GrepMatchのリスト(ファイル順)
+    finished = Signal(int)  # 見つかった行数
+    failed = Signal(str)  # エラーメッセージ
+
+    MAX_HITS = 10000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # git grep 自体が複数スレッドで動くので、ジョブは1つずつ実行する
+        self._jobs = JobRunner(max_threads=1, parent=self)
+        self._repo_path: Optional[str] = None
+        self._token: Optional[CancelToken] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._token is not None
+
+    def set_repository(self, repo_path: Optional[str]):
+        """対象のリポジトリを切り替え(実行中の検索は中断)"""
+        self.cancel()
+        self._repo_path = repo_path
+
+    def search(
+        self,
+        pattern: str,
+        fixed_string: bool = True,
+        ignore_case: bool = True,
+        untracked: bool = False,
+    ):
+        """
+        検索を開始(実行中の検索は中断)
+
+        Args:
+            pattern: 検索する文字列または正規表現(拡張正規表現)
+            fixed_string: Trueなら pattern を文字列としてそのまま検索
+            ignore_case: 大文字と小文字を区別しない
+            untracked: 追跡されていないファイルも検索する
+        """
+        self.cancel()
+        if self._repo_path is None or not pattern:
+            return
+
+        token = CancelToken()
+        self._token = token
+        self._jobs.submit(
+            "content-search",
+            run_grep,
+            self._repo_path,
+            pattern,
+            fixed_string,
+            ignore_case,
+            untracked,
+            self.MAX_HITS,
+            token,
+            on_progress=lambda matches: self._on_progress(token, matches),
+            on_finished=lambda count: self._on_finished(token, count),
+            on_failed=lambda error: self._on_failed(token, error),
+        )
+
+    def cancel(self):
+        """実行中の検索を中断"""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    # ==================== プライベートメソッド ====================
+
+    def _on_progress(self, token: CancelToken, matches: list):
+        if token is self._token:
+            self.results_ready.emit(matches)
+
+    def _on_finished(self, token: CancelToken, count: int):
+        if token is self._token:
+            self._token = None
+            self.finished.emit(count)
+
+    def _on_failed(self, token: CancelToken, error: str):
+        if token is self._token:
+            self._token = None
+            self.failed.emit(error)
@@ -0,0 +1,254 @@
+"""変更ファイルごとの行数の増減をバックグラウンドで集計する"""
+
+import os
+from typing import Dict, Iterable, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_operations import GitOperations
+from core.git_process import CancelToken
+from core.jobs import JobRunner
+from models.diffstat import DiffStat
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 集計の種類(get_changed_files() のキーに対応)
+#   staged   : HEAD と Index の差分
+#   unstaged : Index と作業ツリーの差分(削除されたファイルを含む)
+#   untracked: 未追跡ファイル(ファイル全体を追加行として数える)
+DIFFSTAT_KINDS = ("staged", "unstaged", "untracked")
+
+# 未追跡ファイルの行数を数える上限サイズ(これより大きいものは読まない)
+UNTRACKED_LINE_COUNT_LIMIT = 8 * 1024 * 1024
+# gitと同様、先頭8000バイトにNULがあればバイナリとみなす
+_BINARY_PROBE_SIZE = 8000
+
+
+def collect_diffstat(
+    repo_path: str,
+    kind: str,
+    paths: List[str],
+    known: Dict[str, tuple],
+    token: Optional[CancelToken] = None,
+) -> Dict[str, tuple]:
+    """
+    ワーカースレッドでリポジトリを開き、パスごとの変更量を集計
+
+    キャッシュのキーには、ステージ済みは (HEAD, Index上のoid)、
+    未ステージは (Index上のoid, 作業ツリーのmtime, サイズ) を使う。
+    作業ツリー側のoidを得るにはファイルを読んでハッシュする必要があるため、
+    statの値で代用している
+
+    Args:
+        repo_path: リポジトリのパス
+        kind: DIFFSTAT_KINDS のいずれか
+        paths: 集計するパス
+        known: 集計済みのパスとそのキャッシュキー(キーが同じなら集計しない)
+        token: 中断用のトークン
+
+    Returns:
+        dict: {パス: (キャッシュキー, DiffStat)}。キーが変わらなかったパスは含まない
+    """
+    with GitOperations.open_repository(repo_path) as git_ops:
+        work_dir = git_ops.repo.working_tree_dir
+        index = git_ops.read_index() if kind != "untracked" else None
+        head = None
+        if kind == "staged" and git_ops.repo.head.is_valid():
+            head = git_ops.repo.head.commit.hexsha
+
+        keys = {}
+        for path in paths:
+            oid = None
+            if index is not None:
+                i = index.find(path)
+                oid = index.oid(i) if i is not None else None
+            if kind == "staged":
+                keys[path] = (head, oid)
+            else:
+                keys[path] = (oid, *_stat_key(os.path.join(work_dir, path)))
+
+        missing = [path for path in paths if known.get(path) != keys[path]]
+        if not missing:
+            return {}
+        if kind == "untracked":
+            stats = {
+                path: _count_lines(os.path.join(work_dir, path)) for path in missing
+            }
+        else:
+            stats = git_ops.read_numstat(
+                missing, cached=(kind == "staged"), token=token
+            )
+
+    # 差分が出なかったパス(モードのみの変更等)は 0行 とする
+    return {path: (keys[path], stats.get(path, DiffStat())) for path in missing}
+
+
+def _stat_key(full_path: str) -> tuple:
+    try:
+        st = os.lstat(full_path)
+    except OSError:
+        return (None, None)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _count_lines(full_path: str) -> DiffStat:
+    """未追跡ファイルの行数(すべて追加行として数える)"""
+    try:
+        if os.path.getsize(full_path) > UNTRACKED_LINE_COUNT_LIMIT:
+            return DiffStat(binary=True)
+        with open(full_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return DiffStat()
+    if b"\0" in data[:_BINARY_PROBE_SIZE]:
+        return DiffStat(binary=True)
+    lines = data.count(b"\n")
+    if data and not data.endswith(b"\n"):
+        lines += 1
+    return DiffStat(added=lines)
+
+
+class DiffStatLoader(QObject):
+    """
+    変更一覧に表示する行数の増減を、バックグラウンドで少しずつ集計する
+
+    request() で渡された優先パス(画面に見えている行)を最初のジョブで集計し、
+    残りは BACKGROUND_BATCH_SIZE 件ずつ集計する。結果はキャッシュされ、
+    内容が変わらない限り再集計しない
+    """
+
+    stats_ready = Signal(str)  # 集計が進んだ種類(DIFFSTAT_KINDS)
+
+    # 最初のジョブの件数(画面に見えている行がすぐ埋まるよう小さくする)
+    FIRST_BATCH_SIZE = 200
+    BACKGROUND_BATCH_SIZE = 2000
+
+    def __init__(self, jobs: JobRunner, parent=None):
+        super().__init__(parent)
+        self._jobs = jobs
+        self._repo_path: Optional[str] = None
+        self._cache: Dict[str, Dict[str, tuple]] = {k: {} for k in DIFFSTAT_KINDS}
+        self._paths: Dict[str, List[str]] = {k: [] for k in DIFFSTAT_KINDS}
+        self._pending: Dict[str, List[str]] = {k: [] for k in DIFFSTAT_KINDS}
+        self._running: Dict[str, bool] = {k: False for k in DIFFSTAT_KINDS}
+        self._first_batch: Dict[str, bool] = {k: True for k in DIFFSTAT_KINDS}
+        self._generation = 0
+
+    def set_repository(self, repo_path: Optional[str]):
+        """対象のリポジトリを切り替え(キャッシュは破棄)"""
+        self._repo_path = repo_path
+        self._generation += 1
+        for kind in DIFFSTAT_KINDS:
+            self._cache[kind] = {}
+            self._paths[kind] = []
+            self._pending[kind] = []
+
+    def request(self, kind: str, paths: Iterable[str], priority: Iterable[str] = ()):
+        """
+        集計を要求
+
+        以前の要求で未処理のパスは破棄され、新しい一覧で置き換えられる
+
+        Args:
+            kind: DIFFSTAT_KINDS のいずれか
+            paths: 一覧に表示しているすべてのパス
+            priority: 先に集計するパス(画面に見えている行)
+        """
+        if self._repo_path is None:
+            return
+        paths = list(paths)
+        self._paths[kind] = paths
+        current = set(paths)
+
+        # 一覧から消えたパスのキャッシュは捨てる
+        cache = self._cache[kind]
+        for path in [p for p in cache if p not in current]:
+            del cache[path]
+
+        ordered = dict.fromkeys(p for p in priority if p in current)
+        ordered.update(dict.fromkeys(paths))
+        self._pending[kind] = list(ordered)
+        self._first_batch[kind] = True
+        self._run_next(kind)
+
+    def get(self, kind: str, path: str) -> Optional[DiffStat]:
+        """集計済みの変更量(未集計ならNone)"""
+        entry = self._cache[kind].get(path)
+        return entry[1] if entry is not None else None
+
+    def total(self, kind: str) -> DiffStat:
+        """現在の一覧のうち集計済みのパスの合計"""
+        cache = self._cache[kind]
+        return DiffStat.total(cache[p][1] for p in self._paths[kind] if p in cache)
+
+    def is_complete(self, kind: str) -> bool:
+        """現在の一覧がすべて集計済みかどうか"""
+        return not self._pending[kind] and not self._running[kind]
+
+    # ==================== プライベートメソッド ====================
+
+    def _run_next(self, kind: str):
+        if self._running[kind] or not self._pending[kind]:
+            return
+        if self._first_batch[kind]:
+            size = self.FIRST_BATCH_SIZE
+            self._first_batch[kind] = False
+        else:
+            size = self.BACKGROUND_BATCH_SIZE
+        batch = self._pending[kind][:size]
+        del self._pending[kind][:size]
+        cache = self._cache[kind]
+        known = {path: cache[path][0] for path in batch if path in cache}
+
+        self._running[kind] = True
+        generation = self._generation
+        self._jobs.submit(
+            f"diffstat-{kind}",
+            collect_diffstat,
+            self._repo_path,
+            kind,
+            batch,
+            known,
+            on_finished=lambda result: self._on_finished(
+                kind, generation, len(batch), result
+            ),
+            on_failed=lambda error: self._on_failed(kind, error),
+            on_cancelled=lambda: self._on_cancelled(kind, generation, batch),
+            repo=self._repo_path,
+            stale_on_write=True,
+            cancellable=True,
+        )
+
+    def _on_finished(self, kind: str, generation: int, requested: int, result: dict):
+        self._running[kind] = False
+        if generation != self._generation:
+            # 別のリポジトリに切り替わった後の結果は捨てる
+            self._run_next(kind)
+            return
+        # キャッシュキーが変わっていなかったパスは再集計されていない
+        metrics.record_cache(
+            "diffstat", hits=requested - len(result), misses=len(result)
+        )
+        self._cache[kind].update(result)
+        self.stats_ready.emit(kind)
+        self._run_next(kind)
+
+    def _on_cancelled(self, kind: str, generation: int, batch: List[str]):
+        # 操作によって古くなったので中断された。集計し直す
+        self._running[kind] = False
+        if generation == self._generation:
+            listed = set(self._paths[kind])
+            pending = set(self._pending[kind])
+            self._pending[kind][:0] = [
+                p for p in batch if p in listed and p not in pending
+            ]
+        self._run_next(kind)
+
+    def _on_failed(self, kind: str, error: str):
+        # 失敗した集計は繰り返さない(次の request() で再試行される)
+        logger.debug("変更量の集計に失敗しました(%s): %s", kind, error)
+        self._running[kind] = False
+        self._pending[kind] = []
+        self.stats_ready.emit(kind)
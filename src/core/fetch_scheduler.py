@@ -0,0 +1,198 @@
+"""バックグラウンドで定期的にfetchを行うスケジューラ"""
+
+import random
+import time
+from typing import Callable, Optional
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+from PySide6.QtGui import QGuiApplication
+
+from core.git_operations import GitOperations
+from core.jobs import JobRunner
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def fetch_and_compare(
+    repo_path: str, recurse_submodules: bool = False
+) -> Optional[dict]:
+    """
+    ワーカースレッドでfetchし、上流ブランチとの差分を計算
+
+    Args:
+        repo_path: リポジトリのパス
+        recurse_submodules: Trueならサブモジュールも並列にfetchする
+
+    Returns:
+        dict or None: {'remote', 'ahead', 'behind', 'fetched_at'}。
+            リモートが無い場合はNone
+
+    Raises:
+        RuntimeError: fetchに失敗した場合
+    """
+    with GitOperations.open_repository(repo_path) as git_ops:
+        remote = git_ops.get_tracking_remote()
+        if remote is None:
+            return None
+        result = git_ops.fetch_changes(remote, recurse_submodules)
+        if not result.success:
+            raise RuntimeError(result.error_message)
+        ahead_behind = git_ops.get_ahead_behind()
+
+    ahead, behind = ahead_behind or (None, None)
+    return {
+        "remote": remote,
+        "ahead": ahead,
+        "behind": behind,
+        "fetched_at": time.time(),
+    }
+
+
+def _app_is_active() -> bool:
+    """アプリケーションが前面で使われているかどうか"""
+    app = QGuiApplication.instance()
+    if app is None:
+        return False
+    return QGuiApplication.applicationState() == Qt.ApplicationState.ApplicationActive
+
+
+class FetchScheduler(QObject):
+    """
+    開いているリポジトリを一定間隔でfetchする
+
+    失敗が続いた場合は間隔を指数的に延ばし(上限 MAX_BACKOFF)、
+    複数のインスタンスが同時に動かないよう間隔にジッターを加える。
+    アプリが非アクティブ・最小化中はfetchせず次回に回す。
+    """
+
+    DEFAULT_INTERVAL = 5 * 60  # 秒
+    MAX_BACKOFF = 60 * 60  # 秒
+    JITTER = 0.1  # 間隔に対する割合
+
+    # fetch結果(fetch_and_compareの戻り値)
+    remote_status_changed = Signal(object)
+    fetch_failed = Signal(str)
+
+    def __init__(
+        self,
+        jobs: JobRunner,
+        interval: int = DEFAULT_INTERVAL,
+        is_active: Callable[[], bool] = _app_is_active,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._jobs = jobs
+        self._interval = interval
+        self._is_active = is_active
+        self._repo_path: Optional[str] = None
+        self._failures = 0
+        self._running = False
+        self._last_status: Optional[dict] = None
+        self._minimized = False
+        self._recurse_submodules = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def interval(self) -> int:
+        """fetch間隔(秒)。0なら自動fetchしない"""
+        return self._interval
+
+    def set_interval(self, seconds: int):
+        """fetch間隔を変更(0で無効)"""
+        self._interval = max(0, seconds)
+        if self._repo_path is not None:
+            self._schedule()
+
+    def set_recurse_submodules(self, enabled: bool):
+        """サブモジュールもfetchするかどうかを設定"""
+        self._recurse_submodules = enabled
+
+    def set_minimized(self, minimized: bool):
+        """ウィンドウの最小化状態を設定"""
+        self._minimized = minimized
+
+    def start(self, repo_path: str):
+        """リポジトリの定期fetchを開始"""
+        self._repo_path = repo_path
+        self._failures = 0
+        self._last_status = None
+        self._schedule()
+
+    def stop(self):
+        """定期fetchを停止"""
+        self._repo_path = None
+        self._last_status = None
+        self._timer.stop()
+
+    def fetched_within(self, remote: str, seconds: float) -> bool:
+        """開いているリポジトリの remote を、seconds 秒以内にfetch済みかどうか"""
+        status = self._last_status
+        return (
+            status is not None
+            and status["remote"] == remote
+            and time.time() - status["fetched_at"] < seconds
+        )
+
+    def fetch_now(self):
+        """すぐにfetchする(手動実行)"""
+        self._timer.stop()
+        self._run_fetch(priority="background")
+
+    def next_delay(self) -> float:
+        """次回fetchまでの秒数(バックオフとジッターを含む)"""
+        delay = min(self._interval * (2**self._failures), self.MAX_BACKOFF)
+        delay = max(delay, self._interval)
+        return delay * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+
+    # ==================== プライベートメソッド ====================
+
+    def _schedule(self):
+        self._timer.stop()
+        if self._repo_path is None or self._interval <= 0:
+            return
+        self._timer.start(int(self.next_delay() * 1000))
+
+    def _on_timeout(self):
+        if self._minimized or not self._is_active():
+            # 使われていない間は通信しない
+            logger.debug("非アクティブのためfetchをスキップしました")
+            self._schedule()
+            return
+        # 定期fetchは他のジョブが無い時だけ行う
+        self._run_fetch(priority="idle")
+
+    def _run_fetch(self, priority: str):
+        if self._repo_path is None or self._running:
+            return
+        self._running = True
+        repo_path = self._repo_path
+        self._jobs.submit(
+            "fetch",
+            fetch_and_compare,
+            repo_path,
+            self._recurse_submodules,
+            on_finished=lambda status: self._on_fetched(repo_path, status),
+            on_failed=lambda error: self._on_fetch_failed(repo_path, error),
+            priority=priority,
+        )
+
+    def _on_fetched(self, repo_path: str, status: Optional[dict]):
+        self._running = False
+        if repo_path != self._repo_path:
+            return
+        self._failures = 0
+        self._last_status = status
+        self.remote_status_changed.emit(status)
+        self._schedule()
+
+    def _on_fetch_failed(self, repo_path: str, error: str):
+        self._running = False
+        if repo_path != self._repo_path:
+            return
+        self._failures += 1
+        logger.info("fetchに失敗しました(%d回目): %s", self._failures, error)
+        self.fetch_failed.emit(error)
+        self._schedule()
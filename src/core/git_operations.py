@@ -1,13 +1,93 @@
-from git import Repo
+import functools
+import gc
+import json
+import sys
+import tempfile
+from git import Git, Repo, GitCmdObjectDB
 from git.exc import GitCommandError
 from models import CommandResult
-from utils import get_logger
+from models.diffstat import DiffStat
+from models.worktree import Worktree
+from utils import get_logger, metrics, tracing
+from core.blob_writer import can_hash_path, write_blobs
+from core.git_process import READ_ENV, GitProcess, GitProcessError
+from core.index_reader import GitIndex
+from core.write_queue import LOCKED_MESSAGE, WriteQueue
 import os
+import stat
 
 logger = get_logger(__name__)
 
 
+class _CountingGit(Git):
+    """gitコマンドの起動回数を数える(性能の計測用)"""
+
+    def execute(self, command, *args, **kwargs):
+        metrics.increment("spawn.gitpython")
+        with tracing.span(f"git {command[1]}", "git", {"args": command[1:21]}):
+            return super().execute(command, *args, **kwargs)
+
+
+class _Repo(Repo):
+    """GitPythonが起動するgitコマンドを _CountingGit 経由にしたRepo"""
+
+    GitCommandWrapperType = _CountingGit
+
+
+def _write_operation(command: str, wait: bool = True):
+    """
+    リポジトリに書き込むメソッドを WriteQueue 経由で実行するデコレータ
+
+    Args:
+        command: ロックを待ちきれなかった場合の結果に入れるコマンド
+        wait: Falseならロックの解放を待たない(wait_for_lock がFalseの場合も待たない)
+    """
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return self.write_queue.run(
+                lambda: method(self, *args, **kwargs),
+                command,
+                wait=wait and self.wait_for_lock,
+            )
+
+        return wrapper
+
+    return decorate
+
+
 class GitOperations:
+    """
+    1つのリポジトリに対するGit操作
+
+    GitPythonは cat-file の常駐プロセスやオブジェクトキャッシュを保持するため、
+    使い終わったら close() を呼ぶか with 文で使う
+    """
+
+    # オブジェクトDBの実装
+    # GitDB(純Python)はpackファイルをこのプロセスにmmapしてキャッシュが膨らむため、
+    # オブジェクトの読み出しはgitのサブプロセスに任せ、close()で確実に終了させる
+    ODB_TYPE = GitCmdObjectDB
+
+    # これより大きいインデックスでは、コミットをgit本体に任せる
+    # (GitPythonはインデックス全体をPythonで読み書きするため遅い)
+    NATIVE_COMMIT_INDEX_SIZE = 1024 * 1024
+
+    # サブモジュールを並列にfetchする数の上限(submodule.fetchJobs 未設定時)
+    SUBMODULE_MAX_JOBS = 8
+
+    # これ以上のファイルは、gitがメモリに読み込まずにステージする(core.bigFileThreshold)
+    STREAM_FILE_SIZE = 32 * 1024 * 1024
+    # stage_files_streaming で1回の git add にまとめる量(進捗の通知単位)
+    STAGE_BATCH_BYTES = 64 * 1024 * 1024
+    STAGE_BATCH_FILES = 500
+    # stage_files_parallel でblobを同時に書き込むプロセスの数の上限
+    STAGE_MAX_WORKERS = 8
+
+    # コミット時に実行されるフック
+    COMMIT_HOOKS = ("pre-commit", "prepare-commit-msg", "commit-msg", "post-commit")
+
     def __init__(self, repo):
         """
         直接呼ばず、クラスメソッド(open_repository等)を使う
@@ -16,11 +96,58 @@ class GitOperations:
             repo: GitPythonのRepoオブジェクト
         """
         self.repo = repo
+        self._closed = False
         if self.repo.bare:
+            self.close()
             raise Exception("Repository is bare")
+        # GitPythonが起動するgitも、読み取りではインデックスを書き換えない
+        self.repo.git.update_environment(**READ_ENV)
+        # 書き込みはスレッドをまたいで1つずつ、ロックの競合時は待って行う
+        self.write_queue = WriteQueue.for_repository(
+            self.repo.git_dir, self.repo.working_tree_dir
+        )
+        # Falseなら書き込みでロックの解放を待たず、競合したらすぐに失敗を返す
+        # (GUIスレッドで使う場合。再試行は呼び出し側で行う)
+        self.wait_for_lock = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def closed(self) -> bool:
+        """close() 済みかどうか"""
+        return self._closed
+
+    def close(self):
+        """
+        リポジトリハンドルを解放
+
+        cat-file などの常駐サブプロセスを終了し、キャッシュを破棄する。
+        複数回呼んでも安全。
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.repo.close()
+        except Exception as e:
+            logger.warning("リポジトリのクローズに失敗: %s", e)
+        # Repoへの参照を切る(Windowsではファイルハンドル解放のためGCも走らせる)
+        self.repo = None
+        if sys.platform == "win32":
+            gc.collect()
 
     # エラーパターンとユーザー向けメッセージのマッピング
     _ERROR_PATTERNS = {
+        # ロックの競合(WriteQueue が待って再試行する)
+        "index.lock": LOCKED_MESSAGE,
+        "head.lock": LOCKED_MESSAGE,
+        "could not be obtained": LOCKED_MESSAGE,
+        "cannot lock ref": LOCKED_MESSAGE,
         # ネットワーク関連
         "could not resolve host": "ネットワークに接続できません",
         "connection refused": "リモートサーバーに接続できません",
@@ -101,21 +228,22 @@ class GitOperations:
     @classmethod
     def open_repository(cls, repo_path):
         """既存リポジトリを開く"""
-        repo = Repo(repo_path)
+        repo = _Repo(repo_path, odbt=cls.ODB_TYPE)
         return cls(repo)  # cls は GitOperations クラス自身
 
     @classmethod
     def init_repository(cls, repo_path):
         """新規リポジトリを作成"""
-        repo = Repo.init(repo_path)
+        repo = _Repo.init(repo_path, odbt=cls.ODB_TYPE)
         return cls(repo)
 
     @classmethod
     def clone_repository(cls, repo_url, destination):
         """リモートリポジトリをクローン"""
-        repo = Repo.clone_from(repo_url, destination)
+        repo = _Repo.clone_from(repo_url, destination, odbt=cls.ODB_TYPE)
         return cls(repo)
 
+    @_write_operation("git add")
     def stage_files(self, file_paths):
         cmd = f"git add {' '.join(file_paths)}"
         description = "ファイルをステージングエリアに追加"
@@ -149,6 +277,167 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git add")
+    def stage_files_streaming(self, file_paths, sizes=None, on_progress=None):
+        """
+        git add でファイルをステージ(ワーカースレッド用)
+
+        内容の読み込みとハッシュ計算はgitに任せ、STREAM_FILE_SIZE 以上のファイルは
+        メモリに読み込まずにチャンクごとに圧縮してpackに書き込ませる
+        (core.bigFileThreshold)。ファイルをまとめて STAGE_BATCH_BYTES ごとに
+        実行し、その都度 on_progress(完了したバイト数, 合計バイト数) を呼ぶ
+
+        Args:
+            file_paths: ステージするパス(削除されたファイルも含めてよい)
+            sizes: パスごとのサイズ(StageScan.sizes。省略時は0として扱う)
+            on_progress: 進捗を受け取る関数
+        """
+        sizes = sizes or {}
+        total = sum(sizes.get(path, 0) for path in file_paths)
+        cmd = f"git add ({len(file_paths)} ファイル)"
+        description = "ファイルをステージングエリアに追加"
+        args = [
+            "-c",
+            f"core.bigFileThreshold={self.STREAM_FILE_SIZE}",
+            "add",
+            "--",
+        ]
+        done = 0
+        batch = []
+        batch_bytes = 0
+        try:
+            for i, path in enumerate(file_paths):
+                batch.append(path)
+                batch_bytes += sizes.get(path, 0)
+                if (
+                    i + 1 < len(file_paths)
+                    and batch_bytes < self.STAGE_BATCH_BYTES
+                    and len(batch) < self.STAGE_BATCH_FILES
+                ):
+                    continue
+                GitProcess(self.repo.working_tree_dir, [*args, *batch]).wait()
+                done += batch_bytes
+                batch = []
+                batch_bytes = 0
+                if on_progress is not None:
+                    on_progress(done, total)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    def stage_files_parallel(self, file_paths, sizes=None, on_progress=None):
+        """
+        多数のファイルをステージ(ワーカースレッド用)
+
+        インデックスにない通常ファイルは、blobを複数の git hash-object で並列に
+        書き込み(この間はインデックスをロックしない)、最後に
+        git update-index --index-info で1回だけインデックスに追加する。
+        それ以外(変更・削除されたファイルやシンボリックリンク等)は
+        stage_files_streaming でステージする
+
+        Args:
+            file_paths: ステージするパス
+            sizes: パスごとのサイズ(StageScan.sizes。省略時は0として扱う)
+            on_progress: 進捗(完了したバイト数, 合計バイト数)を受け取る関数
+        """
+        sizes = sizes or {}
+        total = sum(sizes.get(path, 0) for path in file_paths)
+        cmd = f"git add ({len(file_paths)} ファイル)"
+        description = "ファイルをステージングエリアに追加"
+        done = 0
+
+        def on_batch(batch):
+            nonlocal done
+            done += sum(sizes.get(path, 0) for path in batch)
+            if on_progress is not None:
+                on_progress(done, total)
+
+        try:
+            modes, others = self._split_new_files(file_paths)
+            oids = write_blobs(
+                self.repo.working_tree_dir,
+                list(modes),
+                min(self.STAGE_MAX_WORKERS, os.cpu_count() or 1),
+                self.STREAM_FILE_SIZE,
+                on_batch=on_batch,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+        if modes:
+            result = self._add_index_entries(modes, oids, cmd, description)
+            if not result.success or not others:
+                return result
+        result = self.stage_files_streaming(
+            others,
+            sizes,
+            on_progress=(
+                None
+                if on_progress is None
+                else lambda others_done, _: on_progress(done + others_done, total)
+            ),
+        )
+        result.command = cmd
+        return result
+
+    @_write_operation("git update-index")
+    def _add_index_entries(self, modes, oids, cmd, description):
+        """書き込み済みのblobをインデックスに追加し、stat情報を更新する"""
+        entries = b"".join(
+            f"{modes[path]:o} {oids[path]}\t{path}".encode("utf-8", "surrogateescape")
+            + b"\0"
+            for path in modes
+        )
+        try:
+            with metrics.timed("stage.update_index"):
+                work_dir = self.repo.working_tree_dir
+                GitProcess(
+                    work_dir, ["update-index", "-z", "--index-info"], stdin_data=entries
+                ).wait()
+                # --index-info はstat情報を記録しないため、次の status で
+                # 全ファイルが読み直されないように更新しておく
+                GitProcess(work_dir, ["update-index", "-q", "--refresh"]).wait(
+                    check=False
+                )
+            return CommandResult(success=True, command=cmd, description=description)
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    def _split_new_files(self, file_paths):
+        """
+        インデックスにない通常ファイルと、それ以外に分ける
+
+        Returns:
+            tuple: (パスごとのモードの辞書, それ以外のパスのリスト)
+        """
+        index = self.read_index()
+        filemode = self.repo.config_reader().get_value("core", "filemode", True)
+        work_dir = self.repo.working_tree_dir
+        modes = {}
+        others = []
+        for path in file_paths:
+            try:
+                st = os.lstat(os.path.join(work_dir, path))
+            except OSError:
+                st = None
+            if (
+                st is None
+                or not stat.S_ISREG(st.st_mode)
+                or not can_hash_path(path)
+                or path in index
+            ):
+                others.append(path)
+            elif filemode and st.st_mode & stat.S_IXUSR:
+                modes[path] = 0o100755
+            else:
+                modes[path] = 0o100644
+        return modes, others
+
+    @_write_operation("git reset")
     def unstage_files(self, file_paths):
         """ファイルをアンステージ"""
         cmd = f"git reset HEAD {' '.join(file_paths)}"
@@ -168,6 +457,7 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git commit")
     def commit_changes(self, message):
         cmd = f"git commit -m '{message}'"
         description = "変更を保存"
@@ -181,7 +471,83 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git commit -F -")
+    def commit_changes_native(self, message, on_output=None):
+        """
+        git commit をサブプロセスで実行(フックも実行される)
+
+        ワーカースレッドから呼ばれることを想定している
+
+        Args:
+            message: コミットメッセージ
+            on_output: フック等の出力を1行ずつ受け取るコールバック
+
+        Returns:
+            CommandResult: data に {"hooks": {フック名: 秒}, "total": 秒}
+        """
+        cmd = "git commit -F -"
+        description = "変更を保存"
+        fd, trace_path = tempfile.mkstemp(prefix="leafgit-trace2-", suffix=".json")
+        os.close(fd)
+        try:
+            proc = GitProcess(
+                self.repo.working_tree_dir,
+                ["commit", "--no-edit", "-F", "-"],
+                # フックの実行時間はtrace2のイベントから取得する
+                env={"GIT_TRACE2_EVENT": trace_path},
+                stdin_data=message.encode("utf-8"),
+                merge_stderr=True,
+            )
+            lines = []
+            for line in proc.iter_lines():
+                lines.append(line)
+                if on_output is not None:
+                    on_output(line)
+            returncode = proc.wait(check=False)
+            output = "\n".join(lines)
+            if returncode != 0:
+                raise GitProcessError(proc.args, returncode, output)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+                output=output,
+                data=_read_trace2_timings(trace_path),
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+        finally:
+            try:
+                os.remove(trace_path)
+            except OSError:
+                pass
+
+    def prefers_native_commit(self):
+        """
+        コミットをgit本体で行うべきかどうか
+
+        コミット用のフックがある場合(GitPythonでは実行されない)と、
+        インデックスが大きい場合はTrue
+        """
+        try:
+            index_path = os.path.join(self.repo.git_dir, "index")
+            if os.path.getsize(index_path) >= self.NATIVE_COMMIT_INDEX_SIZE:
+                return True
+        except OSError:
+            pass
+        try:
+            hooks_dir = self.repo.git.rev_parse("--git-path", "hooks")
+        except GitCommandError:
+            return False
+        hooks_dir = os.path.join(self.repo.working_tree_dir, hooks_dir)
+        for hook in self.COMMIT_HOOKS:
+            hook_path = os.path.join(hooks_dir, hook)
+            if os.path.isfile(hook_path) and os.access(hook_path, os.X_OK):
+                return True
+        return False
+
     # TODO: Add URL validation
+    @_write_operation("git remote add")
     def connect_remote(self, url, name="origin"):
         cmd = f"git remote add {name} {url}"
         description = "リモートリポジトリに接続"
@@ -208,11 +574,17 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
-    def pull_changes(self, remote="origin", branch="main"):
-        cmd = f"git pull {remote} {branch}"
+    @_write_operation("git pull")
+    def pull_changes(self, remote="origin", branch="main", recurse_submodules=False):
+        """
+        Args:
+            recurse_submodules: Trueならサブモジュールも並列にfetchしてチェックアウトする
+        """
+        extra = self._submodule_args(recurse_submodules)
+        cmd = " ".join(["git pull", remote, branch, *extra])
         description = "リモートリポジトリから変更を取得"
         try:
-            self.repo.git.pull(remote, branch, "--no-rebase")
+            self.repo.git.pull(remote, branch, "--no-rebase", *extra)
             return CommandResult(
                 success=True,
                 command=cmd,
@@ -221,6 +593,111 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git merge @{upstream}")
+    def merge_upstream(self, recurse_submodules=False):
+        """
+        fetch済みの上流ブランチをマージ(pull から fetch を省いたもの)
+
+        Args:
+            recurse_submodules: Trueならマージ後にサブモジュールも並列にチェックアウトする
+        """
+        cmd = "git merge --no-edit @{upstream}"
+        description = "リモートリポジトリから変更を取得"
+        try:
+            self.repo.git.merge("--no-edit", "@{upstream}")
+            if self._submodule_args(recurse_submodules):
+                # git pull --recurse-submodules と同じく、記録されたコミットに合わせる
+                jobs = f"--jobs={self.submodule_jobs()}"
+                cmd += f" && git submodule update --recursive {jobs}"
+                self.repo.git.submodule("update", "--recursive", jobs)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    def fetch_changes(self, remote="origin", recurse_submodules=False):
+        """
+        リモートの変更を取得(マージはしない)
+
+        バックグラウンドから呼ばれるため、認証プロンプトは表示させない
+
+        Args:
+            recurse_submodules: Trueならすべてのサブモジュールも並列にfetchする
+        """
+        extra = self._submodule_args(recurse_submodules)
+        cmd = " ".join(["git fetch", remote, *extra])
+        description = "リモートリポジトリの変更を確認"
+        try:
+            with self.repo.git.custom_environment(GIT_TERMINAL_PROMPT="0"):
+                self.repo.git.fetch(remote, "--prune", *extra)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    def submodule_jobs(self):
+        """
+        サブモジュールを並列にfetchする数
+
+        submodule.fetchJobs が設定されていればその値、
+        無ければCPU数(上限 SUBMODULE_MAX_JOBS)
+        """
+        try:
+            jobs = int(self.repo.config_reader().get_value("submodule", "fetchJobs", 0))
+        except (TypeError, ValueError):
+            jobs = 0
+        if jobs > 0:
+            return jobs
+        return min(self.SUBMODULE_MAX_JOBS, os.cpu_count() or 1)
+
+    def _submodule_args(self, recurse_submodules):
+        """fetch/pull でサブモジュールも並列に処理するための引数"""
+        if not recurse_submodules or not os.path.isfile(
+            os.path.join(self.repo.working_tree_dir, ".gitmodules")
+        ):
+            return []
+        return ["--recurse-submodules", f"--jobs={self.submodule_jobs()}"]
+
+    def get_tracking_remote(self):
+        """
+        現在のブランチが追跡しているリモート名を取得
+
+        Returns:
+            str or None: 上流ブランチのリモート名。未設定なら 'origin'(存在する場合)
+        """
+        try:
+            tracking = self.repo.active_branch.tracking_branch()
+            if tracking is not None:
+                return tracking.remote_name
+        except (TypeError, ValueError):
+            # detached HEAD
+            pass
+        names = [remote.name for remote in self.repo.remotes]
+        if "origin" in names:
+            return "origin"
+        return names[0] if names else None
+
+    def get_upstream(self):
+        """
+        現在のブランチの上流ブランチを取得
+
+        Returns:
+            tuple[str, str] or None: (リモート名, ブランチ名)。未設定・detached HEADならNone
+        """
+        try:
+            tracking = self.repo.active_branch.tracking_branch()
+        except (TypeError, ValueError):
+            return None
+        if tracking is None:
+            return None
+        return tracking.remote_name, tracking.remote_head
+
     # branches
 
     def get_branches(self):
@@ -229,7 +706,7 @@ class GitOperations:
             branches = [branch.name for branch in self.repo.branches]
             return branches
         except Exception as e:
-            logger.warning(f"ブランチ一覧の取得に失敗: {e}")
+            logger.warning("ブランチ一覧の取得に失敗: %s", e)
             return []
 
     def get_current_branch(self):
@@ -255,9 +732,30 @@ class GitOperations:
             # detached HEAD 状態
             return None
         except Exception as e:
-            logger.warning(f"現在のブランチ取得に失敗: {e}")
+            logger.warning("現在のブランチ取得に失敗: %s", e)
             return None
 
+    def get_ahead_behind(self):
+        """
+        上流ブランチとの差分コミット数を取得
+
+        Returns:
+            tuple[int, int] or None: (ahead, behind)。上流ブランチが無い場合はNone
+        """
+        try:
+            output = self.repo.git.rev_list(
+                "--left-right", "--count", "HEAD...@{upstream}"
+            )
+            ahead, behind = output.split()
+            return int(ahead), int(behind)
+        except GitCommandError:
+            # 上流ブランチ未設定・初回コミット前
+            return None
+        except Exception as e:
+            logger.warning("ahead/behindの取得に失敗: %s", e)
+            return None
+
+    @_write_operation("git checkout -b")
     def create_branch(self, branch_name):
         cmd = f"git checkout -b {branch_name}"
         description = "新しいブランチを作成"
@@ -271,6 +769,7 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git checkout")
     def switch_branch(self, branch_name):
         cmd = f"git checkout {branch_name}"
         description = "ブランチを切り替え"
@@ -284,6 +783,7 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git branch -d")
     def delete_branch(self, branch_name):
         cmd = f"git branch -d {branch_name}"
         description = "ブランチを削除"
@@ -297,6 +797,7 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
+    @_write_operation("git merge")
     def merge_branch(self, source_branch, target_branch=None):
         if target_branch is None:
             target_branch = self.repo.active_branch.name
@@ -313,55 +814,397 @@ class GitOperations:
         except Exception as e:
             return self._handle_error(e, cmd, description)
 
-    # files
+    # worktrees
 
-    def get_changed_files(self):
+    def list_worktrees(self):
         """
-        変更されたファイルを取得
+        リンクされたワークツリーの一覧(先頭がメインの作業ツリー)
 
         Returns:
-            dict: ステージされたファイル、ステージされていないファイル、未追跡ファイル、削除されたファイルのリスト
+            List[Worktree]: 状態(files)は未取得
         """
         try:
-            staged = []
-            unstaged = []
-            deleted = []
+            return read_worktrees(self.repo.working_tree_dir)
+        except GitProcessError as e:
+            logger.warning("ワークツリーの一覧の取得に失敗: %s", e)
+            return []
 
-            # HEADが有効かチェック（初回コミット前は無効）
-            if self.repo.head.is_valid():
-                # ステージされた変更 (HEAD vs Index)
-                for item in self.repo.index.diff("HEAD"):
-                    # 削除されたファイルはa_path、追加/変更されたファイルもa_path
-                    path = item.a_path if item.a_path else item.b_path
-                    if path:
-                        staged.append(path)
-            else:
-                # 初回コミット前: インデックスに追加されたファイルをstagedとみなす
-                staged = [entry[0] for entry in self.repo.index.entries.keys()]
+    @_write_operation("git worktree add")
+    def add_worktree(self, path, branch=None, new_branch=None):
+        """
+        ワークツリーを追加
 
-            # ステージされていない変更 (Index vs Working Tree)
-            for item in self.repo.index.diff(None):
-                # 削除されたファイルはa_path、変更されたファイルもa_path
-                path = item.a_path if item.a_path else item.b_path
-                if path:
-                    if item.change_type == "D":
-                        deleted.append(path)
-                    else:
-                        unstaged.append(path)
+        Args:
+            path: 作成するディレクトリ
+            branch: チェックアウトするブランチまたはコミット
+                (省略時は new_branch、それも無ければ path と同名の新しいブランチ)
+            new_branch: 新しく作成するブランチ名(branch から作成する)
+        """
+        args = ["add"]
+        if new_branch:
+            args += ["-b", new_branch]
+        args.append(path)
+        if branch:
+            args.append(branch)
+        cmd = f"git worktree {' '.join(args)}"
+        description = "ワークツリーを追加"
+        try:
+            self.repo.git.worktree(*args)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
 
-            untracked = self.repo.untracked_files
+    @_write_operation("git worktree remove")
+    def remove_worktree(self, path, force=False):
+        """
+        ワークツリーを削除
 
-            return {
-                "staged": staged,
-                "unstaged": unstaged,
-                "untracked": untracked,
-                "deleted": deleted,
-            }
+        Args:
+            path: 削除するワークツリー
+            force: Trueなら未コミットの変更があっても削除する
+        """
+        args = ["remove", *(["--force"] if force else []), path]
+        cmd = f"git worktree {' '.join(args)}"
+        description = "ワークツリーを削除"
+        try:
+            self.repo.git.worktree(*args)
+            return CommandResult(
+                success=True,
+                command=cmd,
+                description=description,
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    # files
+
+    def get_changed_files(self):
+        """
+        変更されたファイルを取得
+
+        Returns:
+            dict: ステージされたファイル、ステージされていないファイル、未追跡ファイル、削除されたファイルのリスト
+        """
+        try:
+            return self.read_changed_files()
         except Exception as e:
-            logger.warning(f"変更ファイルの取得に失敗: {e}")
+            logger.warning("変更ファイルの取得に失敗: %s", e)
             return {
                 "staged": [],
                 "unstaged": [],
                 "untracked": [],
                 "deleted": [],
             }
+
+    def read_index(self):
+        """
+        インデックスを読み取り専用で読み込む
+
+        ファイル数やサイズの集計など、インデックス全体を見る処理に使う
+        (GitPythonの repo.index よりも速く、メモリも少ない)
+
+        Returns:
+            GitIndex: インデックスの全エントリ
+        """
+        object_format = self.repo.config_reader().get_value(
+            "extensions", "objectformat", "sha1"
+        )
+        return GitIndex.read(
+            os.path.join(self.repo.git_dir, "index"), object_format=object_format
+        )
+
+    def is_index_locked(self):
+        """他のgit(ターミナル等)がインデックスをロックしているかどうか"""
+        return os.path.exists(os.path.join(self.repo.git_dir, "index.lock"))
+
+    def stale_index_paths(self, known_changed=(), limit=None):
+        """
+        インデックスのstat情報を更新すると status が速くなるパスを取得
+
+        stat情報が作業ツリーと食い違うファイルや、インデックスと同じ秒に
+        更新されたファイル(racily clean)は、status のたびに内容が読み直される。
+        読み取りではインデックスを書き換えないため、これらは溜まっていく
+
+        Args:
+            known_changed: 実際に変更されているとわかっているパス
+                (更新しても食い違いは解消しないので含めない)
+            limit: 返すパスの数の上限(Noneなら無制限)
+
+        Returns:
+            list: 更新した方がよいパス
+        """
+        index_path = os.path.join(self.repo.git_dir, "index")
+        try:
+            index_mtime = int(os.stat(index_path).st_mtime)
+        except OSError:
+            return []
+        known_changed = set(known_changed)
+        work_dir = self.repo.working_tree_dir
+        index = self.read_index()
+        stale = []
+        for i in range(len(index)):
+            if limit is not None and len(stale) >= limit:
+                break
+            if index.stage(i):
+                continue
+            path = index.path(i)
+            if path in known_changed:
+                continue
+            mtime = index.mtimes[i]
+            if mtime >= index_mtime:
+                stale.append(path)
+                continue
+            try:
+                st = os.lstat(os.path.join(work_dir, path))
+            except OSError:
+                continue
+            # インデックスには下位32bitだけが記録されている
+            if (
+                int(st.st_mtime) & 0xFFFFFFFF != mtime
+                or st.st_size & 0xFFFFFFFF != index.sizes[i]
+            ):
+                stale.append(path)
+        return stale
+
+    @_write_operation("git add --refresh", wait=False)
+    def refresh_index(self, file_paths):
+        """
+        指定したパスだけ、インデックスのstat情報を作業ツリーに合わせて更新
+
+        内容はステージしない。index.lock を持つ時間を短くするため、
+        呼び出し側で少数ずつに分けて渡す。
+        他のgitがロックしている間は何もせず失敗を返す(ロックを待たない)
+
+        Args:
+            file_paths: 更新するパス
+        """
+        cmd = "git add --refresh"
+        description = "インデックスを更新"
+        try:
+            proc = GitProcess(
+                self.repo.working_tree_dir,
+                ["--literal-pathspecs", "add", "--refresh", "--", *file_paths],
+            )
+            output = "\n".join(proc.iter_lines())
+            returncode = proc.wait(check=False)
+            if "index.lock" in proc.stderr:
+                # 確認した直後に他のgitがロックした
+                return CommandResult(
+                    success=False,
+                    command=cmd,
+                    description=description,
+                    error_message=LOCKED_MESSAGE,
+                )
+            if returncode != 0:
+                raise GitProcessError(proc.args, returncode, proc.stderr)
+            return CommandResult(
+                success=True, command=cmd, description=description, output=output
+            )
+        except Exception as e:
+            return self._handle_error(e, cmd, description)
+
+    # コマンドラインの長さ制限を超えないよう、パスをこの件数ずつ渡す
+    NUMSTAT_BATCH_SIZE = 500
+
+    def read_numstat(self, file_paths, cached=False, token=None):
+        """
+        ファイルごとの追加・削除行数を取得(失敗時は例外を送出)
+
+        Args:
+            file_paths: 対象のパス
+            cached: Trueならステージ済みの変更(HEAD vs Index)、
+                Falseなら未ステージの変更(Index vs 作業ツリー)
+            token: 中断用の CancelToken
+
+        Returns:
+            dict: {パス: DiffStat}。差分の無いパスは含まれない
+        """
+        stats = {}
+        # 未ステージの変更は diff-files で取得する(porcelainの git diff は
+        # GIT_OPTIONAL_LOCKS=0 でもインデックスのstat情報を書き換えるため)
+        command = ["diff", "--cached"] if cached else ["diff-files"]
+        base_args = ["--literal-pathspecs", *command, "--numstat", "-z", "--no-renames"]
+        paths = list(file_paths)
+        for start in range(0, len(paths), self.NUMSTAT_BATCH_SIZE):
+            chunk = paths[start : start + self.NUMSTAT_BATCH_SIZE]
+            proc = GitProcess(
+                self.repo.working_tree_dir, [*base_args, "--", *chunk], token=token
+            )
+            for record in proc.iter_chunks(b"\0"):
+                # -z 指定時は "追加\t削除\tパス"(バイナリは "-\t-\tパス")
+                added, deleted, path = record.split(b"\t", 2)
+                path = path.decode("utf-8", errors="surrogateescape")
+                if added == b"-":
+                    stats[path] = DiffStat(binary=True)
+                else:
+                    stats[path] = DiffStat(int(added), int(deleted))
+            proc.wait()
+        return stats
+
+    def read_changed_files(self):
+        """
+        変更されたファイルを取得(失敗時は例外を送出)
+
+        バックグラウンドの再検証など、失敗を空の結果と区別したい場合に使う。
+        git status を1回だけ実行する(git diff はインデックスのstat情報を
+        GIT_OPTIONAL_LOCKS=0 でも書き換えてしまうため使わない)
+        """
+        return read_status(self.repo.working_tree_dir)
+
+
+def read_status(work_dir, token=None, branch=None):
+    """
+    git status を1回実行し、変更されたファイルを分類する
+
+    サブモジュールは別のコミットがチェックアウトされた場合だけ変更として扱い、
+    中身の変更は調べない(git status はサブモジュールを1つずつ調べて遅いため、
+    core.submodules でサブモジュールごとに並列に取得する)
+
+    Args:
+        work_dir: 作業ツリーのパス
+        token: 中断用の CancelToken
+        branch: 辞書を渡すと、HEADのコミット("oid")とブランチ名("head")を入れる
+            (未コミットなら "oid"、detached HEAD なら "head" はNone)
+
+    Returns:
+        dict: get_changed_files() と同じ形式
+    """
+    staged = []
+    unstaged = []
+    untracked = []
+    deleted = []
+
+    args = [
+        "status",
+        "--porcelain=v2",
+        "-z",
+        "--untracked-files=all",
+        "--no-renames",
+        "--ignore-submodules=dirty",
+    ]
+    if branch is not None:
+        args += ["--branch", "--no-ahead-behind"]
+    proc = GitProcess(work_dir, args, token=token)
+    skip_next = False
+    for record in proc.iter_chunks(b"\0"):
+        if skip_next:
+            # 名前変更の元のパス
+            skip_next = False
+            continue
+        if not record:
+            continue
+        kind = record[:1]
+        if kind == b"#":
+            if branch is not None:
+                key, _, value = record[2:].decode("utf-8", "replace").partition(" ")
+                if key == "branch.oid":
+                    branch["oid"] = None if value == "(initial)" else value
+                elif key == "branch.head":
+                    branch["head"] = None if value == "(detached)" else value
+            continue
+        if kind == b"?":
+            untracked.append(record[2:].decode("utf-8", errors="surrogateescape"))
+            continue
+        # "1 XY sub mH mI mW hH hI パス"、"u XY sub m1 m2 m3 mW h1 h2 h3 パス"
+        # X はHEADとインデックス、Y はインデックスと作業ツリーの比較("." は変更なし)
+        fields = {b"1": 8, b"2": 9, b"u": 10}.get(kind)
+        if fields is None:
+            continue
+        path = record.split(b" ", fields)[-1].decode("utf-8", errors="surrogateescape")
+        skip_next = kind == b"2"
+        x, y = chr(record[2]), chr(record[3])
+        if kind == b"u":
+            # コンフリクト中
+            unstaged.append(path)
+            continue
+        if x != ".":
+            staged.append(path)
+        if y == "D":
+            deleted.append(path)
+        elif y != ".":
+            unstaged.append(path)
+    proc.wait()
+
+    return {
+        "staged": staged,
+        "unstaged": unstaged,
+        "untracked": untracked,
+        "deleted": deleted,
+    }
+
+
+def read_worktrees(work_dir, token=None):
+    """
+    git worktree list を実行してワークツリーの一覧を取得
+
+    Args:
+        work_dir: いずれかのワークツリーのパス
+        token: 中断用の CancelToken
+
+    Returns:
+        List[Worktree]: 先頭がメインの作業ツリー
+    """
+    worktrees = []
+    current = None
+    proc = GitProcess(work_dir, ["worktree", "list", "--porcelain", "-z"], token=token)
+    for record in proc.iter_chunks(b"\0"):
+        # 1項目は "worktree パス"、"HEAD コミット"、"branch refs/heads/名前" 等の
+        # 属性の並びで、空のレコードで区切られる
+        if not record:
+            current = None
+            continue
+        key, _, value = record.decode("utf-8", errors="surrogateescape").partition(" ")
+        if key == "worktree":
+            current = Worktree(os.path.normpath(value), is_main=not worktrees)
+            worktrees.append(current)
+        elif current is None:
+            continue
+        elif key == "HEAD":
+            current.head = value
+        elif key == "branch":
+            current.branch = value.removeprefix("refs/heads/")
+        elif key == "bare":
+            current.bare = True
+        elif key == "locked":
+            current.locked = True
+        elif key == "prunable":
+            current.prunable = True
+    proc.wait()
+    return worktrees
+
+
+def _read_trace2_timings(trace_path):
+    """
+    GIT_TRACE2_EVENT の出力からフックごとの実行時間を集計
+
+    Returns:
+        dict: {"hooks": {フック名: 秒}, "total": コマンド全体の秒数}
+    """
+    hooks = {}
+    total = None
+    names = {}
+    try:
+        with open(trace_path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                # フックが呼んだgitのイベント(sidが入れ子になる)は無視する
+                if "/" in event.get("sid", ""):
+                    continue
+                kind = event.get("event")
+                if kind == "child_start" and event.get("child_class") == "hook":
+                    names[event["child_id"]] = event.get("hook_name", "hook")
+                elif kind == "child_exit" and event.get("child_id") in names:
+                    name = names[event["child_id"]]
+                    hooks[name] = hooks.get(name, 0.0) + event.get("t_rel", 0.0)
+                elif kind == "exit":
+                    total = event.get("t_abs")
+    except OSError as e:
+        logger.debug("trace2の読み込みに失敗: %s", e)
+    return {"hooks": hooks, "total": total}
@@ -0,0 +1,266 @@
+"""gitコマンドをサブプロセスとして実行し、出力を逐次読み取る"""
+
+import os
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils import metrics, tracing
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# すべてのgitコマンドに設定する環境変数
+# status 等の読み取りはインデックスのstat情報を更新するため index.lock を取るが、
+# これを止めて、ターミナルで同時に実行されたgitのロックを奪わないようにする。
+# add や commit 等が取る必須のロックには影響しない(--no-optional-locks と同じ)
+READ_ENV = {"GIT_OPTIONAL_LOCKS": "0"}
+
+
+class GitProcessError(Exception):
+    """gitコマンドが0以外で終了した"""
+
+    def __init__(
+        self, args: List[str], returncode: int, stderr: str, cancelled: bool = False
+    ):
+        super().__init__(stderr.strip() or f"git {' '.join(args)} failed")
+        self.args_list = args
+        self.returncode = returncode
+        self.stderr = stderr
+        self.cancelled = cancelled  # cancel() による中断かどうか
+
+
+class CancelToken:
+    """
+    実行中の GitProcess をまとめて中断するためのトークン
+
+    GUIスレッドで cancel() すると、このトークンで起動したプロセスが終了し、
+    以降に起動しようとしたプロセスも GitProcessError になる
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._processes = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        """中断(どのスレッドからでも呼べる)"""
+        with self._lock:
+            self._cancelled = True
+            processes = list(self._processes)
+        for proc in processes:
+            proc.cancel()
+
+    def _track(self, proc: "GitProcess") -> bool:
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._processes.add(proc)
+            return True
+
+    def _release(self, proc: "GitProcess"):
+        with self._lock:
+            self._processes.discard(proc)
+
+
+class GitProcess:
+    """
+    1回分のgitコマンドの実行
+
+    出力は行単位(またはNUL区切り)で逐次取り出せ、cancel() で別スレッドから
+    いつでも中断できる
+
+    使用例:
+        proc = GitProcess(repo_path, ["log", "--oneline"])
+        for line in proc.iter_lines():
+            ...
+        proc.wait()
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+        stdin_data: Optional[bytes] = None,
+        merge_stderr: bool = False,
+        token: Optional[CancelToken] = None,
+    ):
+        self.repo_path = repo_path
+        self.args = list(args)
+        self._env = dict(os.environ, **READ_ENV)
+        self._env.update(env or {})
+        # バックグラウンドで認証プロンプトを待ち続けないようにする
+        self._env.setdefault("GIT_TERMINAL_PROMPT", "0")
+        self._stdin_data = stdin_data
+        self._merge_stderr = merge_stderr
+        self._proc: Optional[subprocess.Popen] = None
+        self._traced_at: Optional[float] = None
+        self._stderr_chunks: List[bytes] = []
+        self._stderr_thread: Optional[threading.Thread] = None
+        self._cancelled = threading.Event()
+        self._token = token
+
+    @property
+    def cancelled(self) -> bool:
+        """cancel() されたかどうか"""
+        return self._cancelled.is_set()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._proc.pid if self._proc is not None else None
+
+    def start(self) -> "GitProcess":
+        """プロセスを起動"""
+        if self._proc is not None:
+            return self
+        if self._token is not None and not self._token._track(self):
+            self._cancelled.set()
+        if self._cancelled.is_set():
+            raise GitProcessError(self.args, -1, "cancelled", cancelled=True)
+
+        creationflags = 0
+        if os.name == "nt":
+            creationflags = subprocess.CREATE_NO_WINDOW
+        has_stdin = self._stdin_data is not None
+        metrics.increment("spawn.git")
+        self._traced_at = time.perf_counter() if tracing.is_enabled() else None
+        self._proc = subprocess.Popen(
+            ["git", "-C", self.repo_path, *self.args],
+            stdin=subprocess.PIPE if has_stdin else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT if self._merge_stderr else subprocess.PIPE,
+            env=self._env,
+            creationflags=creationflags,
+        )
+        if self._cancelled.is_set():
+            # 起動中に cancel() された
+            self._proc.kill()
+        if not self._merge_stderr:
+            # stderrが詰まってデッドロックしないよう別スレッドで読み捨てる
+            self._stderr_thread = threading.Thread(
+                target=self._drain_stderr, daemon=True
+            )
+            self._stderr_thread.start()
+        if has_stdin:
+            try:
+                self._proc.stdin.write(self._stdin_data)
+                self._proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        return self
+
+    def iter_chunks(self, separator: bytes = b"\n") -> Iterator[bytes]:
+        """
+        出力を区切り文字ごとに逐次取得(区切り文字は含まない)
+
+        Args:
+            separator: 区切り文字(b"\\n" または -z 指定時の b"\\0")
+        """
+        self.start()
+        stdout = self._proc.stdout
+        buffer = b""
+        while True:
+            data = stdout.read1(65536)
+            if not data:
+                break
+            buffer += data
+            *parts, buffer = buffer.split(separator)
+            yield from parts
+        if buffer:
+            yield buffer
+
+    def iter_lines(self, encoding: str = "utf-8") -> Iterator[str]:
+        """出力を1行ずつ文字列として取得"""
+        for chunk in self.iter_chunks(b"\n"):
+            yield chunk.rstrip(b"\r").decode(encoding, errors="replace")
+
+    def wait(self, check: bool = True) -> int:
+        """
+        終了を待つ
+
+        Args:
+            check: Trueなら0以外の終了コードで GitProcessError を送出
+
+        Returns:
+            int: 終了コード
+        """
+        self.start()
+        # 読み残した出力があれば捨てる
+        if self._proc.stdout is not None:
+            self._proc.stdout.read()
+        returncode = self._proc.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+        if self._token is not None:
+            self._token._release(self)
+        if self._traced_at is not None:
+            tracing.complete(
+                f"git {self.args[0]}",
+                "git",
+                self._traced_at,
+                time.perf_counter(),
+                {"args": self.args[:20], "pid": self.pid, "returncode": returncode},
+            )
+            self._traced_at = None
+        if check and returncode != 0:
+            if self._cancelled.is_set():
+                raise GitProcessError(
+                    self.args, returncode, "cancelled", cancelled=True
+                )
+            raise GitProcessError(self.args, returncode, self.stderr)
+        return returncode
+
+    def run(self, check: bool = True) -> str:
+        """最後まで実行して標準出力を返す"""
+        output = b"".join(chunk + b"\n" for chunk in self.iter_chunks())
+        self.wait(check)
+        return output.decode("utf-8", errors="replace")
+
+    @property
+    def stderr(self) -> str:
+        return b"".join(self._stderr_chunks).decode("utf-8", errors="replace")
+
+    def cancel(self):
+        """実行を中断(どのスレッドからでも呼べる)"""
+        self._cancelled.set()
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            logger.debug("gitプロセスを中断します: git %s", " ".join(self.args))
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def _drain_stderr(self):
+        for chunk in iter(lambda: self._proc.stderr.read(65536), b""):
+            self._stderr_chunks.append(chunk)
+
+
+def run_git(
+    repo_path: str,
+    args: List[str],
+    on_line: Optional[Callable[[str], None]] = None,
+    **kwargs,
+) -> str:
+    """
+    gitコマンドを実行して出力を返す
+
+    Args:
+        repo_path: リポジトリのパス
+        args: git以降の引数
+        on_line: 各行を受け取るコールバック(逐次呼ばれる)
+    """
+    proc = GitProcess(repo_path, args, **kwargs)
+    lines = []
+    for line in proc.iter_lines():
+        lines.append(line)
+        if on_line is not None:
+            on_line(line)
+    proc.wait()
+    return "\n".join(lines)
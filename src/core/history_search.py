@@ -0,0 +1,162 @@
+"""コミット履歴の検索(git log -S / -G / --grep / --author)を逐次実行する"""
+
+import time
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_process import CancelToken, GitProcess
+from core.jobs import JobRunner
+from models.history import LogEntry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 検索の種類と git log のオプション(検索文字列を直後に連結する)
+SEARCH_MODES = {
+    "message": "--grep=",  # コミットメッセージ
+    "author": "--author=",  # 作者(名前またはメールアドレス)
+    "pickaxe": "-S",  # 文字列の出現回数が変わったコミット(追加・削除)
+    "regex": "-G",  # 差分の行が正規表現に一致するコミット
+}
+
+# フィールドは \x1f、コミットは -z による \0 で区切る
+_FORMAT = "%H%x1f%an%x1f%ae%x1f%at%x1f%s"
+# 見つかったコミットをまとめてGUIに通知する間隔(秒)
+_EMIT_INTERVAL = 0.05
+
+
+def search_history(
+    repo_path: str,
+    mode: str,
+    query: str,
+    ignore_case: bool,
+    all_branches: bool,
+    max_count: int,
+    token: CancelToken,
+    progress: Callable,
+) -> int:
+    """
+    ワーカースレッドで git log を実行し、見つかったコミットを progress で逐次通知する
+
+    最初の1件はすぐに通知し、以降は一定間隔でまとめて通知する
+
+    Returns:
+        int: 見つかったコミットの数
+    """
+    args = ["log", "-z", f"--format={_FORMAT}", f"--max-count={max_count}"]
+    args.append(SEARCH_MODES[mode] + query)
+    if ignore_case:
+        args.append("--regexp-ignore-case")
+    if all_branches:
+        args.append("--all")
+
+    proc = GitProcess(repo_path, args, token=token)
+    batch: List[LogEntry] = []
+    count = 0
+    last_emit = 0.0
+    for record in proc.iter_chunks(b"\0"):
+        fields = record.decode("utf-8", errors="replace").split("\x1f")
+        if len(fields) != 5:
+            continue
+        sha, author, mail, author_time, subject = fields
+        batch.append(LogEntry(sha.strip(), author, mail, int(author_time), subject))
+        count += 1
+        now = time.monotonic()
+        if now - last_emit >= _EMIT_INTERVAL:
+            progress(batch)
+            batch = []
+            last_emit = now
+    proc.wait()
+    if batch:
+        progress(batch)
+    return count
+
+
+class HistorySearcher(QObject):
+    """
+    履歴検索をバックグラウンドで実行し、見つかったコミットを逐次通知する
+
+    新しい検索を始めると、実行中の検索は中断される
+    """
+
+    results_ready = Signal(list)  # LogEntryのリスト(見つかった順)
+    finished = Signal(int)  # 見つかった件数
+    failed = Signal(str)  # エラーメッセージ
+
+    MAX_COUNT = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 大きな履歴の検索は時間がかかるため、他のジョブとは別のスレッドで実行する
+        self._jobs = JobRunner(max_threads=1, parent=self)
+        self._repo_path: Optional[str] = None
+        self._token: Optional[CancelToken] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._token is not None
+
+    def set_repository(self, repo_path: Optional[str]):
+        """対象のリポジトリを切り替え(実行中の検索は中断)"""
+        self.cancel()
+        self._repo_path = repo_path
+
+    def search(
+        self,
+        mode: str,
+        query: str,
+        ignore_case: bool = True,
+        all_branches: bool = False,
+    ):
+        """
+        検索を開始(実行中の検索は中断)
+
+        Args:
+            mode: SEARCH_MODES のキー
+            query: 検索文字列(message/author/regex は正規表現)
+            ignore_case: 大文字と小文字を区別しない
+            all_branches: すべてのブランチを対象にする
+        """
+        self.cancel()
+        if self._repo_path is None or not query:
+            return
+
+        token = CancelToken()
+        self._token = token
+        self._jobs.submit(
+            "history-search",
+            search_history,
+            self._repo_path,
+            mode,
+            query,
+            ignore_case,
+            all_branches,
+            self.MAX_COUNT,
+            token,
+            on_progress=lambda entries: self._on_progress(token, entries),
+            on_finished=lambda count: self._on_finished(token, count),
+            on_failed=lambda error: self._on_failed(token, error),
+        )
+
+    def cancel(self):
+        """実行中の検索を中断"""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    # ==================== プライベートメソッド ====================
+
+    def _on_progress(self, token: CancelToken, entries: list):
+        if token is self._token:
+            self.results_ready.emit(entries)
+
+    def _on_finished(self, token: CancelToken, count: int):
+        if token is self._token:
+            self._token = None
+            self.finished.emit(count)
+
+    def _on_failed(self, token: CancelToken, error: str):
+        if token is self._token:
+            self._token = None
+            self.failed.emit(error)
@@ -0,0 +1,240 @@
+"""
+.git/index を直接読み取る読み取り専用のリーダー
+
+GitPythonの IndexFile はエントリごとにPythonオブジェクトを作るため、
+大きなリポジトリでは時間もメモリもかかる。ここではファイルをmmapで読み、
+パス・モード・oid・サイズ・フラグを配列にまとめて保持する。
+
+対応形式: index v2 / v3 / v4(パスの前方一致圧縮)
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional
+
+_SIGNATURE = b"DIRC"
+_HEADER = struct.Struct(">4sII")
+# ctime(秒,ナノ秒) mtime(秒,ナノ秒) dev ino mode uid gid size
+_STAT = struct.Struct(">10I")
+_FLAGS = struct.Struct(">H")
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_STAGE_SHIFT = 12
+_FLAG_NAME_MASK = 0x0FFF
+
+HASH_SIZES = {"sha1": 20, "sha256": 32}
+
+
+class IndexFormatError(Exception):
+    """indexファイルの形式が不正"""
+
+
+class GitIndex:
+    """
+    indexの全エントリを配列で保持する
+
+    エントリは番号(0..len-1)で参照する。並び順はindexと同じ(パス順、同じパスはステージ順)
+
+    使用例:
+        index = GitIndex.read(os.path.join(git_dir, "index"))
+        for i in range(len(index)):
+            print(index.path(i), index.size(i))
+    """
+
+    def __init__(self, version: int, hash_size: int):
+        self.version = version
+        self.hash_size = hash_size
+        self.modes = array("I")
+        self.sizes = array("I")  # 32bitで切り詰められたファイルサイズ
+        self.mtimes = array("I")
+        self.flags = array("H")
+        self._oids = bytearray()
+        self._paths = bytearray()  # パスを連結したもの
+        self._path_ends = array("I")  # 各パスの終端位置
+
+    @classmethod
+    def read(cls, index_path: str, object_format: str = "sha1") -> "GitIndex":
+        """
+        indexファイルを読み込む
+
+        Args:
+            index_path: indexファイルのパス
+            object_format: リポジトリのハッシュ形式("sha1" または "sha256")
+
+        Returns:
+            GitIndex: ファイルが空・存在しない場合はエントリ0件
+        """
+        hash_size = HASH_SIZES.get(object_format, 20)
+        try:
+            f = open(index_path, "rb")
+        except FileNotFoundError:
+            return cls(2, hash_size)
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(2, hash_size)
+            # Windowsではmmap中のファイルを置き換えられないため、読み終えたらすぐ閉じる
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return cls._parse(data, hash_size)
+
+    @classmethod
+    def _parse(cls, data, hash_size: int) -> "GitIndex":
+        if len(data) < _HEADER.size:
+            raise IndexFormatError("indexファイルが短すぎます")
+        signature, version, count = _HEADER.unpack_from(data, 0)
+        if signature != _SIGNATURE:
+            raise IndexFormatError("indexファイルではありません")
+        if version not in (2, 3, 4):
+            raise IndexFormatError(f"未対応のindexバージョンです: {version}")
+
+        index = cls(version, hash_size)
+        modes, sizes, mtimes = index.modes, index.sizes, index.mtimes
+        flags_array, oids = index.flags, index._oids
+        paths, path_ends = index._paths, index._path_ends
+
+        stat_unpack = _STAT.unpack_from
+        flags_unpack = _FLAGS.unpack_from
+        find = data.find
+        previous = b""
+        pos = _HEADER.size
+
+        for _ in range(count):
+            entry_start = pos
+            stat = stat_unpack(data, pos)
+            pos += _STAT.size
+            oid = data[pos : pos + hash_size]
+            pos += hash_size
+            (flags,) = flags_unpack(data, pos)
+            pos += _FLAGS.size
+            if flags & _FLAG_EXTENDED:
+                if version < 3:
+                    raise IndexFormatError("v2のindexに拡張フラグがあります")
+                pos += 2  # skip-worktree / intent-to-add(ここでは使わない)
+
+            if version == 4:
+                # 直前のパスの末尾 strip バイトを削り、続くNUL終端の文字列を足す
+                strip, pos = _read_varint(data, pos)
+                end = find(b"\0", pos)
+                if end < 0:
+                    raise IndexFormatError("パスの終端が見つかりません")
+                path = previous[: len(previous) - strip] + data[pos:end]
+                pos = end + 1
+                previous = path
+            else:
+                name_length = flags & _FLAG_NAME_MASK
+                if name_length < _FLAG_NAME_MASK:
+                    end = pos + name_length
+                else:
+                    end = find(b"\0", pos)
+                    if end < 0:
+                        raise IndexFormatError("パスの終端が見つかりません")
+                path = data[pos:end]
+                # エントリ全体が8バイト境界になるよう1〜8バイトのNULで埋められている
+                pos = entry_start + ((end - entry_start + 8) & ~7)
+
+            mtimes.append(stat[2])
+            modes.append(stat[6])
+            sizes.append(stat[9])
+            oids += oid
+            flags_array.append(flags)
+            paths += path
+            path_ends.append(len(paths))
+
+        return index
+
+    # ==================== エントリの参照 ====================
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def path_bytes(self, i: int) -> bytes:
+        start = self._path_ends[i - 1] if i > 0 else 0
+        return bytes(self._paths[start : self._path_ends[i]])
+
+    def path(self, i: int) -> str:
+        """i番目のエントリのパス(リポジトリルートからの相対パス)"""
+        return self.path_bytes(i).decode("utf-8", errors="surrogateescape")
+
+    def oid(self, i: int) -> str:
+        """i番目のエントリのオブジェクトID(16進)"""
+        start = i * self.hash_size
+        return self._oids[start : start + self.hash_size].hex()
+
+    def mode(self, i: int) -> int:
+        return self.modes[i]
+
+    def size(self, i: int) -> int:
+        return self.sizes[i]
+
+    def stage(self, i: int) -> int:
+        """コンフリクト中のステージ番号(通常は0)"""
+        return (self.flags[i] & _FLAG_STAGE_MASK) >> _FLAG_STAGE_SHIFT
+
+    def paths(self) -> Iterator[str]:
+        """全エントリのパス(コンフリクト中のパスは重複しない)"""
+        previous = None
+        for i in range(len(self)):
+            path = self.path_bytes(i)
+            if path != previous:
+                yield path.decode("utf-8", errors="surrogateescape")
+            previous = path
+
+    def find(self, path: str) -> Optional[int]:
+        """
+        パスのエントリ番号を二分探索で取得
+
+        Returns:
+            int or None: 見つからなければNone(コンフリクト中は最小のステージ)
+        """
+        target = path.encode("utf-8", errors="surrogateescape")
+        i = bisect_left(_PathView(self), target)
+        if i < len(self) and self.path_bytes(i) == target:
+            return i
+        return None
+
+    def __contains__(self, path: str) -> bool:
+        return self.find(path) is not None
+
+    # ==================== 統計 ====================
+
+    @property
+    def file_count(self) -> int:
+        """ファイル数(ステージ0のエントリ数)"""
+        return sum(1 for flags in self.flags if not flags & _FLAG_STAGE_MASK)
+
+    @property
+    def total_size(self) -> int:
+        """ステージ0のファイルサイズの合計(作業ツリーのstat値)"""
+        return sum(
+            size
+            for size, flags in zip(self.sizes, self.flags)
+            if not flags & _FLAG_STAGE_MASK
+        )
+
+
+class _PathView:
+    """bisect用に GitIndex をパス(bytes)の列として見せる"""
+
+    def __init__(self, index: GitIndex):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._index.path_bytes(i)
+
+
+def _read_varint(data, pos: int):
+    """index v4 で使われる可変長整数(gitのoffset形式)を読む"""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
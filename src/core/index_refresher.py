@@ -0,0 +1,192 @@
+"""アイドル時にインデックスのstat情報を更新するスケジューラ"""
+
+import os
+import time
+from typing import Callable, Iterable, Optional
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from core.fetch_scheduler import _app_is_active
+from core.git_operations import GitOperations
+from core.jobs import JobRunner
+from core.write_queue import _git_running_in
+from models import CommandResult
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 1回の git add --refresh に渡すパスの数(index.lock を持つ時間を短くする)
+REFRESH_BATCH_SIZE = 100
+# 1回のアイドル更新で扱うパスの上限(残りは次の機会に更新する)
+MAX_REFRESH_PATHS = 1000
+# この秒数以内にインデックスやHEADが更新されていたら、ターミナル等のgitが
+# 使っている最中とみなして更新を見送る
+CLI_QUIET_SECONDS = 30
+
+
+def _recently_used(git_ops: GitOperations, quiet_seconds: float) -> bool:
+    """
+    他のgitが最近リポジトリを使ったかどうか
+
+    LeafGit自身の書き込みと区別できないため、その直後も見送る
+    (次の機会に更新される)
+    """
+    git_dir = git_ops.repo.git_dir
+    now = time.time()
+    for name in ("index", "HEAD", os.path.join("logs", "HEAD")):
+        try:
+            mtime = os.stat(os.path.join(git_dir, name)).st_mtime
+        except OSError:
+            continue
+        if now - mtime < quiet_seconds:
+            return True
+    return bool(_git_running_in([git_dir, git_ops.repo.working_tree_dir]))
+
+
+def refresh_index_if_needed(
+    repo_path: str,
+    known_changed: Iterable[str],
+    quiet_seconds: float = CLI_QUIET_SECONDS,
+) -> Optional[CommandResult]:
+    """
+    ワーカースレッドで、stat情報が古いパスだけインデックスを更新
+
+    REFRESH_BATCH_SIZE 個ずつ git add --refresh を実行し、index.lock を
+    持つ時間を短くする。バッチごとにロックを確認し、他のgitがロックしていれば
+    待たずにそこで止める
+
+    Args:
+        repo_path: リポジトリのパス
+        known_changed: 変更されているとわかっているパス
+        quiet_seconds: この秒数以内に他のgitが使っていたら更新しない
+            (0なら確認しない)
+
+    Returns:
+        CommandResult or None: 更新しなかった場合はNone
+    """
+    with GitOperations.open_repository(repo_path) as git_ops:
+        # ロックの有無を先に見て、ターミナルのgitが使っている間は触らない
+        if git_ops.is_index_locked():
+            logger.debug("インデックスがロックされているため更新を見送りました")
+            return None
+        if quiet_seconds > 0 and _recently_used(git_ops, quiet_seconds):
+            logger.debug("他のgitが最近使っていたため更新を見送りました")
+            return None
+        paths = git_ops.stale_index_paths(known_changed, limit=MAX_REFRESH_PATHS)
+        result = None
+        for i in range(0, len(paths), REFRESH_BATCH_SIZE):
+            result = git_ops.refresh_index(paths[i : i + REFRESH_BATCH_SIZE])
+            if not result.success:
+                break
+        return result
+
+
+class IndexRefresher(QObject):
+    """
+    開いているリポジトリのインデックスを、アイドル時にまとめて更新する
+
+    読み取りはインデックスを書き換えない(GIT_OPTIONAL_LOCKS=0)ため、
+    そのままでは status のたびに内容を読み直すファイルが増えていく。
+    ユーザーがLeafGitを使っていて、他のジョブが無く、インデックスが
+    ロックされておらず、他のgitが最近使っていない時だけ、stat情報が古いパスを
+    少数ずつ更新する。更新中は index.lock を短時間持つため、その間に
+    ターミナルのgitが書き込むと失敗することがある。
+    """
+
+    # 更新のジョブを実行中かどうか(インデックスへの書き込み)
+    running_changed = Signal(bool)
+
+    INTERVAL = 60  # 秒
+
+    def __init__(
+        self,
+        jobs: JobRunner,
+        changed_paths: Callable[[], Iterable[str]] = tuple,
+        is_active: Callable[[], bool] = _app_is_active,
+        parent=None,
+    ):
+        """
+        Args:
+            jobs: ジョブを実行する JobRunner
+            changed_paths: 変更されているとわかっているパスを返す関数
+            is_active: アプリケーションが前面で使われているかどうかを返す関数
+        """
+        super().__init__(parent)
+        self._jobs = jobs
+        self._changed_paths = changed_paths
+        self._is_active = is_active
+        self._repo_path: Optional[str] = None
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def start(self, repo_path: str):
+        """リポジトリの定期更新を開始"""
+        self._repo_path = repo_path
+        self._schedule()
+
+    def stop(self):
+        """定期更新を停止"""
+        self._repo_path = None
+        self._timer.stop()
+
+    @property
+    def is_running(self) -> bool:
+        """更新のジョブを実行中かどうか"""
+        return self._running
+
+    # ==================== プライベートメソッド ====================
+
+    def _schedule(self):
+        self._timer.stop()
+        if self._repo_path is not None:
+            self._timer.start(self.INTERVAL * 1000)
+
+    def _on_timeout(self):
+        if not self._is_active():
+            # ターミナル等でgitを使っている可能性があるので触らない
+            self._schedule()
+            return
+        self._run_refresh()
+
+    def _run_refresh(self):
+        if self._repo_path is None or self._running:
+            return
+        self._set_running(True)
+        repo_path = self._repo_path
+        self._jobs.submit(
+            "index-refresh",
+            refresh_index_if_needed,
+            repo_path,
+            list(self._changed_paths()),
+            on_finished=lambda result: self._on_finished(repo_path, result),
+            on_failed=lambda error: self._on_failed(repo_path, error),
+            priority="idle",
+            repo=repo_path,
+            write=True,
+        )
+
+    def _set_running(self, running: bool):
+        self._running = running
+        self.running_changed.emit(running)
+
+    def _on_finished(self, repo_path: str, result: Optional[CommandResult]):
+        self._set_running(False)
+        if repo_path != self._repo_path:
+            return
+        if result is not None:
+            if result.success:
+                logger.debug("インデックスを更新しました")
+            else:
+                logger.debug(
+                    "インデックスを更新できませんでした: %s", result.error_message
+                )
+        self._schedule()
+
+    def _on_failed(self, repo_path: str, error: str):
+        self._set_running(False)
+        if repo_path != self._repo_path:
+            return
+        logger.info("インデックスの更新に失敗しました: %s", error)
+        self._schedule()
@@ -0,0 +1,332 @@
+"""バックグラウンドでGit処理を実行するためのジョブ"""
+
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Set
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from core.git_process import CancelToken
+from utils import metrics, tracing
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ジョブの優先度(先頭ほど優先)
+#   interactive : ユーザーが操作して結果を待っているもの(コミット等)
+#   background  : 画面に表示する情報の取得(ステータスの再検証、変更量の集計等)
+#   idle        : 他に何も実行していない時だけ行うもの(定期fetch等)
+JOB_PRIORITIES = ("interactive", "background", "idle")
+
+# 待ち時間の統計に使う直近のジョブ数
+_WAIT_SAMPLES = 200
+
+
+class JobSignals(QObject):
+    """ジョブの完了を通知するシグナル(GUIスレッドで受け取る)"""
+
+    finished = Signal(object)  # 戻り値
+    failed = Signal(str)  # エラーメッセージ
+    progress = Signal(object)  # 途中経過(ジョブごとに任意の値)
+    cancelled = Signal()  # 中断された(結果は捨てられる)
+
+
+class BackgroundJob(QRunnable):
+    """関数をスレッドプールで実行するジョブ"""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        *args,
+        priority: str = "background",
+        repo: Optional[str] = None,
+        write: bool = False,
+        stale_on_write: bool = False,
+        **kwargs,
+    ):
+        super().__init__()
+        self.name = name
+        self.signals = JobSignals()
+        self.priority = priority
+        self.repo = repo
+        self.write = write
+        self.stale_on_write = stale_on_write
+        self.token = CancelToken()
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        # トレースで、ワーカーでの完了とGUIスレッドでの受け取りを結ぶID
+        self.flow_id: Optional[int] = None
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self.setAutoDelete(False)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def enable_progress(self):
+        """関数に progress コールバックを渡し、signals.progress で通知する"""
+        self._kwargs["progress"] = self.signals.progress.emit
+
+    def enable_token(self):
+        """関数に token(CancelToken)を渡し、cancel() でgitプロセスを終了できるようにする"""
+        self._kwargs["token"] = self.token
+
+    def cancel(self):
+        """
+        ジョブを中断
+
+        token を受け取る関数ならgitプロセスが終了される。
+        そうでない場合も、結果は通知されず捨てられる
+        """
+        self.token.cancel()
+
+    def run(self):
+        if self.token.cancelled:
+            self.signals.cancelled.emit()
+            return
+        try:
+            with metrics.timed(f"job.{self.name}"):
+                result = self._fn(*self._args, **self._kwargs)
+        except Exception as e:
+            if self.token.cancelled or getattr(e, "cancelled", False):
+                logger.debug("ジョブ '%s' は中断されました", self.name)
+                self.signals.cancelled.emit()
+            else:
+                logger.warning("ジョブ '%s' が失敗しました: %s", self.name, e)
+                self.signals.failed.emit(str(e))
+            return
+        if self.token.cancelled:
+            logger.debug("ジョブ '%s' は中断されました(結果を破棄)", self.name)
+            self.signals.cancelled.emit()
+            return
+        self.flow_id = tracing.flow_start(f"job.{self.name}", "job")
+        self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    """
+    BackgroundJob を優先度順に実行し、完了まで参照を保持する
+
+    バックグラウンドのジョブはGUIスレッドのGitOperationsを共有せず、
+    自分でリポジトリを開いて処理を行う。
+
+    - interactive のジョブは予備のスレッドを使い、他のジョブの完了を待たない
+    - 同じリポジトリへの書き込みジョブ(write=True)は1つずつ実行する
+    - 書き込みで結果が古くなる読み取りジョブ(stale_on_write=True)は、
+      書き込みが投入されると中断され、書き込みが終わるまで開始しない
+    - idle の書き込み(インデックスの整理等)は読み取りの結果を変えないものに限る。
+      読み取りを中断せず、開始するまでは読み取りを待たせない
+    """
+
+    def __init__(self, max_threads: int = 2, parent=None):
+        super().__init__(parent)
+        self._max_threads = max_threads
+        self._pool = QThreadPool(self)
+        # interactive のジョブ用に1つ多く確保しておく
+        self._pool.setMaxThreadCount(max_threads + 1)
+        self._queues: Dict[str, Deque[BackgroundJob]] = {
+            priority: deque() for priority in JOB_PRIORITIES
+        }
+        self._running: Set[BackgroundJob] = set()
+        self._counts: Dict[str, Dict[str, int]] = {
+            priority: {"completed": 0, "failed": 0, "cancelled": 0}
+            for priority in JOB_PRIORITIES
+        }
+        self._waits: Dict[str, Deque[float]] = {
+            priority: deque(maxlen=_WAIT_SAMPLES) for priority in JOB_PRIORITIES
+        }
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable,
+        *args,
+        on_finished: Optional[Callable] = None,
+        on_failed: Optional[Callable] = None,
+        on_progress: Optional[Callable] = None,
+        on_cancelled: Optional[Callable] = None,
+        priority: str = "background",
+        repo: Optional[str] = None,
+        write: bool = False,
+        stale_on_write: bool = False,
+        cancellable: bool = False,
+        **kwargs,
+    ) -> BackgroundJob:
+        """
+        ジョブを投入
+
+        Args:
+            name: ログ用のジョブ名
+            fn: ワーカースレッドで実行する関数
+            on_finished: 戻り値を受け取るコールバック(GUIスレッドで呼ばれる)
+            on_failed: エラーメッセージを受け取るコールバック
+            on_progress: 途中経過を受け取るコールバック
+                (指定するとfnにキーワード引数 progress が渡される)
+            on_cancelled: 中断された時のコールバック
+                (省略した場合は on_failed が呼ばれる)
+            priority: JOB_PRIORITIES のいずれか
+            repo: 対象のリポジトリ(書き込みの直列化と中断の判定に使う)
+            write: リポジトリに書き込むジョブかどうか
+            stale_on_write: 同じリポジトリへの書き込みで結果が古くなるかどうか
+            cancellable: Trueならfnにキーワード引数 token が渡される
+        """
+        if priority not in self._queues:
+            raise ValueError(f"不明な優先度です: {priority}")
+        job = BackgroundJob(
+            name,
+            fn,
+            *args,
+            priority=priority,
+            repo=repo,
+            write=write,
+            stale_on_write=stale_on_write,
+            **kwargs,
+        )
+        if on_progress is not None:
+            job.enable_progress()
+            job.signals.progress.connect(on_progress)
+        if cancellable:
+            job.enable_token()
+        if on_finished is not None:
+            job.signals.finished.connect(self._traced(job, on_finished))
+        if on_failed is not None:
+            job.signals.failed.connect(on_failed)
+        if on_cancelled is not None:
+            job.signals.cancelled.connect(on_cancelled)
+        elif on_failed is not None:
+            job.signals.cancelled.connect(lambda: on_failed("中断されました"))
+        job.signals.finished.connect(lambda _: self._on_job_done(job, "completed"))
+        job.signals.failed.connect(lambda _: self._on_job_done(job, "failed"))
+        job.signals.cancelled.connect(lambda: self._on_job_done(job, "cancelled"))
+
+        if write and repo is not None and priority != "idle":
+            self.cancel_stale(repo)
+        self._queues[priority].append(job)
+        self._dispatch()
+        return job
+
+    def cancel_stale(self, repo: str) -> int:
+        """
+        書き込みで結果が古くなる読み取りジョブを中断
+
+        GUIスレッドで直接書き込んだ後にも呼ぶ
+
+        Returns:
+            int: 中断したジョブの数
+        """
+        cancelled = 0
+        for job in list(self._running):
+            if job.repo == repo and job.stale_on_write and not job.cancelled:
+                logger.debug("古くなったジョブ '%s' を中断します", job.name)
+                job.cancel()
+                cancelled += 1
+        for queue in self._queues.values():
+            for job in [j for j in queue if j.repo == repo and j.stale_on_write]:
+                logger.debug("古くなったジョブ '%s' を取り消します", job.name)
+                queue.remove(job)
+                job.cancel()
+                job.signals.cancelled.emit()
+                cancelled += 1
+        return cancelled
+
+    def metrics(self) -> Dict[str, dict]:
+        """
+        優先度ごとのキューの状態
+
+        Returns:
+            dict: {優先度: {'queued', 'running', 'completed', 'failed',
+                'cancelled', 'wait_avg', 'wait_max'}}。待ち時間は秒
+        """
+        result = {}
+        for priority in JOB_PRIORITIES:
+            waits = self._waits[priority]
+            result[priority] = {
+                "queued": len(self._queues[priority]),
+                "running": sum(1 for j in self._running if j.priority == priority),
+                **self._counts[priority],
+                "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "wait_max": max(waits, default=0.0),
+            }
+        return result
+
+    @property
+    def queue_depth(self) -> int:
+        """開始を待っているジョブの数"""
+        return sum(len(queue) for queue in self._queues.values())
+
+    def wait(self, msecs: int = -1) -> bool:
+        """実行中のジョブの完了を待つ"""
+        return self._pool.waitForDone(msecs)
+
+    # ==================== プライベートメソッド ====================
+
+    def _dispatch(self):
+        """開始できるジョブを優先度順に開始"""
+        for priority in JOB_PRIORITIES:
+            queue = self._queues[priority]
+            for job in list(queue):
+                if self._can_start(job):
+                    queue.remove(job)
+                    self._start(job)
+
+    def _can_start(self, job: BackgroundJob) -> bool:
+        if len(self._running) >= self._pool.maxThreadCount():
+            return False
+        if job.priority != "interactive":
+            shared = sum(1 for j in self._running if j.priority != "interactive")
+            if shared >= self._max_threads:
+                return False
+        if job.priority == "idle" and (
+            self._running or self._queues["interactive"] or self._queues["background"]
+        ):
+            return False
+        if job.repo is None:
+            return True
+        if job.write:
+            return not any(j.write and j.repo == job.repo for j in self._running)
+        if job.stale_on_write:
+            # 書き込みが終わってから読み取る
+            return not any(self._pending_writes(job.repo))
+        return True
+
+    def _pending_writes(self, repo: str):
+        for job in self._running:
+            if job.write and job.repo == repo:
+                yield job
+        for priority, queue in self._queues.items():
+            if priority == "idle":
+                # 待っている読み取りが終わるまで開始しないので、待つと進まなくなる
+                continue
+            for job in queue:
+                if job.write and job.repo == repo:
+                    yield job
+
+    def _start(self, job: BackgroundJob):
+        job.started_at = time.monotonic()
+        wait = job.started_at - job.submitted_at
+        self._waits[job.priority].append(wait)
+        metrics.record_latency(f"job_wait.{job.priority}", wait)
+        if wait >= 1.0:
+            logger.debug("ジョブ '%s' は開始まで %.2f秒 待ちました", job.name, wait)
+        self._running.add(job)
+        self._pool.start(job)
+
+    @staticmethod
+    def _traced(job: BackgroundJob, callback: Callable) -> Callable:
+        """結果を受け取るコールバックをトレースに記録する"""
+
+        def deliver(*args):
+            if not tracing.is_enabled():
+                return callback(*args)
+            with tracing.span(f"job.{job.name}.finished", "callback"):
+                tracing.flow_end(job.flow_id, f"job.{job.name}", "job")
+                return callback(*args)
+
+        return deliver
+
+    def _on_job_done(self, job: BackgroundJob, outcome: str):
+        self._counts[job.priority][outcome] += 1
+        self._running.discard(job)
+        self._dispatch()
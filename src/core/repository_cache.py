@@ -0,0 +1,124 @@
+"""最近開いたリポジトリと、その最後の状態のディスクキャッシュ"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from utils.logger import get_logger
+from utils.paths import get_data_dir
+
+logger = get_logger(__name__)
+
+MAX_RECENT = 10
+_RECENT_FILE = "recent_repositories.json"
+_SNAPSHOT_DIR = "snapshots"
+_SNAPSHOT_VERSION = 1
+
+
+class RepositoryCache:
+    """
+    最近開いたリポジトリの一覧と、リポジトリごとの状態スナップショットを保存する
+
+    スナップショットは起動直後の表示に使うだけで、必ずバックグラウンドで再検証される
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self._base_dir = Path(base_dir) if base_dir else get_data_dir()
+
+    # ==================== 最近開いたリポジトリ ====================
+
+    def get_recent(self) -> List[str]:
+        """最近開いたリポジトリのパス(新しい順)"""
+        data = self._read_json(self._base_dir / _RECENT_FILE)
+        if not isinstance(data, list):
+            return []
+        return [path for path in data if isinstance(path, str)]
+
+    def add_recent(self, path: str):
+        """リポジトリを最近開いた一覧の先頭に追加"""
+        path = os.path.abspath(path)
+        recent = [p for p in self.get_recent() if p != path]
+        recent.insert(0, path)
+        self._write_json(self._base_dir / _RECENT_FILE, recent[:MAX_RECENT])
+
+    def remove_recent(self, path: str):
+        """一覧から削除(存在しなくなったリポジトリ等)"""
+        path = os.path.abspath(path)
+        recent = [p for p in self.get_recent() if p != path]
+        self._write_json(self._base_dir / _RECENT_FILE, recent)
+        try:
+            self._snapshot_path(path).unlink()
+        except OSError:
+            pass
+
+    # ==================== スナップショット ====================
+
+    def save_snapshot(
+        self, path: str, files: dict, branch: Optional[str], branches: List[str]
+    ):
+        """
+        リポジトリの状態を保存
+
+        Args:
+            path: リポジトリのパス
+            files: get_changed_files() 形式の辞書
+            branch: 現在のブランチ名
+            branches: ブランチ一覧
+        """
+        path = os.path.abspath(path)
+        snapshot = {
+            "version": _SNAPSHOT_VERSION,
+            "path": path,
+            "saved_at": time.time(),
+            "branch": branch,
+            "branches": branches,
+            "files": files,
+        }
+        self._write_json(self._snapshot_path(path), snapshot)
+
+    def load_snapshot(self, path: str) -> Optional[dict]:
+        """
+        保存された状態を読み込む
+
+        Returns:
+            dict or None: save_snapshot() で保存した内容。無い・壊れている場合はNone
+        """
+        path = os.path.abspath(path)
+        snapshot = self._read_json(self._snapshot_path(path))
+        if (
+            not isinstance(snapshot, dict)
+            or snapshot.get("version") != _SNAPSHOT_VERSION
+            or snapshot.get("path") != path
+        ):
+            return None
+        return snapshot
+
+    # ==================== プライベートメソッド ====================
+
+    def _snapshot_path(self, path: str) -> Path:
+        key = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        return self._base_dir / _SNAPSHOT_DIR / f"{key}.json"
+
+    def _read_json(self, file_path: Path):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("キャッシュの読み込みに失敗: %s (%s)", file_path, e)
+            return None
+
+    def _write_json(self, file_path: Path, data):
+        # 書き込み途中で終了しても壊れないよう、一時ファイルから置き換える
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logger.warning("キャッシュの保存に失敗: %s (%s)", file_path, e)
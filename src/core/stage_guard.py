@@ -0,0 +1,92 @@
+"""ステージ前に、大きなファイルやGit LFSのポインタファイルが含まれていないか調べる"""
+
+import os
+import stat
+from typing import Iterable, List
+
+from core.git_process import GitProcess, GitProcessError
+from models.stage import StageScan
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# これ以上のファイルは、ステージ前に確認する(GitHubが警告を出すサイズ)
+DEFAULT_THRESHOLD = 50 * 1024 * 1024
+
+# Git LFSのポインタファイルの先頭と、ポインタファイルの最大サイズ
+LFS_POINTER_PREFIX = b"version https://git-lfs.github.com/spec/v1\n"
+LFS_POINTER_MAX_SIZE = 1024
+
+
+def scan_stage_paths(
+    work_dir: str, file_paths: Iterable[str], threshold: int = DEFAULT_THRESHOLD
+) -> StageScan:
+    """
+    ステージしようとしているファイルを検査する
+
+    内容は読まずに stat でサイズだけを調べる(ポインタファイルの判定のため、
+    小さなファイルは先頭だけ読む)。しきい値以上のファイルは、
+    .gitattributes でGit LFSの管理対象になっていなければ large_files に入る
+
+    Args:
+        work_dir: 作業ツリーのパス
+        file_paths: 作業ツリーからの相対パス
+        threshold: 大きなファイルとみなすサイズ(バイト、0以下なら調べない)
+
+    Returns:
+        StageScan: 検査結果
+    """
+    scan = StageScan(threshold=threshold)
+    candidates = []
+    with metrics.timed("stage.scan"):
+        for path in file_paths:
+            full_path = os.path.join(work_dir, path)
+            try:
+                st = os.lstat(full_path)
+            except OSError:
+                # 削除されたファイル
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            scan.sizes[path] = st.st_size
+            if 0 < threshold <= st.st_size:
+                candidates.append(path)
+            elif len(LFS_POINTER_PREFIX) <= st.st_size <= LFS_POINTER_MAX_SIZE:
+                if _is_lfs_pointer(full_path):
+                    scan.lfs_pointers.append(path)
+        if candidates:
+            tracked = _lfs_tracked(work_dir, candidates)
+            scan.large_files = [path for path in candidates if path not in tracked]
+    return scan
+
+
+def _is_lfs_pointer(full_path: str) -> bool:
+    try:
+        with open(full_path, "rb") as f:
+            return f.read(len(LFS_POINTER_PREFIX)) == LFS_POINTER_PREFIX
+    except OSError:
+        return False
+
+
+def _lfs_tracked(work_dir: str, file_paths: List[str]) -> set:
+    """.gitattributes で filter=lfs が指定されているパス"""
+    proc = GitProcess(
+        work_dir,
+        ["check-attr", "-z", "--stdin", "filter"],
+        stdin_data=b"".join(
+            path.encode("utf-8", "surrogateescape") + b"\0" for path in file_paths
+        ),
+    )
+    try:
+        # -z 指定時は "パス\0属性\0値\0" の繰り返し
+        fields = list(proc.iter_chunks(b"\0"))
+        proc.wait()
+    except GitProcessError as e:
+        logger.info("Git LFSの管理対象を調べられませんでした: %s", e)
+        return set()
+    tracked = set()
+    for i in range(0, len(fields) - 2, 3):
+        if fields[i + 2] == b"lfs":
+            tracked.add(fields[i].decode("utf-8", errors="surrogateescape"))
+    return tracked
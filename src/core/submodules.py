@@ -0,0 +1,229 @@
+"""サブモジュール(入れ子も含む)の状態を並列に取得する"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_operations import read_status
+from core.git_process import CancelToken, GitProcess, GitProcessError
+from core.jobs import JobRunner
+from models.submodule import SubmoduleStatus
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def list_submodules(work_dir: str, token: Optional[CancelToken] = None) -> List[str]:
+    """
+    .gitmodules に登録されたサブモジュールのパスを取得
+
+    Args:
+        work_dir: 作業ツリーのパス
+        token: 中断用の CancelToken
+
+    Returns:
+        List[str]: 作業ツリーからの相対パス
+    """
+    # ほとんどのリポジトリにはサブモジュールが無いので、gitを起動せずに判定する
+    if not os.path.isfile(os.path.join(work_dir, ".gitmodules")):
+        return []
+    proc = GitProcess(
+        work_dir,
+        ["config", "-f", ".gitmodules", "-z", "--get-regexp", r"^submodule\..*\.path$"],
+        token=token,
+    )
+    paths = []
+    for record in proc.iter_chunks(b"\0"):
+        # -z 指定時は "キー\n値"
+        _, _, value = record.partition(b"\n")
+        path = value.decode("utf-8", errors="surrogateescape").strip("/")
+        if path:
+            paths.append(path)
+    # 1 は該当するキーが無い場合
+    returncode = proc.wait(check=False)
+    if returncode not in (0, 1):
+        raise GitProcessError(
+            proc.args, returncode, proc.stderr, cancelled=proc.cancelled
+        )
+    return paths
+
+
+def read_submodule_status(
+    repo_path: str, path: str, token: Optional[CancelToken] = None
+) -> Tuple[SubmoduleStatus, List[str]]:
+    """
+    1つのサブモジュールの状態と、その中のサブモジュールを取得
+
+    Args:
+        repo_path: 最上位のリポジトリのパス
+        path: repo_path からのサブモジュールの相対パス
+        token: 中断用の CancelToken
+
+    Returns:
+        (SubmoduleStatus, 入れ子のサブモジュールの repo_path からの相対パス)
+    """
+    work_dir = os.path.join(repo_path, path)
+    if not os.path.exists(os.path.join(work_dir, ".git")):
+        return SubmoduleStatus(path, initialized=False), []
+
+    branch = {}
+    try:
+        files = read_status(work_dir, token=token, branch=branch)
+        nested = list_submodules(work_dir, token)
+    except GitProcessError as e:
+        if e.cancelled:
+            raise
+        logger.info("サブモジュールの状態を取得できませんでした: %s (%s)", path, e)
+        return SubmoduleStatus(path, error=str(e)), []
+    status = SubmoduleStatus(
+        path, head=branch.get("oid"), branch=branch.get("head"), files=files
+    )
+    return status, [f"{path}/{child}" for child in nested]
+
+
+def collect_submodule_status(
+    repo_path: str, max_workers: int, token: CancelToken, progress: Callable
+) -> int:
+    """
+    ワーカースレッドで、すべてのサブモジュールの状態を並列に取得する
+
+    最大 max_workers 個の git status を同時に実行し、取得できたものから
+    progress で通知する。入れ子のサブモジュールは親の取得後に追加する
+
+    Returns:
+        int: サブモジュールの数
+    """
+    count = 0
+    with metrics.timed("status.submodules"):
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="submodule"
+        ) as pool:
+            pending = {
+                pool.submit(read_submodule_status, repo_path, path, token)
+                for path in list_submodules(repo_path, token)
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    batch = []
+                    for future in done:
+                        status, nested = future.result()
+                        batch.append(status)
+                        for path in nested:
+                            pending.add(
+                                pool.submit(
+                                    read_submodule_status, repo_path, path, token
+                                )
+                            )
+                    count += len(batch)
+                    progress(batch)
+            except BaseException:
+                # 残りのプロセスも終了させてから抜ける
+                token.cancel()
+                raise
+    return count
+
+
+class SubmoduleLoader(QObject):
+    """
+    サブモジュールの状態をバックグラウンドで取得し、取得できたものから通知する
+
+    取得した状態は statuses() でいつでも参照できる(次の取得が終わるまでは
+    前回の状態を残す)。新しい取得を始めると、実行中の取得は中断される
+    """
+
+    status_ready = Signal(list)  # 取得できた SubmoduleStatus のリスト
+    finished = Signal(int)  # サブモジュールの数
+    failed = Signal(str)  # エラーメッセージ
+
+    # 同時に実行する git status の数の既定値の上限
+    MAX_WORKERS = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 親リポジトリのジョブ(ステータスの再検証等)を待たせないよう別のスレッドで実行する
+        self._jobs = JobRunner(max_threads=1, parent=self)
+        self._repo_path: Optional[str] = None
+        self._token: Optional[CancelToken] = None
+        self._statuses: Dict[str, SubmoduleStatus] = {}
+        self._received: set = set()
+
+    @property
+    def is_running(self) -> bool:
+        return self._token is not None
+
+    def statuses(self) -> Dict[str, SubmoduleStatus]:
+        """取得済みの状態({パス: SubmoduleStatus})"""
+        return dict(self._statuses)
+
+    def set_repository(self, repo_path: Optional[str]):
+        """対象のリポジトリを切り替え(実行中の取得は中断)"""
+        self.cancel()
+        self._repo_path = repo_path
+        self._statuses = {}
+
+    def refresh(self, max_workers: Optional[int] = None):
+        """
+        状態を取得し直す(実行中の取得は中断)
+
+        Args:
+            max_workers: 同時に実行する git status の数
+                (省略時はCPU数、最大 MAX_WORKERS)
+        """
+        self.cancel()
+        if self._repo_path is None:
+            return
+        if not os.path.isfile(os.path.join(self._repo_path, ".gitmodules")):
+            if self._statuses:
+                self._statuses = {}
+                self.finished.emit(0)
+            return
+
+        if not max_workers:
+            max_workers = min(self.MAX_WORKERS, os.cpu_count() or 1)
+        token = CancelToken()
+        self._token = token
+        self._received = set()
+        self._jobs.submit(
+            "submodule-status",
+            collect_submodule_status,
+            self._repo_path,
+            max_workers,
+            token,
+            on_progress=lambda statuses: self._on_progress(token, statuses),
+            on_finished=lambda count: self._on_finished(token, count),
+            on_failed=lambda error: self._on_failed(token, error),
+        )
+
+    def cancel(self):
+        """実行中の取得を中断"""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    # ==================== プライベートメソッド ====================
+
+    def _on_progress(self, token: CancelToken, statuses: list):
+        if token is not self._token:
+            return
+        for status in statuses:
+            self._statuses[status.path] = status
+            self._received.add(status.path)
+        self.status_ready.emit(statuses)
+
+    def _on_finished(self, token: CancelToken, count: int):
+        if token is not self._token:
+            return
+        self._token = None
+        # 削除されたサブモジュールの前回の状態を捨てる
+        for path in set(self._statuses) - self._received:
+            del self._statuses[path]
+        self.finished.emit(count)
+
+    def _on_failed(self, token: CancelToken, error: str):
+        if token is self._token:
+            self._token = None
+            self.failed.emit(error)
@@ -0,0 +1,179 @@
+"""リンクされたワークツリーの一覧と、それぞれの状態を並列に取得する"""
+
+import dataclasses
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from core.git_operations import read_status, read_worktrees
+from core.git_process import CancelToken, GitProcessError
+from core.jobs import JobRunner
+from models.worktree import Worktree
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _read_worktree_status(worktree: Worktree, token: CancelToken) -> Worktree:
+    """状態を取得した Worktree を返す(GUIスレッドに渡した一覧の項目は変更しない)"""
+    try:
+        files = read_status(worktree.path, token=token)
+    except GitProcessError as e:
+        if e.cancelled:
+            raise
+        logger.info(
+            "ワークツリーの状態を取得できませんでした: %s (%s)", worktree.path, e
+        )
+        return dataclasses.replace(worktree, files=None, error=str(e))
+    return dataclasses.replace(worktree, files=files, error=None)
+
+
+def collect_worktree_status(
+    repo_path: str, max_workers: int, token: CancelToken, progress: Callable
+) -> int:
+    """
+    ワーカースレッドで、ワークツリーの一覧とそれぞれの状態を取得する
+
+    最初に一覧を progress で通知した後、repo_path 以外のワークツリーの git status を
+    最大 max_workers 個同時に実行し、取得できたものから通知する
+    (オブジェクトDBは共有なので、読み込んだpackはOSのキャッシュに乗ったまま使われる)
+
+    Returns:
+        int: ワークツリーの数
+    """
+    worktrees = read_worktrees(repo_path, token)
+    progress(worktrees)
+    current = os.path.realpath(repo_path)
+    targets = [
+        worktree
+        for worktree in worktrees
+        if not worktree.bare
+        and not worktree.prunable
+        and os.path.realpath(worktree.path) != current
+    ]
+    if not targets:
+        return len(worktrees)
+
+    with metrics.timed("status.worktrees"):
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="worktree"
+        ) as pool:
+            futures = [
+                pool.submit(_read_worktree_status, worktree, token)
+                for worktree in targets
+            ]
+            try:
+                for future in as_completed(futures):
+                    progress([future.result()])
+            except BaseException:
+                # 残りのプロセスも終了させてから抜ける
+                token.cancel()
+                raise
+    return len(worktrees)
+
+
+class WorktreeLoader(QObject):
+    """
+    ワークツリーの一覧と状態をバックグラウンドで取得する
+
+    取得した一覧は worktrees() でいつでも参照できる。同じリポジトリの別の
+    ワークツリーに切り替えた場合は、次の取得が終わるまで前回の状態を残す
+    """
+
+    worktrees_ready = Signal(list)  # 一覧または状態を取得できた Worktree のリスト
+    finished = Signal(int)  # ワークツリーの数
+    failed = Signal(str)  # エラーメッセージ
+
+    # 同時に実行する git status の数の上限
+    MAX_WORKERS = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = JobRunner(max_threads=1, parent=self)
+        self._repo_path: Optional[str] = None
+        self._token: Optional[CancelToken] = None
+        self._worktrees: Dict[str, Worktree] = {}
+        self._listed = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._token is not None
+
+    def worktrees(self) -> List[Worktree]:
+        """取得済みのワークツリー(git worktree list の順)"""
+        return list(self._worktrees.values())
+
+    def get(self, path: str) -> Optional[Worktree]:
+        """パスに対応するワークツリー"""
+        return self._worktrees.get(os.path.realpath(path))
+
+    def set_repository(self, repo_path: Optional[str]):
+        """
+        対象のリポジトリを切り替え(実行中の取得は中断)
+
+        取得済みのワークツリーのいずれかに切り替えた場合は、状態を残す
+        (ワークツリーの切り替えでは一旦 None が設定される)
+        """
+        self.cancel()
+        self._repo_path = repo_path
+        if repo_path is not None and self.get(repo_path) is None:
+            self._worktrees = {}
+
+    def refresh(self):
+        """一覧と状態を取得し直す(実行中の取得は中断)"""
+        self.cancel()
+        if self._repo_path is None:
+            return
+        token = CancelToken()
+        self._token = token
+        self._listed = False
+        self._jobs.submit(
+            "worktree-status",
+            collect_worktree_status,
+            self._repo_path,
+            min(self.MAX_WORKERS, os.cpu_count() or 1),
+            token,
+            on_progress=lambda worktrees: self._on_progress(token, worktrees),
+            on_finished=lambda count: self._on_finished(token, count),
+            on_failed=lambda error: self._on_failed(token, error),
+        )
+
+    def cancel(self):
+        """実行中の取得を中断"""
+        if self._token is not None:
+            self._token.cancel()
+            self._token = None
+
+    # ==================== プライベートメソッド ====================
+
+    def _on_progress(self, token: CancelToken, worktrees: list):
+        if token is not self._token:
+            return
+        if not self._listed:
+            # 最初は一覧(状態は前回のものを引き継ぎ、取得でき次第置き換える)
+            self._listed = True
+            previous = self._worktrees
+            self._worktrees = {}
+            for worktree in worktrees:
+                key = os.path.realpath(worktree.path)
+                old = previous.get(key)
+                if old is not None:
+                    worktree.files = old.files
+                self._worktrees[key] = worktree
+        else:
+            for worktree in worktrees:
+                self._worktrees[os.path.realpath(worktree.path)] = worktree
+        self.worktrees_ready.emit(worktrees)
+
+    def _on_finished(self, token: CancelToken, count: int):
+        if token is self._token:
+            self._token = None
+            self.finished.emit(count)
+
+    def _on_failed(self, token: CancelToken, error: str):
+        if token is self._token:
+            self._token = None
+            self.failed.emit(error)
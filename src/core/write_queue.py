@@ -0,0 +1,250 @@
+"""リポジトリへの書き込みを1つずつ実行し、ロックの競合時は待って再試行する"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from models import CommandResult
+from utils import metrics
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 書き込み前に存在を確認するロックファイル(.git からの相対パス)
+LOCK_FILES = ("index.lock", "HEAD.lock")
+
+# ロックの競合で失敗した時のエラーメッセージ(GitOperations._ERROR_PATTERNS で変換される)
+LOCKED_MESSAGE = "他のgit(ターミナル等)がリポジトリを使用中です"
+# このプロセスの他の書き込みが終わらなかった時のエラーメッセージ
+BUSY_MESSAGE = "他の書き込みが実行中です"
+
+
+@dataclass
+class LockFile:
+    """
+    残っているロックファイルの情報
+
+    Attributes:
+        path: ロックファイルのパス
+        age: 最終更新からの経過秒数
+        owner_running: このリポジトリでgitが実行中かどうか
+            (判定できない環境ではNone。新しいロックは調べずにTrue)
+    """
+
+    path: str
+    age: float
+    owner_running: Optional[bool]
+
+    # これより古く、持ち主のgitも見当たらないロックは異常終了の残骸とみなす
+    STALE_AGE = 10 * 60  # 秒
+
+    @property
+    def stale(self) -> bool:
+        """
+        異常終了したgitの残骸と思われるかどうか
+
+        git commit がエディタを開いている間などは正常でも長時間残るため、
+        経過時間だけでは判定せず、持ち主のgitが見当たらない場合に限る
+        """
+        return self.age >= self.STALE_AGE and self.owner_running is False
+
+
+def inspect_lock(git_dir: str, work_dir: Optional[str] = None) -> Optional[LockFile]:
+    """
+    残っているロックファイルを調べる
+
+    Args:
+        git_dir: .git ディレクトリ
+        work_dir: 作業ツリー(gitプロセスの検索に使う)
+
+    Returns:
+        LockFile or None: ロックファイルが無ければNone
+    """
+    for name in LOCK_FILES:
+        path = os.path.join(git_dir, name)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        age = max(0.0, time.time() - mtime)
+        # プロセスの検索は遅いので、古いロックの場合だけ行う
+        owner_running = True
+        if age >= LockFile.STALE_AGE:
+            owner_running = _git_running_in([git_dir, work_dir or git_dir])
+        return LockFile(path=path, age=age, owner_running=owner_running)
+    return None
+
+
+def _git_running_in(directories: List[str]) -> Optional[bool]:
+    """
+    いずれかのディレクトリ内でgitが実行中かどうか
+
+    /proc がある環境(Linux)でだけ判定できる。cat-file 等の常駐の読み取り
+    プロセス(GitPythonが起動したもの)はロックを取らないので数えない
+    """
+    if not os.path.isdir("/proc/self"):
+        return None
+    roots = [os.path.realpath(d) for d in directories]
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                argv = f.read().split(b"\0")
+            cwd = os.readlink(f"/proc/{pid}/cwd")
+        except OSError:
+            continue
+        if not argv or not os.path.basename(argv[0]).startswith(b"git"):
+            continue
+        if b"cat-file" in argv:
+            continue
+        if any(cwd == root or cwd.startswith(root + os.sep) for root in roots):
+            return True
+    return False
+
+
+class WriteQueue:
+    """
+    1つのリポジトリへの書き込みを直列化する
+
+    GUIスレッドの操作とワーカースレッドのジョブ(コミット等)で同じインスタンスを
+    共有し(for_repository)、次の順で書き込む
+      1. このプロセスの他の書き込みが終わるのを待つ
+      2. 他のプロセス(ターミナルのgit等)のロックファイルが消えるのを待つ
+      3. 実行し、ロックの競合で失敗したら間隔を延ばしながら再試行する
+    待ち時間の合計は MAX_WAIT 秒までで、待った時間は結果の lock_wait に入る
+    """
+
+    MAX_WAIT = 5.0  # 秒
+    INITIAL_DELAY = 0.05  # 秒
+    MAX_DELAY = 0.5  # 秒
+
+    _queues: Dict[str, "WriteQueue"] = {}
+    _queues_lock = threading.Lock()
+
+    def __init__(self, git_dir: str, work_dir: Optional[str] = None):
+        self.git_dir = git_dir
+        self.work_dir = work_dir
+        # 同じスレッドからの入れ子の書き込みは待たない
+        self._lock = threading.RLock()
+
+    @classmethod
+    def for_repository(
+        cls, git_dir: str, work_dir: Optional[str] = None
+    ) -> "WriteQueue":
+        """リポジトリごとに共有するインスタンスを取得"""
+        key = os.path.realpath(git_dir)
+        with cls._queues_lock:
+            queue = cls._queues.get(key)
+            if queue is None:
+                queue = cls._queues[key] = cls(git_dir, work_dir)
+            return queue
+
+    def run(
+        self, fn: Callable[[], CommandResult], command: str, wait: bool = True
+    ) -> CommandResult:
+        """
+        書き込みを実行
+
+        Args:
+            fn: 書き込みを行い CommandResult を返す関数
+            command: 実行できなかった場合の結果に入れるコマンド
+            wait: Falseならロックの解放を待たず、競合したらすぐに失敗を返す
+
+        Returns:
+            CommandResult: fn の結果(競合で実行できなかった場合は失敗)
+        """
+        started = time.monotonic()
+        deadline = started + (self.MAX_WAIT if wait else 0)
+        if not self._lock.acquire(timeout=self.MAX_WAIT if wait else 0):
+            return self._locked_result(command, started, BUSY_MESSAGE)
+        try:
+            # 待った時間(fn の実行時間は含めない)
+            waited = time.monotonic() - started
+            delay = self.INITIAL_DELAY
+            result = None
+            while True:
+                lock = self.locked_by_other()
+                if lock is None:
+                    result = fn()
+                    if not self._is_contention(result):
+                        break
+                elif lock.stale:
+                    # 待っても消えない
+                    return self._locked_result(command, started, result=result)
+                if time.monotonic() + delay > deadline:
+                    return self._locked_result(command, started, result=result)
+                time.sleep(delay)
+                waited += delay
+                delay = min(delay * 2, self.MAX_DELAY)
+        finally:
+            self._lock.release()
+
+        if waited >= self.INITIAL_DELAY:
+            result.lock_wait = waited
+            metrics.record_latency("write_wait", waited)
+            logger.info(
+                "ロックの解放を %.2f秒 待って書き込みました: %s", waited, result.command
+            )
+        return result
+
+    def locked_by_other(self) -> Optional[LockFile]:
+        """他のプロセスのロックファイルが残っていればその情報"""
+        return inspect_lock(self.git_dir, self.work_dir)
+
+    def remove_stale_lock(self) -> Optional[LockFile]:
+        """
+        異常終了したgitが残したロックファイルを削除
+
+        削除する直前に改めて判定し、まだ使われている可能性があれば削除しない
+
+        Returns:
+            LockFile or None: 削除したロックファイル
+        """
+        with self._lock:
+            lock = self.locked_by_other()
+            if lock is None or not lock.stale:
+                return None
+            os.remove(lock.path)
+            logger.warning(
+                "残っていたロックファイルを削除しました: %s(%.0f秒前)",
+                lock.path,
+                lock.age,
+            )
+            return lock
+
+    # ==================== プライベートメソッド ====================
+
+    @staticmethod
+    def _is_contention(result: CommandResult) -> bool:
+        return not result.success and result.error_message == LOCKED_MESSAGE
+
+    def _locked_result(
+        self,
+        command: str,
+        started: float,
+        message: str = LOCKED_MESSAGE,
+        result: Optional[CommandResult] = None,
+    ) -> CommandResult:
+        """待ちきれなかった場合の結果"""
+        waited = time.monotonic() - started
+        metrics.increment("write_lock_timeout")
+        if result is None:
+            result = CommandResult(
+                success=False,
+                command=command,
+                description="書き込みに失敗しました",
+                error_message=message,
+            )
+        lock = self.locked_by_other()
+        if lock is not None and lock.stale:
+            result.error_message = (
+                f"{message}(ロックファイルが {lock.age / 60:.0f}分前から"
+                "残っています。異常終了したgitの残骸の可能性があります)"
+            )
+            result.data = lock
+        logger.warning("%.2f秒待ちましたが書き込めませんでした: %s", waited, command)
+        result.lock_wait = waited
+        return result
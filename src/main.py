@@ -1,21 +1,64 @@
 """LeafGit - エントリーポイント"""
 
-import sys
-import logging
-from PySide6.QtWidgets import QApplication
-from core import AppController
-from ui import MainWindow
-from utils import setup_logger
+import time
+
+# 起動時間の計測用(インポートより前に記録する)
+_STARTED_AT = time.time()
+
+import os  # noqa: E402
+import sys  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+from PySide6.QtCore import QTimer  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+from core import AppController  # noqa: E402
+from ui import MainWindow  # noqa: E402
+from utils import setup_logger, tracing, LOG_LEVELS  # noqa: E402
+
+
+def _write_startup_probe(path: str, imported_at: float):
+    """
+    起動時間を記録して終了する(benchmarks/bench_startup.py 用)
+
+    Args:
+        path: 結果を書き出すJSONファイル
+        imported_at: 依存モジュールの読み込みが終わった時刻
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "main_started": _STARTED_AT,
+                "imports_done": imported_at,
+                "window_shown": time.time(),
+            },
+            f,
+        )
+    QApplication.quit()
 
 
 def main():
     """アプリケーションのメイン関数"""
+    imported_at = time.time()
+
     # ロガーの初期化
-    # 開発中はDEBUG、本番はINFOレベル
-    setup_logger("leafgit", level=logging.DEBUG)
+    # 既定はINFO。LEAFGIT_LOG_LEVEL=DEBUG 等で変更、表示メニューからも変更可能
+    level_name = os.environ.get("LEAFGIT_LOG_LEVEL", "INFO").upper()
+    setup_logger(
+        "leafgit",
+        level=LOG_LEVELS.get(level_name, logging.INFO),
+        json_format=os.environ.get("LEAFGIT_LOG_JSON") == "1",
+    )
 
     app = QApplication(sys.argv)
 
+    # LEAFGIT_TRACE=<ファイル> で起動から終了までのトレースを記録する
+    trace_path = os.environ.get("LEAFGIT_TRACE")
+    if trace_path:
+        tracing.start()
+        app.aboutToQuit.connect(
+            lambda: tracing.is_enabled() and tracing.stop(trace_path)
+        )
+
     # アプリケーション情報の設定
     app.setApplicationName("LeafGit")
     app.setApplicationVersion("0.1.0")
@@ -28,6 +71,14 @@ def main():
     window = MainWindow(controller)
     window.show()
 
+    probe_path = os.environ.get("LEAFGIT_STARTUP_PROBE")
+    if probe_path:
+        # 最初のウィンドウが描画された直後に計測して終了する
+        QTimer.singleShot(0, lambda: _write_startup_probe(probe_path, imported_at))
+    else:
+        # 前回のリポジトリを保存された状態で開き、裏で最新の状態に更新する
+        QTimer.singleShot(0, controller.git.restore_last_repository)
+
     # イベントループの開始
     sys.exit(app.exec())
 
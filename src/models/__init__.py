@@ -2,9 +2,12 @@
 
 from .command_result import CommandResult
 from .glossary import Glossary, GlossaryTerm
+from .file_tree import FileTreeNode, build_file_tree
 
 __all__ = [
     "CommandResult",
     "Glossary",
     "GlossaryTerm",
+    "FileTreeNode",
+    "build_file_tree",
 ]
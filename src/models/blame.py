@@ -0,0 +1,57 @@
+"""git blame の結果(行ごとの最終変更コミット)"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class BlameCommit:
+    """
+    blameに現れたコミット
+
+    Attributes:
+        sha (str): コミットID
+        author (str): 作者名
+        author_mail (str): 作者のメールアドレス
+        author_time (int): 作成日時(UNIX時刻)
+        summary (str): コミットメッセージの1行目
+        boundary (bool): 履歴の境界(それより前は辿っていない)かどうか
+    """
+
+    sha: str
+    author: str = ""
+    author_mail: str = ""
+    author_time: int = 0
+    summary: str = ""
+    boundary: bool = False
+
+    @property
+    def short_sha(self) -> str:
+        return self.sha[:8]
+
+    @property
+    def date(self) -> str:
+        """表示用の日付(ローカル時刻)"""
+        if not self.author_time:
+            return ""
+        return datetime.fromtimestamp(self.author_time).strftime("%Y-%m-%d")
+
+
+@dataclass
+class BlameChunk:
+    """
+    同じコミットで最後に変更された連続する行
+
+    Attributes:
+        commit (BlameCommit): 行を最後に変更したコミット
+        orig_line (int): そのコミット時点での開始行(1始まり)
+        final_line (int): 現在のファイルでの開始行(1始まり)
+        num_lines (int): 行数
+        filename (str): そのコミット時点でのファイル名
+    """
+
+    commit: BlameCommit
+    orig_line: int
+    final_line: int
+    num_lines: int
+    filename: str = ""
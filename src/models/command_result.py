@@ -16,6 +16,7 @@ class CommandResult:
         output (Optional[str]): コマンドの標準出力
         error_message (Optional[str]): エラーメッセージ（失敗時）
         data (Optional[Any]): 追加データ(GitPythonのオブジェクト等)
+        lock_wait (float): 他のgitのロックの解放を待った秒数
     """
 
     success: bool
@@ -24,6 +25,7 @@ class CommandResult:
     output: Optional[str] = None
     error_message: Optional[str] = None
     data: Optional[Any] = None
+    lock_wait: float = 0.0
 
     def __bool__(self) -> bool:
         """
@@ -0,0 +1,35 @@
+"""ファイルごとの行数の増減(git diff --numstat の1行分)"""
+
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class DiffStat:
+    """
+    1ファイル分の変更量
+
+    Attributes:
+        added (int): 追加行数
+        deleted (int): 削除行数
+        binary (bool): バイナリファイルかどうか(行数は0)
+    """
+
+    added: int = 0
+    deleted: int = 0
+    binary: bool = False
+
+    def label(self) -> str:
+        """一覧に表示する文字列(例: "+12 −3")"""
+        if self.binary:
+            return "bin"
+        return f"+{self.added} −{self.deleted}"
+
+    @classmethod
+    def total(cls, stats: Iterable["DiffStat"]) -> "DiffStat":
+        """合計(バイナリファイルは行数に含めない)"""
+        added = deleted = 0
+        for stat in stats:
+            added += stat.added
+            deleted += stat.deleted
+        return cls(added, deleted)
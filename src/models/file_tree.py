@@ -0,0 +1,284 @@
+"""変更ファイルのディレクトリ階層(プレフィックスツリー)"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from models.submodule import SubmoduleStatus
+
+# get_changed_files() のキーと表示用ステータスの対応
+STATUS_LABELS = {
+    "staged": "Staged",
+    "unstaged": "Modified",
+    "untracked": "Untracked",
+    "deleted": "Deleted",
+}
+
+
+class FileTreeNode:
+    """
+    変更ファイルツリーのノード
+
+    ディレクトリノードは子ノードとステータスごとの集計を持ち、
+    ファイルノードは自身のステータスを持つ。
+    サブモジュールのノードは submodule に状態を持ち、中に変更があれば
+    その変更ファイルを子に持つディレクトリノードになる。
+    子ノードの並び替えは初めて参照された時(=展開時)にのみ行う。
+    """
+
+    __slots__ = (
+        "name",
+        "path",
+        "parent",
+        "row",
+        "statuses",
+        "counts",
+        "file_count",
+        "submodule",
+        "_children",
+        "_sorted",
+    )
+
+    def __init__(self, name: str, path: str, parent: Optional["FileTreeNode"] = None):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        self.row = 0  # 親のsorted_children内での位置
+        self.statuses: List[str] = []
+        self.counts: Dict[str, int] = {}
+        self.file_count = 0
+        self.submodule: Optional[SubmoduleStatus] = None
+        self._children: Optional[Dict[str, "FileTreeNode"]] = None
+        self._sorted: Optional[List["FileTreeNode"]] = None
+
+    @property
+    def is_dir(self) -> bool:
+        """ディレクトリノードかどうか"""
+        return self._children is not None
+
+    @property
+    def child_count(self) -> int:
+        """直下の子ノード数"""
+        return len(self._children) if self._children else 0
+
+    def sorted_children(self) -> List["FileTreeNode"]:
+        """
+        子ノードを表示順(ディレクトリ優先・名前順)で取得
+
+        初回呼び出し時にのみ並び替えを行い、結果をキャッシュする
+        """
+        if self._sorted is None:
+            children = self._children or {}
+            self._sorted = sorted(
+                children.values(), key=lambda n: (not n.is_dir, n.name.lower())
+            )
+            for row, child in enumerate(self._sorted):
+                child.row = row
+        return self._sorted
+
+    def child(self, name: str) -> Optional["FileTreeNode"]:
+        """名前で直下の子ノードを取得"""
+        return self._children.get(name) if self._children else None
+
+    def iter_files(self, submodules: bool = True) -> Iterator["FileTreeNode"]:
+        """
+        配下のファイルノードをすべて列挙
+
+        Args:
+            submodules: Falseならサブモジュールの中には入らず、サブモジュール自体の
+                変更(別のコミットのチェックアウト)がある場合だけそのノードを含める
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node.is_dir:
+                yield node
+                continue
+            if node.submodule is not None:
+                if node.statuses:
+                    yield node
+                if not submodules:
+                    continue
+            stack.extend(node._children.values())
+
+    def in_submodule(self) -> bool:
+        """サブモジュールの中のノードかどうか"""
+        node = self.parent
+        while node is not None:
+            if node.submodule is not None:
+                return True
+            node = node.parent
+        return False
+
+    def _child_dir(self, name: str) -> "FileTreeNode":
+        child = self._children.get(name)
+        if child is None:
+            path = f"{self.path}/{name}" if self.path else name
+            child = FileTreeNode(name, path, self)
+            child._children = {}
+            self._children[name] = child
+        return child
+
+
+def build_file_tree(
+    files: dict, submodules: Iterable[SubmoduleStatus] = ()
+) -> FileTreeNode:
+    """
+    get_changed_files() の結果からディレクトリ階層を構築
+
+    Args:
+        files: {'staged': [...], 'unstaged': [...], ...} 形式の辞書
+        submodules: サブモジュールの状態。中に変更があるもの(と、それを含む
+            サブモジュール)は変更ファイルを入れ子にしたノードになる
+
+    Returns:
+        FileTreeNode: ルートノード(path は空文字)
+    """
+    root = FileTreeNode("", "")
+    root._children = {}
+
+    for key, label in STATUS_LABELS.items():
+        for file_path in files.get(key, []):
+            _add_file(root, file_path, label)
+
+    by_path = {status.path: status for status in submodules}
+    shown = set()
+    for path, status in by_path.items():
+        if status.change_count:
+            # 入れ子のサブモジュールの変更は、外側のサブモジュールの中に表示する
+            parts = path.split("/")
+            shown.update(
+                prefix
+                for prefix in ("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+                if prefix in by_path
+            )
+    # 外側のサブモジュールから順に追加する
+    for path in sorted(by_path):
+        if path in shown:
+            _add_submodule(root, by_path[path])
+        else:
+            # 別のコミットをチェックアウトしただけのサブモジュールにも状態を付ける
+            node = _find_node(root, path)
+            if node is not None and not node.is_dir:
+                node.submodule = by_path[path]
+
+    return root
+
+
+def _add_file(root: FileTreeNode, file_path: str, label: str):
+    """ファイルノードを追加し、祖先ディレクトリの集計を更新"""
+    *dirs, name = file_path.split("/")
+    node = root
+    ancestors = [root]
+    for dir_name in dirs:
+        node = node._child_dir(dir_name)
+        ancestors.append(node)
+
+    leaf = node._children.get(name)
+    is_new = leaf is None
+    if is_new:
+        leaf = FileTreeNode(name, file_path, node)
+        node._children[name] = leaf
+    leaf.statuses.append(label)
+
+    for ancestor in ancestors:
+        ancestor.counts[label] = ancestor.counts.get(label, 0) + 1
+        if is_new:
+            ancestor.file_count += 1
+
+
+def _add_submodule(root: FileTreeNode, status: SubmoduleStatus):
+    """サブモジュールのノードを追加し、中の変更ファイルを子に入れる"""
+    *dirs, name = status.path.split("/")
+    node = root
+    for dir_name in dirs:
+        node = node._child_dir(dir_name)
+    group = node._children.get(name)
+    if group is None:
+        group = node._child_dir(name)
+    elif not group.is_dir:
+        # 親リポジトリで変更ありと表示されていたサブモジュール(gitlink)
+        group._children = {}
+    group.submodule = status
+
+    prefix = status.path + "/"
+    for key, label in STATUS_LABELS.items():
+        for file_path in status.files.get(key, []):
+            _add_file(root, prefix + file_path, label)
+
+
+def _find_node(root: FileTreeNode, file_path: str) -> Optional[FileTreeNode]:
+    node = root
+    for name in file_path.split("/"):
+        node = node.child(name)
+        if node is None:
+            return None
+    return node
+
+
+def apply_status_delta(root: FileTreeNode, delta) -> Optional[List[FileTreeNode]]:
+    """
+    ステータスの差分をツリーにその場で適用
+
+    ファイルのステータスが入れ替わるだけの差分(ステージ/アンステージ)のみ扱い、
+    ノードの追加・削除が必要な場合は何も変更せずNoneを返す
+
+    Args:
+        root: build_file_tree() で構築したルート
+        delta: models.status.StatusDelta
+
+    Returns:
+        List[FileTreeNode] or None: 表示の更新が必要なノード
+    """
+    removed = [
+        (path, STATUS_LABELS[key])
+        for key, paths in delta.removed.items()
+        for path in paths
+    ]
+    added = [
+        (path, STATUS_LABELS[key])
+        for key, paths in delta.added.items()
+        for path in paths
+    ]
+
+    # 構造が変わるかを先に判定する
+    remaining: Dict[str, List[str]] = {}
+    for path, label in removed + added:
+        if path in remaining:
+            continue
+        leaf = _find_node(root, path)
+        if leaf is None or leaf.is_dir:
+            return None
+        remaining[path] = list(leaf.statuses)
+    for path, label in removed:
+        if label in remaining[path]:
+            remaining[path].remove(label)
+    for path, label in added:
+        remaining[path].append(label)
+    if any(not statuses for statuses in remaining.values()):
+        return None
+
+    changed: Dict[int, FileTreeNode] = {}
+
+    def _update_counts(leaf: FileTreeNode, label: str, diff: int):
+        node = leaf.parent
+        while node is not None:
+            count = node.counts.get(label, 0) + diff
+            if count:
+                node.counts[label] = count
+            else:
+                node.counts.pop(label, None)
+            changed[id(node)] = node
+            node = node.parent
+
+    for path, label in removed:
+        leaf = _find_node(root, path)
+        if label in leaf.statuses:
+            leaf.statuses.remove(label)
+            _update_counts(leaf, label, -1)
+            changed[id(leaf)] = leaf
+    for path, label in added:
+        leaf = _find_node(root, path)
+        leaf.statuses.append(label)
+        _update_counts(leaf, label, 1)
+        changed[id(leaf)] = leaf
+
+    return list(changed.values())
@@ -1,10 +1,14 @@
 import json
+import re
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from utils import get_logger
 
 logger = get_logger(__name__)
 
+# "リポジトリ (Repository)" の形式の用語名
+_TERM_NAME = re.compile(r"^(.+?)\s*\((.+)\)$")
+
 
 class GlossaryTerm:
     def __init__(
@@ -15,11 +19,24 @@ class GlossaryTerm:
         self.description = description
         self.related = related
         self.command = command
+        # related を解決した用語と、用語集になかった名前(Glossary が読み込み時に設定する)
+        self.related_terms: List[GlossaryTerm] = []
+        self.missing_related: List[str] = []
+
+    def aliases(self) -> List[str]:
+        """関連用語の参照に使える名前("ブランチ (Branch)" なら "ブランチ" と "Branch" も)"""
+        names = [self.term]
+        match = _TERM_NAME.match(self.term)
+        if match:
+            names.extend(match.groups())
+        return names
 
 
 class Glossary:
     def __init__(self, json_path: Optional[str] = None):
         self.terms = {}
+        # 別名(aliases())から用語への対応
+        self._aliases: Dict[str, GlossaryTerm] = {}
 
         # デフォルトのJSONパス
         if json_path is None:
@@ -43,21 +60,44 @@ class Glossary:
                         command=item.get("command", ""),
                     )
                     self.add_term(term)
-                logger.info(f"用語集を読み込みました: {len(self.terms)}件")
+                self.resolve_related()
+                logger.info("用語集を読み込みました: %d件", len(self.terms))
         except FileNotFoundError:
-            logger.error(f"用語集ファイルが見つかりません: {json_path}")
+            logger.error("用語集ファイルが見つかりません: %s", json_path)
         except json.JSONDecodeError as e:
-            logger.error(f"用語集ファイルの形式が不正です: {e}")
+            logger.error("用語集ファイルの形式が不正です: %s", e)
         except Exception as e:
-            logger.error(f"用語集の読み込みに失敗しました: {e}")
+            logger.error("用語集の読み込みに失敗しました: %s", e)
 
     def add_term(self, term: GlossaryTerm):
-        """用語を追加"""
+        """用語を追加(関連用語の参照は resolve_related() で更新する)"""
         self.terms[term.term] = term
+        for name in term.aliases():
+            self._aliases.setdefault(name.lower(), term)
+
+    def resolve_related(self):
+        """
+        すべての用語の related を用語への参照(related_terms)に解決する
+
+        表示のたびに名前で探さなくて済むよう、読み込み時に1回だけ行う。
+        用語集にない名前は missing_related に入れる
+        """
+        for term in self.terms.values():
+            term.related_terms = []
+            term.missing_related = []
+            for name in term.related:
+                related = self.get_term(name)
+                if related is None:
+                    term.missing_related.append(name)
+                elif related is not term and related not in term.related_terms:
+                    term.related_terms.append(related)
 
     def get_term(self, term_name: str) -> Optional[GlossaryTerm]:
-        """特定の用語を取得"""
-        return self.terms.get(term_name)
+        """特定の用語を取得(別名でも取得できる)"""
+        term = self.terms.get(term_name)
+        if term is None:
+            term = self._aliases.get(term_name.strip().lower())
+        return term
 
     def get_all_terms(self) -> List[GlossaryTerm]:
         """すべての用語を取得"""
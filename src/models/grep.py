@@ -0,0 +1,19 @@
+"""リポジトリ内検索(git grep)の結果"""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class GrepMatch:
+    """
+    git grep で見つかった1行
+
+    Attributes:
+        path (str): リポジトリルートからの相対パス
+        line_number (int): 行番号(1始まり)
+        text (str): 行の内容
+    """
+
+    path: str
+    line_number: int
+    text: str
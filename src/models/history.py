@@ -0,0 +1,33 @@
+"""コミット履歴の1件分"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass
+class LogEntry:
+    """
+    git log の1コミット
+
+    Attributes:
+        sha (str): コミットID
+        author (str): 作者名
+        author_mail (str): 作者のメールアドレス
+        author_time (int): 作成日時(UNIX時刻)
+        subject (str): コミットメッセージの1行目
+    """
+
+    sha: str
+    author: str
+    author_mail: str
+    author_time: int
+    subject: str
+
+    @property
+    def short_sha(self) -> str:
+        return self.sha[:8]
+
+    @property
+    def date(self) -> str:
+        """表示用の日時(ローカル時刻)"""
+        return datetime.fromtimestamp(self.author_time).strftime("%Y-%m-%d %H:%M")
@@ -0,0 +1,44 @@
+"""ステージ前のファイルの検査結果"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+def format_size(size: int) -> str:
+    """バイト数を表示用の文字列にする(例: 1.5 GB)"""
+    if size < 1024:
+        return f"{size} B"
+    value = size / 1024
+    for unit in ("KB", "MB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+@dataclass
+class StageScan:
+    """
+    ステージしようとしているファイルの検査結果
+
+    Attributes:
+        sizes (Dict[str, int]): パスごとのサイズ(削除されたファイルは含まない)
+        large_files (List[str]): しきい値以上で、Git LFSの管理対象でないファイル
+        lfs_pointers (List[str]): Git LFSのポインタファイル(実体が取得されていない)
+        threshold (int): 検査に使ったしきい値(バイト)
+    """
+
+    sizes: Dict[str, int] = field(default_factory=dict)
+    large_files: List[str] = field(default_factory=list)
+    lfs_pointers: List[str] = field(default_factory=list)
+    threshold: int = 0
+
+    @property
+    def total_size(self) -> int:
+        """ステージするファイルの合計サイズ"""
+        return sum(self.sizes.values())
+
+    @property
+    def needs_confirmation(self) -> bool:
+        """ステージする前にユーザーに確認すべきかどうか"""
+        return bool(self.large_files or self.lfs_pointers)
@@ -0,0 +1,161 @@
+"""作業ツリーの状態スナップショットと差分"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# get_changed_files() が返す辞書のキー
+STATUS_KEYS = ("staged", "unstaged", "untracked", "deleted")
+
+
+@dataclass
+class StatusDelta:
+    """
+    スナップショットに対する差分
+
+    Attributes:
+        added (Dict[str, List[str]]): キーごとに追加されたパス
+        removed (Dict[str, List[str]]): キーごとに削除されたパス
+        optimistic (bool): 操作結果から推定した差分かどうか(未検証)
+    """
+
+    added: Dict[str, List[str]] = field(default_factory=dict)
+    removed: Dict[str, List[str]] = field(default_factory=dict)
+    optimistic: bool = False
+
+    def __bool__(self) -> bool:
+        return any(self.added.values()) or any(self.removed.values())
+
+    @property
+    def size(self) -> int:
+        """差分に含まれるパスの総数"""
+        return sum(len(p) for p in self.added.values()) + sum(
+            len(p) for p in self.removed.values()
+        )
+
+    @classmethod
+    def combine(cls, deltas: List["StatusDelta"]) -> "StatusDelta":
+        """
+        続けて適用する複数の差分を1つにまとめる
+
+        追加してから削除したパス(またはその逆)は打ち消し合う
+        """
+        if len(deltas) == 1:
+            return deltas[0]
+        added: Dict[str, Dict[str, None]] = {}
+        removed: Dict[str, Dict[str, None]] = {}
+        for delta in deltas:
+            # apply() と同じく削除を先に処理する
+            for source, target, key_paths in (
+                (added, removed, delta.removed),
+                (removed, added, delta.added),
+            ):
+                for key, paths in key_paths.items():
+                    pending = source.get(key, {})
+                    entries = target.setdefault(key, {})
+                    for path in paths:
+                        if path in pending:
+                            del pending[path]
+                        else:
+                            entries[path] = None
+        return cls(
+            added={key: list(paths) for key, paths in added.items() if paths},
+            removed={key: list(paths) for key, paths in removed.items() if paths},
+            optimistic=all(delta.optimistic for delta in deltas),
+        )
+
+
+class StatusSnapshot:
+    """
+    get_changed_files() の結果を保持するスナップショット
+
+    キーごとに挿入順を保った集合として持つため、パス単位の移動がO(1)で行える
+    """
+
+    def __init__(self, files: Optional[dict] = None):
+        files = files or {}
+        self._entries: Dict[str, Dict[str, None]] = {
+            key: dict.fromkeys(files.get(key, [])) for key in STATUS_KEYS
+        }
+
+    def to_dict(self) -> dict:
+        """get_changed_files() と同じ形式の辞書に変換"""
+        return {key: list(paths) for key, paths in self._entries.items()}
+
+    def contains(self, key: str, path: str) -> bool:
+        """指定したキーにパスが含まれるかどうか"""
+        return path in self._entries[key]
+
+    def all_files(self) -> List[str]:
+        """ステージ済み・未ステージ・未追跡のパスを連結して取得"""
+        return (
+            list(self._entries["staged"])
+            + list(self._entries["unstaged"])
+            + list(self._entries["untracked"])
+        )
+
+    def apply(self, delta: StatusDelta):
+        """差分を適用"""
+        for key, paths in delta.removed.items():
+            entries = self._entries[key]
+            for path in paths:
+                entries.pop(path, None)
+        for key, paths in delta.added.items():
+            entries = self._entries[key]
+            for path in paths:
+                entries[path] = None
+
+    def diff(self, other: "StatusSnapshot") -> StatusDelta:
+        """このスナップショットを other に一致させるための差分を計算"""
+        delta = StatusDelta()
+        for key in STATUS_KEYS:
+            mine = self._entries[key]
+            theirs = other._entries[key]
+            removed = [p for p in mine if p not in theirs]
+            added = [p for p in theirs if p not in mine]
+            if removed:
+                delta.removed[key] = removed
+            if added:
+                delta.added[key] = added
+        return delta
+
+    # ==================== 操作の結果を推定 ====================
+
+    def stage_delta(self, paths: Iterable[str]) -> StatusDelta:
+        """ステージング後の差分(未ステージ側から staged へ移動)"""
+        delta = StatusDelta(optimistic=True)
+        for path in paths:
+            for key in ("unstaged", "untracked", "deleted"):
+                if path in self._entries[key]:
+                    delta.removed.setdefault(key, []).append(path)
+            if path not in self._entries["staged"]:
+                delta.added.setdefault("staged", []).append(path)
+        return delta
+
+    def unstage_delta(self, paths: Iterable[str], classify) -> StatusDelta:
+        """
+        アンステージ後の差分
+
+        Args:
+            paths: アンステージしたパス
+            classify: パスを受け取り移動先のキー('unstaged'等)を返す関数
+        """
+        delta = StatusDelta(optimistic=True)
+        for path in paths:
+            if path not in self._entries["staged"]:
+                continue
+            delta.removed.setdefault("staged", []).append(path)
+            # 作業ツリー側の変更が既に記録されていればそのまま
+            if any(
+                path in self._entries[key]
+                for key in ("unstaged", "untracked", "deleted")
+            ):
+                continue
+            delta.added.setdefault(classify(path), []).append(path)
+        return delta
+
+    def commit_delta(self) -> StatusDelta:
+        """コミット後の差分(staged が空になる)"""
+        delta = StatusDelta(optimistic=True)
+        if self._entries["staged"]:
+            delta.removed["staged"] = list(self._entries["staged"])
+        return delta
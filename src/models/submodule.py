@@ -0,0 +1,50 @@
+"""サブモジュールの状態"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from models.status import STATUS_KEYS
+
+
+@dataclass
+class SubmoduleStatus:
+    """
+    1つのサブモジュールの状態
+
+    Attributes:
+        path (str): 親リポジトリ(最上位)の作業ツリーからの相対パス
+        initialized (bool): チェックアウト済み(submodule update 済み)かどうか
+        head (Optional[str]): チェックアウトしているコミット
+        branch (Optional[str]): ブランチ名(detached HEAD ならNone)
+        files (Dict[str, List[str]]): get_changed_files() と同じ形式の変更ファイル
+            (パスはサブモジュールの作業ツリーからの相対パス)
+        error (Optional[str]): 状態を取得できなかった場合のエラーメッセージ
+    """
+
+    path: str
+    initialized: bool = True
+    head: Optional[str] = None
+    branch: Optional[str] = None
+    files: Dict[str, List[str]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """表示名(パスの最後の要素)"""
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def change_count(self) -> int:
+        """変更ファイルの数"""
+        return sum(len(self.files.get(key, [])) for key in STATUS_KEYS)
+
+    @property
+    def state(self) -> str:
+        """表示用の状態"""
+        if self.error is not None:
+            return "エラー"
+        if not self.initialized:
+            return "未初期化"
+        if self.change_count:
+            return f"変更 {self.change_count} 件"
+        return "変更なし"
@@ -0,0 +1,61 @@
+"""リンクされたワークツリー(git worktree)"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from models.status import STATUS_KEYS
+
+
+@dataclass
+class Worktree:
+    """
+    git worktree list の1項目
+
+    Attributes:
+        path (str): 作業ツリーのパス
+        head (Optional[str]): チェックアウトしているコミット
+        branch (Optional[str]): ブランチ名(detached HEAD ならNone)
+        is_main (bool): メインの作業ツリー(リポジトリ本体)かどうか
+        bare (bool): ベアリポジトリかどうか
+        locked (bool): git worktree lock されているかどうか
+        prunable (bool): 作業ツリーが削除されていて、prune の対象かどうか
+        files (Optional[Dict[str, List[str]]]): get_changed_files() と同じ形式の
+            変更ファイル(未取得ならNone)
+        error (Optional[str]): 状態を取得できなかった場合のエラーメッセージ
+    """
+
+    path: str
+    head: Optional[str] = None
+    branch: Optional[str] = None
+    is_main: bool = False
+    bare: bool = False
+    locked: bool = False
+    prunable: bool = False
+    files: Optional[Dict[str, List[str]]] = None
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """表示名(ディレクトリ名)"""
+        return os.path.basename(os.path.normpath(self.path))
+
+    @property
+    def change_count(self) -> Optional[int]:
+        """変更ファイルの数(未取得ならNone)"""
+        if self.files is None:
+            return None
+        return sum(len(self.files.get(key, [])) for key in STATUS_KEYS)
+
+    @property
+    def label(self) -> str:
+        """メニュー等に表示する文字列"""
+        branch = self.branch or f"detached {self.head[:8] if self.head else ''}"
+        text = f"{self.name} [{branch.strip()}]"
+        if self.prunable:
+            return f"{text} (削除済み)"
+        if self.error is not None:
+            return f"{text} (エラー)"
+        if self.change_count:
+            return f"{text} 変更 {self.change_count} 件"
+        return text
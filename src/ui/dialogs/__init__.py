@@ -1,8 +1,16 @@
 """dialogs.py ダイアログ群の初期化モジュール"""
 
+from .blame_dialog import BlameDialog
+from .content_search_dialog import ContentSearchDialog
 from .glossary_dialog import GlossaryDetailDialog
+from .history_search_dialog import HistorySearchDialog
+from .metrics_dialog import MetricsDialog
 
 __all__ = [
+    "BlameDialog",
+    "ContentSearchDialog",
     "GlossaryDetailDialog",
+    "HistorySearchDialog",
     "MergeDialog",
+    "MetricsDialog",
 ]
@@ -0,0 +1,259 @@
+"""ファイルの各行を最後に変更したコミットを表示するダイアログ"""
+
+from typing import List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QStringListModel, Qt
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import (
+    QCompleter,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+)
+
+from models.blame import BlameChunk, BlameCommit
+
+
+class BlameModel(QAbstractTableModel):
+    """
+    blame結果のテーブルモデル(1行 = ファイルの1行)
+
+    ファイルの内容を先に表示し、コミット情報はチャンクが届くたびに埋める
+    """
+
+    COLUMNS = ("コミット", "作者", "日付", "行", "内容")
+    COMMIT, AUTHOR, DATE, LINE, CONTENT = range(5)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lines: List[str] = []
+        self._commits: List[Optional[BlameCommit]] = []
+        # チャンクの先頭行だけにコミット情報を表示する
+        self._chunk_start: List[bool] = []
+        self._annotated = 0
+
+    @property
+    def annotated_count(self) -> int:
+        """コミット情報が埋まった行数"""
+        return self._annotated
+
+    def set_lines(self, lines: List[str]):
+        self.beginResetModel()
+        self._lines = lines
+        self._commits = [None] * len(lines)
+        self._chunk_start = [False] * len(lines)
+        self._annotated = 0
+        self.endResetModel()
+
+    def clear(self):
+        self.set_lines([])
+
+    def add_chunks(self, chunks: List[BlameChunk]):
+        """受け取ったチャンクの行にコミット情報を反映"""
+        if not chunks or not self._lines:
+            return
+        first = len(self._lines)
+        last = -1
+        for chunk in chunks:
+            start = chunk.final_line - 1
+            end = min(start + chunk.num_lines, len(self._lines))
+            for row in range(start, end):
+                if self._commits[row] is None:
+                    self._annotated += 1
+                self._commits[row] = chunk.commit
+                self._chunk_start[row] = row == start
+            first = min(first, start)
+            last = max(last, end - 1)
+        if last >= first:
+            self.dataChanged.emit(
+                self.index(first, 0), self.index(last, len(self.COLUMNS) - 1)
+            )
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._lines)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        commit = self._commits[row]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.LINE:
+                return str(row + 1)
+            if column == self.CONTENT:
+                return self._lines[row]
+            if commit is None:
+                return "…" if column == self.COMMIT else ""
+            if not self._chunk_start[row]:
+                return ""
+            if column == self.COMMIT:
+                return commit.short_sha
+            if column == self.AUTHOR:
+                return commit.author
+            return commit.date
+        if role == Qt.ItemDataRole.ToolTipRole and commit is not None:
+            return (
+                f"{commit.sha}\n{commit.author} <{commit.author_mail}>\n"
+                f"{commit.date}\n\n{commit.summary}"
+            )
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == self.LINE:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+
+class BlameDialog(QDialog):
+    """blameダイアログ(ファイルを切り替えると実行中のblameは中断される)"""
+
+    def __init__(self, controller, file_path: Optional[str] = None, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._loader = controller.git.blame
+
+        # ウィンドウ設定
+        self.setWindowTitle("Blame - 行ごとの変更履歴")
+        self.resize(1000, 700)
+
+        # UI構築
+        self._setup_ui()
+
+        self._loader.content_ready.connect(self._on_content_ready)
+        self._loader.chunks_ready.connect(self._on_chunks_ready)
+        self._loader.finished.connect(self._on_finished)
+        self._loader.failed.connect(self._on_failed)
+
+        if file_path:
+            self.show_file(file_path)
+
+    def _setup_ui(self):
+        """UIを構築"""
+        layout = QVBoxLayout(self)
+
+        # ファイル選択
+        path_layout = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        self.path_edit.setPlaceholderText("ファイルのパスを入力...")
+        self._completer = QCompleter(self)
+        self._completer.setModel(QStringListModel(self._completer))
+        self._completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        self._completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.path_edit.setCompleter(self._completer)
+        self.path_edit.returnPressed.connect(self._on_show_clicked)
+        path_layout.addWidget(self.path_edit, stretch=1)
+
+        show_button = QPushButton("表示")
+        show_button.clicked.connect(self._on_show_clicked)
+        path_layout.addWidget(show_button)
+
+        self.cancel_button = QPushButton("中止")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self._on_cancel_clicked)
+        path_layout.addWidget(self.cancel_button)
+        layout.addLayout(path_layout)
+
+        # blame結果(行数が多くても表示中の行だけが描画される)
+        self.model = BlameModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setWordWrap(False)
+        self.table.setShowGrid(False)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(
+            self.table.fontMetrics().height() + 4
+        )
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(True)
+        for column, width in ((0, 80), (1, 140), (2, 90), (3, 50)):
+            header.resizeSection(column, width)
+        layout.addWidget(self.table, stretch=1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    # ==================== 操作 ====================
+
+    def show_file(self, file_path: str):
+        """ファイルの blame を開始(実行中のものは中断)"""
+        self.path_edit.setText(file_path)
+        self.model.clear()
+        if not self.controller.git.blame_file(file_path):
+            self.status_label.setText("")
+            return
+        # キャッシュがあれば blame_file() の中で完了している
+        if self._loader.is_running:
+            self.cancel_button.setEnabled(True)
+            self.status_label.setText(f"{file_path} を解析中...")
+
+    def _on_show_clicked(self):
+        file_path = self.path_edit.text().strip()
+        if file_path:
+            self.show_file(file_path)
+
+    def _on_cancel_clicked(self):
+        self._loader.cancel()
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(
+            f"中止しました({self.model.annotated_count}/{self.model.rowCount()} 行)"
+        )
+
+    # ==================== blameの結果 ====================
+
+    def _is_current(self, file_path: str) -> bool:
+        return file_path == self.path_edit.text().strip()
+
+    def _on_content_ready(self, file_path: str, lines: list):
+        if self._is_current(file_path):
+            self.model.set_lines(lines)
+
+    def _on_chunks_ready(self, file_path: str, chunks: list):
+        if not self._is_current(file_path):
+            return
+        self.model.add_chunks(chunks)
+        if self._loader.is_running:
+            self.status_label.setText(
+                f"{file_path} を解析中... "
+                f"{self.model.annotated_count}/{self.model.rowCount()} 行"
+            )
+
+    def _on_finished(self, file_path: str):
+        if not self._is_current(file_path):
+            return
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"{file_path}: {self.model.rowCount()} 行")
+
+    def _on_failed(self, file_path: str, error: str):
+        if not self._is_current(file_path):
+            return
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"blameに失敗しました: {error}")
+
+    def showEvent(self, event):
+        """補完候補を開いているリポジトリのファイル一覧にする"""
+        self._completer.model().setStringList(self.controller.git.get_tracked_files())
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        """閉じたら実行中の blame を中断"""
+        self._loader.cancel()
+        self.cancel_button.setEnabled(False)
+        super().hideEvent(event)
@@ -0,0 +1,305 @@
+"""リポジトリ内のファイルを検索するダイアログ"""
+
+from typing import List
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTreeView,
+    QVBoxLayout,
+)
+
+from models.grep import GrepMatch
+
+
+class _FileGroup:
+    """1ファイル分の検索結果"""
+
+    def __init__(self, path: str, row: int):
+        self.path = path
+        self.row = row
+        self.matches: List[GrepMatch] = []
+
+
+# ファイルの行を表すインデックスの internalPointer(一致した行はファイルを指す)
+_FILE_ROW = object()
+
+
+class GrepResultModel(QAbstractItemModel):
+    """
+    検索結果のツリーモデル(ファイル → 一致した行)
+
+    git grep の結果はファイルの順に届くため、末尾のファイルに行を足すか
+    新しいファイルを末尾に追加するだけで済む
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._groups: List[_FileGroup] = []
+        self._match_count = 0
+
+    @property
+    def match_count(self) -> int:
+        return self._match_count
+
+    @property
+    def file_count(self) -> int:
+        return len(self._groups)
+
+    def clear(self):
+        self.beginResetModel()
+        self._groups = []
+        self._match_count = 0
+        self.endResetModel()
+
+    def append(self, matches: List[GrepMatch]):
+        """受け取った行を末尾に追加"""
+        start = 0
+        while start < len(matches):
+            path = matches[start].path
+            end = start + 1
+            while end < len(matches) and matches[end].path == path:
+                end += 1
+            self._append_group(path, matches[start:end])
+            start = end
+
+    def match_at(self, index: QModelIndex):
+        """インデックスが一致した行ならその GrepMatch、ファイルならパスを返す"""
+        if not index.isValid():
+            return None
+        if index.internalPointer() is _FILE_ROW:
+            return self._groups[index.row()].path
+        return index.internalPointer().matches[index.row()]
+
+    # ==================== QAbstractItemModel ====================
+
+    def index(self, row, column, parent=QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, _FILE_ROW)
+        return self.createIndex(row, column, self._groups[parent.row()])
+
+    def parent(self, index=QModelIndex()) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        pointer = index.internalPointer()
+        if pointer is _FILE_ROW:
+            return QModelIndex()
+        return self.createIndex(pointer.row, 0, _FILE_ROW)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalPointer() is _FILE_ROW and parent.column() == 0:
+            return len(self._groups[parent.row()].matches)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalPointer() is _FILE_ROW:
+            group = self._groups[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole:
+                return f"{group.path}  ({len(group.matches)})"
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return group.path
+            return None
+
+        match = index.internalPointer().matches[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{match.line_number:>6}: {match.text}"
+        if role == Qt.ItemDataRole.FontRole:
+            return QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
+        return None
+
+    # ==================== プライベートメソッド ====================
+
+    def _append_group(self, path: str, matches: List[GrepMatch]):
+        self._match_count += len(matches)
+        if self._groups and self._groups[-1].path == path:
+            group = self._groups[-1]
+            parent = self.createIndex(group.row, 0, _FILE_ROW)
+            first = len(group.matches)
+            self.beginInsertRows(parent, first, first + len(matches) - 1)
+            group.matches.extend(matches)
+            self.endInsertRows()
+            # 件数の表示を更新
+            self.dataChanged.emit(parent, parent)
+            return
+
+        row = len(self._groups)
+        group = _FileGroup(path, row)
+        group.matches = list(matches)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._groups.append(group)
+        self.endInsertRows()
+
+
+class ContentSearchDialog(QDialog):
+    """
+    リポジトリ内検索ダイアログ
+
+    入力が止まったら検索を開始し、見つかった行をファイルごとにまとめて
+    順に表示する。入力を変えると実行中の検索は中断され、やり直す
+    """
+
+    # 入力が止まってから検索を始めるまでの時間(ミリ秒)
+    SEARCH_DELAY = 300
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._searcher = controller.git.content_search
+
+        # ウィンドウ設定
+        self.setWindowTitle("リポジトリ内を検索")
+        self.resize(900, 650)
+
+        # UI構築
+        self._setup_ui()
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._search_timer.timeout.connect(self._start_search)
+
+        self._searcher.results_ready.connect(self._on_results_ready)
+        self._searcher.finished.connect(self._on_finished)
+        self._searcher.failed.connect(self._on_failed)
+
+    def _setup_ui(self):
+        """UIを構築"""
+        layout = QVBoxLayout(self)
+
+        # 検索条件
+        query_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("文字列", True)
+        self.mode_combo.addItem("正規表現", False)
+        self.mode_combo.currentIndexChanged.connect(self._schedule_search)
+        query_layout.addWidget(self.mode_combo)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("検索する文字列を入力...")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.textChanged.connect(self._schedule_search)
+        self.query_edit.returnPressed.connect(self._start_search)
+        query_layout.addWidget(self.query_edit, stretch=1)
+
+        self.cancel_button = QPushButton("中止")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self._on_cancel_clicked)
+        query_layout.addWidget(self.cancel_button)
+        layout.addLayout(query_layout)
+
+        option_layout = QHBoxLayout()
+        self.ignore_case_check = QCheckBox("大文字と小文字を区別しない")
+        self.ignore_case_check.setChecked(True)
+        self.ignore_case_check.toggled.connect(self._schedule_search)
+        option_layout.addWidget(self.ignore_case_check)
+
+        self.untracked_check = QCheckBox("追跡されていないファイルも検索")
+        self.untracked_check.toggled.connect(self._schedule_search)
+        option_layout.addWidget(self.untracked_check)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+        # 検索結果(行数が多くても表示中の行だけが描画される)
+        self.model = GrepResultModel(self)
+        self.model.rowsInserted.connect(self._on_rows_inserted)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.doubleClicked.connect(self._on_result_double_clicked)
+        layout.addWidget(self.tree, stretch=1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    # ==================== 検索 ====================
+
+    def _schedule_search(self):
+        self._search_timer.start()
+
+    def _start_search(self):
+        self._search_timer.stop()
+        self.model.clear()
+        pattern = self.query_edit.text()
+        if not pattern:
+            self._searcher.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("")
+            return
+        self._searcher.search(
+            pattern,
+            fixed_string=self.mode_combo.currentData(),
+            ignore_case=self.ignore_case_check.isChecked(),
+            untracked=self.untracked_check.isChecked(),
+        )
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText("検索中...")
+
+    def _on_cancel_clicked(self):
+        self._search_timer.stop()
+        self._searcher.cancel()
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"中止しました({self._summary()})")
+
+    def _on_rows_inserted(self, parent, first, last):
+        """新しく追加されたファイルは展開しておく"""
+        if parent.isValid():
+            return
+        for row in range(first, last + 1):
+            self.tree.expand(self.model.index(row, 0))
+
+    def _on_results_ready(self, matches: list):
+        self.model.append(matches)
+        self.status_label.setText(f"検索中... {self._summary()}")
+
+    def _on_finished(self, count: int):
+        self.cancel_button.setEnabled(False)
+        if count >= self._searcher.MAX_HITS:
+            self.status_label.setText(
+                f"{self._summary()}(上限に達したため打ち切りました)"
+            )
+        else:
+            self.status_label.setText(self._summary())
+
+    def _on_failed(self, error: str):
+        self.cancel_button.setEnabled(False)
+        self.status_label.setText(f"検索に失敗しました: {error}")
+
+    def _summary(self) -> str:
+        return f"{self.model.file_count} ファイル / {self.model.match_count} 件"
+
+    def _on_result_double_clicked(self, index):
+        """ファイルのパス(一致した行なら パス:行番号)をクリップボードにコピー"""
+        item = self.model.match_at(index)
+        if item is None:
+            return
+        if isinstance(item, GrepMatch):
+            text = f"{item.path}:{item.line_number}"
+        else:
+            text = item
+        QApplication.clipboard().setText(text)
+        self.status_label.setText(f"✓ {text} をコピーしました")
+
+    def hideEvent(self, event):
+        """閉じたら実行中の検索を中断"""
+        self._search_timer.stop()
+        self._searcher.cancel()
+        self.cancel_button.setEnabled(False)
+        super().hideEvent(event)
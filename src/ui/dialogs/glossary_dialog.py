@@ -1,3 +1,4 @@
+import html
 from typing import Optional, List
 from PySide6.QtWidgets import (
     QDialog,
@@ -16,7 +17,16 @@ from models.glossary import GlossaryTerm
 
 
 class GlossaryDetailDialog(QDialog):
-    """用語詳細ダイアログ"""
+    """
+    用語詳細ダイアログ
+
+    1つのダイアログを使い回し、show_term() で表示内容だけを更新する。
+    関連用語はリンクになっており、クリックするとその用語に移動する
+    (戻る・進むで表示した用語をたどれる)
+    """
+
+    # 履歴に残す用語の数
+    MAX_HISTORY = 50
 
     def __init__(
         self,
@@ -26,7 +36,9 @@ class GlossaryDetailDialog(QDialog):
     ):
         super().__init__(parent)
         self.terms = all_terms or []
-        self.current_term = term
+        self.current_term: Optional[GlossaryTerm] = None
+        self._history: List[GlossaryTerm] = []
+        self._history_index = -1
 
         # ウィンドウ設定
         self.setWindowTitle("用語の詳細")
@@ -34,6 +46,7 @@ class GlossaryDetailDialog(QDialog):
 
         # UI構築
         self._setup_ui()
+        self.show_term(term)
 
     def _setup_ui(self):
         """UIを構築"""
@@ -44,21 +57,90 @@ class GlossaryDetailDialog(QDialog):
         # コンテンツを追加
         layout.addWidget(self._create_header())
         layout.addWidget(self._create_content())
+        layout.addStretch()
         layout.addWidget(self._create_footer())
 
+    # ==================== 表示 ====================
+
+    def show_term(self, term: Optional[GlossaryTerm], add_history: bool = True):
+        """
+        用語を表示(ウィジェットは作り直さず、内容だけを更新する)
+
+        Args:
+            term: 表示する用語
+            add_history: Falseなら履歴に追加しない(戻る・進むの場合)
+        """
+        self.current_term = term
+        if term is not None and add_history:
+            if (
+                self._history_index < 0
+                or self._history[self._history_index] is not term
+            ):
+                # 戻った後に別の用語を開いたら、進む側の履歴は捨てる
+                del self._history[self._history_index + 1 :]
+                self._history.append(term)
+                if len(self._history) > self.MAX_HISTORY:
+                    del self._history[0]
+                self._history_index = len(self._history) - 1
+
+        if term is None:
+            self.term_label.setText("用語を選択してください")
+            self.short_desc_label.setText("")
+            self.description_label.setText("")
+            self.command_label.setText("")
+        else:
+            self.term_label.setText(term.term)
+            self.short_desc_label.setText(term.short_desc)
+            self.description_label.setText(term.description)
+            self.command_label.setText(term.command)
+        self.related_label.setText(self._related_html(term))
+        self.back_button.setEnabled(self._history_index > 0)
+        self.forward_button.setEnabled(self._history_index < len(self._history) - 1)
+
+    def go_back(self):
+        """1つ前に表示した用語に戻る"""
+        if self._history_index > 0:
+            self._history_index -= 1
+            self.show_term(self._history[self._history_index], add_history=False)
+
+    def go_forward(self):
+        """戻る前の用語に進む"""
+        if self._history_index < len(self._history) - 1:
+            self._history_index += 1
+            self.show_term(self._history[self._history_index], add_history=False)
+
+    def _related_html(self, term: Optional[GlossaryTerm]) -> str:
+        """関連用語のリンク(href は related_terms の番号)"""
+        if term is None or not (term.related_terms or term.missing_related):
+            return "関連用語はありません。"
+        items = [
+            f'- <a href="{i}">{html.escape(related.term)}</a>'
+            for i, related in enumerate(term.related_terms)
+        ]
+        items.extend(f"- {html.escape(name)}" for name in term.missing_related)
+        return "<br>".join(items)
+
+    def _on_related_link_activated(self, link: str):
+        """関連用語のリンクがクリックされた時の処理"""
+        if self.current_term is None:
+            return
+        try:
+            related = self.current_term.related_terms[int(link)]
+        except (ValueError, IndexError):
+            return
+        self.show_term(related)
+
+    # ==================== UI構築 ====================
+
     def _create_header(self) -> QWidget:
         """ヘッダー部分（用語名）を作成"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
 
         # 用語名を大きく表示
-        term_label = QLabel(
-            "用語を選択してください"
-            if self.current_term is None
-            else self.current_term.term
-        )
-        term_label.setStyleSheet("font-size: 20px; font-weight: bold;")
-        layout.addWidget(term_label)
+        self.term_label = QLabel()
+        self.term_label.setStyleSheet("font-size: 20px; font-weight: bold;")
+        layout.addWidget(self.term_label)
 
         return widget
 
@@ -89,89 +171,27 @@ class GlossaryDetailDialog(QDialog):
         return widget
 
     def _create_content(self) -> QWidget:
-
-        def _short_desc_widget() -> QWidget:
-            """短い説明ウィジェットを作成"""
-            widget = QWidget()
-            layout = QVBoxLayout(widget)
-
-            label = QLabel("短い説明:")
-            content = QLabel(
-                "" if self.current_term is None else self.current_term.short_desc
-            )
-            content.setWordWrap(True)
-
-            layout.addWidget(label)
-            layout.addWidget(content)
-
-            return widget
-
-        def _detailed_desc_widget() -> QWidget:
-            """詳細説明ウィジェットを作成"""
-            widget = QWidget()
-            layout = QVBoxLayout(widget)
-
-            label = QLabel("詳細説明:")
-            content = QLabel(
-                "" if self.current_term is None else self.current_term.description
-            )
-            content.setWordWrap(True)
-
-            layout.addWidget(label)
-            layout.addWidget(content)
-
-            return widget
-
-        def _related_terms_widget() -> QWidget:
-            """関連用語ウィジェットを作成"""
-            widget = QWidget()
-            layout = QVBoxLayout(widget)
-
-            label = QLabel("関連用語:")
-            layout.addWidget(label)
-
-            if self.current_term is not None and self.current_term.related:
-                for related_term_name in self.current_term.related:
-                    related_label = QLabel(f"- {related_term_name}")
-                    layout.addWidget(related_label)
-            else:
-                no_related_label = QLabel("関連用語はありません。")
-                layout.addWidget(no_related_label)
-
-            return widget
-
-        def _command_widget() -> QWidget:
-            """コマンドウィジェットを作成"""
-            widget = QWidget()
-            layout = QVBoxLayout(widget)
-
-            label = QLabel("関連コマンド:")
-            content = QLabel(
-                "" if self.current_term is None else self.current_term.command
-            )
-            content.setWordWrap(True)
-
-            layout.addWidget(label)
-            layout.addWidget(content)
-
-            return widget
-
         """コンテンツ部分（説明など）を作成"""
         widget = QWidget()
         layout = QVBoxLayout(widget)
 
-        # ここに短い説明、詳細説明、関連用語などを追加
-        short_desc_widget = _short_desc_widget()
-        layout.addWidget(short_desc_widget)
-
-        detailed_desc_widget = _detailed_desc_widget()
-        layout.addWidget(detailed_desc_widget)
-
-        related_terms_widget = _related_terms_widget()
-        layout.addWidget(related_terms_widget)
+        def add_section(title: str) -> QLabel:
+            """見出しと内容のラベルを追加し、内容のラベルを返す"""
+            section = QWidget()
+            section_layout = QVBoxLayout(section)
+            section_layout.addWidget(QLabel(title))
+            content = QLabel()
+            content.setWordWrap(True)
+            section_layout.addWidget(content)
+            layout.addWidget(section)
+            return content
 
-        command_widget = _command_widget()
-        layout.addWidget(command_widget)
+        self.short_desc_label = add_section("短い説明:")
+        self.description_label = add_section("詳細説明:")
+        self.related_label = add_section("関連用語:")
+        self.related_label.setTextFormat(Qt.TextFormat.RichText)
+        self.related_label.linkActivated.connect(self._on_related_link_activated)
+        self.command_label = add_section("関連コマンド:")
 
         return widget
 
@@ -179,6 +199,16 @@ class GlossaryDetailDialog(QDialog):
         """フッター部分（ボタン）を作成"""
         widget = QWidget()
         layout = QHBoxLayout(widget)
+
+        # 履歴の移動
+        self.back_button = QPushButton("← 戻る")
+        self.back_button.clicked.connect(self.go_back)
+        layout.addWidget(self.back_button)
+
+        self.forward_button = QPushButton("進む →")
+        self.forward_button.clicked.connect(self.go_forward)
+        layout.addWidget(self.forward_button)
+
         layout.addStretch()
 
         # 閉じるボタン
@@ -0,0 +1,215 @@
+"""コミット履歴を検索するダイアログ"""
+
+from typing import List
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PySide6.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QTableView,
+    QVBoxLayout,
+)
+
+from models.history import LogEntry
+
+
+class LogEntryModel(QAbstractTableModel):
+    """検索結果のテーブルモデル(結果は末尾に追加していく)"""
+
+    COLUMNS = ("コミット", "日時", "作者", "メッセージ")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: List[LogEntry] = []
+
+    def clear(self):
+        self.beginResetModel()
+        self._entries = []
+        self.endResetModel()
+
+    def append(self, entries: List[LogEntry]):
+        if not entries:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._entries.extend(entries)
+        self.endInsertRows()
+
+    def entry(self, row: int) -> LogEntry:
+        return self._entries[row]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._entries)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (entry.short_sha, entry.date, entry.author, entry.subject)[
+                index.column()
+            ]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return (
+                f"{entry.sha}\n{entry.author} <{entry.author_mail}>\n\n"
+                f"{entry.subject}"
+            )
+        return None
+
+
+class HistorySearchDialog(QDialog):
+    """
+    履歴検索ダイアログ
+
+    入力が止まったら検索を開始し、見つかったコミットから順に表示する。
+    入力を変えると実行中の検索は中断され、新しい条件でやり直す
+    """
+
+    # 検索の種類(表示名, HistorySearcher のモード)
+    MODES = (
+        ("メッセージ (--grep)", "message"),
+        ("作者 (--author)", "author"),
+        ("追加・削除された文字列 (-S)", "pickaxe"),
+        ("変更行の正規表現 (-G)", "regex"),
+    )
+
+    # 入力が止まってから検索を始めるまでの時間(ミリ秒)
+    SEARCH_DELAY = 300
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._searcher = controller.git.history_search
+
+        # ウィンドウ設定
+        self.setWindowTitle("履歴を検索")
+        self.resize(900, 600)
+
+        # UI構築
+        self._setup_ui()
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._search_timer.timeout.connect(self._start_search)
+
+        self._searcher.results_ready.connect(self._on_results_ready)
+        self._searcher.finished.connect(self._on_finished)
+        self._searcher.failed.connect(self._on_failed)
+
+    def _setup_ui(self):
+        """UIを構築"""
+        layout = QVBoxLayout(self)
+
+        # 検索条件
+        query_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        for label, mode in self.MODES:
+            self.mode_combo.addItem(label, mode)
+        self.mode_combo.currentIndexChanged.connect(self._schedule_search)
+        query_layout.addWidget(self.mode_combo)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("検索する文字列を入力...")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.textChanged.connect(self._schedule_search)
+        self.query_edit.returnPressed.connect(self._start_search)
+        query_layout.addWidget(self.query_edit, stretch=1)
+        layout.addLayout(query_layout)
+
+        option_layout = QHBoxLayout()
+        self.ignore_case_check = QCheckBox("大文字と小文字を区別しない")
+        self.ignore_case_check.setChecked(True)
+        self.ignore_case_check.toggled.connect(self._schedule_search)
+        option_layout.addWidget(self.ignore_case_check)
+
+        self.all_branches_check = QCheckBox("すべてのブランチ")
+        self.all_branches_check.toggled.connect(self._schedule_search)
+        option_layout.addWidget(self.all_branches_check)
+        option_layout.addStretch()
+        layout.addLayout(option_layout)
+
+        # 検索結果
+        self.model = LogEntryModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setWordWrap(False)
+        self.table.setShowGrid(False)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(
+            self.table.fontMetrics().height() + 6
+        )
+        header = self.table.horizontalHeader()
+        header.setStretchLastSection(True)
+        for column, width in ((0, 80), (1, 130), (2, 140)):
+            header.resizeSection(column, width)
+        self.table.doubleClicked.connect(self._on_result_double_clicked)
+        layout.addWidget(self.table, stretch=1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    # ==================== 検索 ====================
+
+    def _schedule_search(self):
+        self._search_timer.start()
+
+    def _start_search(self):
+        self._search_timer.stop()
+        self.model.clear()
+        query = self.query_edit.text()
+        if not query:
+            self._searcher.cancel()
+            self.status_label.setText("")
+            return
+        self._searcher.search(
+            self.mode_combo.currentData(),
+            query,
+            ignore_case=self.ignore_case_check.isChecked(),
+            all_branches=self.all_branches_check.isChecked(),
+        )
+        self.status_label.setText("検索中...")
+
+    def _on_results_ready(self, entries: list):
+        self.model.append(entries)
+        self.status_label.setText(f"検索中... {self.model.rowCount()} 件")
+
+    def _on_finished(self, count: int):
+        if count >= self._searcher.MAX_COUNT:
+            self.status_label.setText(f"{count} 件(上限に達したため打ち切りました)")
+        else:
+            self.status_label.setText(f"{count} 件")
+
+    def _on_failed(self, error: str):
+        self.status_label.setText(f"検索に失敗しました: {error}")
+
+    def _on_result_double_clicked(self, index):
+        """コミットIDをクリップボードにコピー"""
+        entry = self.model.entry(index.row())
+        QApplication.clipboard().setText(entry.sha)
+        self.status_label.setText(f"✓ {entry.short_sha} のコミットIDをコピーしました")
+
+    def hideEvent(self, event):
+        """閉じたら実行中の検索を中断"""
+        self._search_timer.stop()
+        self._searcher.cancel()
+        super().hideEvent(event)
@@ -0,0 +1,357 @@
+"""処理時間・キャッシュのヒット率・ジョブのキューを表示するダイアログ"""
+
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, Optional
+
+from PySide6.QtCore import QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import (
+    QApplication,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QSplitter,
+    QTabWidget,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from utils import get_logger, metrics
+
+logger = get_logger(__name__)
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+class _SortItem(QTreeWidgetItem):
+    """数値の列は値で並べ替える"""
+
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn()
+        mine = self.data(column, Qt.ItemDataRole.UserRole)
+        theirs = other.data(column, Qt.ItemDataRole.UserRole)
+        if mine is not None and theirs is not None:
+            return mine < theirs
+        return self.text(column) < other.text(column)
+
+
+class HistogramWidget(QWidget):
+    """1つの操作の処理時間のヒストグラム(対数目盛り)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._buckets: Dict[str, int] = {}
+        self._title = ""
+        self.setMinimumHeight(140)
+
+    def set_histogram(self, title: str, buckets: Dict[str, int]):
+        self._title = title
+        self._buckets = buckets
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect().adjusted(8, 8, -8, -8)
+        painter.fillRect(self.rect(), self.palette().base())
+        if not self._buckets:
+            painter.drawText(
+                rect,
+                Qt.AlignmentFlag.AlignCenter,
+                "操作を選択するとヒストグラムを表示します",
+            )
+            return
+
+        buckets = sorted(
+            self._buckets.items(),
+            key=lambda item: float("inf") if item[0] == "inf" else float(item[0]),
+        )
+        text_height = painter.fontMetrics().height()
+        painter.drawText(rect, Qt.AlignmentFlag.AlignTop, self._title)
+        chart = rect.adjusted(0, text_height + 4, 0, -(text_height + 4))
+        peak = max(count for _, count in buckets)
+        width = chart.width() / len(buckets)
+        color = QColor(80, 160, 255)
+        for i, (_, count) in enumerate(buckets):
+            height = chart.height() * count / peak
+            painter.fillRect(
+                QRectF(
+                    chart.left() + i * width + 1,
+                    chart.bottom() - height,
+                    max(width - 2, 1),
+                    height,
+                ),
+                color,
+            )
+
+        # 横軸は最小と最大の区間だけ表示する
+        def label(bound: str) -> str:
+            return "∞" if bound == "inf" else f"≤{_format_seconds(float(bound))}"
+
+        painter.drawText(
+            rect,
+            Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft,
+            label(buckets[0][0]),
+        )
+        painter.drawText(
+            rect,
+            Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignRight,
+            label(buckets[-1][0]),
+        )
+
+
+class MetricsDialog(QDialog):
+    """
+    パフォーマンス計測ダイアログ
+
+    表示している間は1秒ごとに更新する。内容はJSONに書き出して
+    不具合報告に添付できる
+    """
+
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._snapshot: dict = {}
+
+        # ウィンドウ設定
+        self.setWindowTitle("パフォーマンス")
+        self.resize(900, 600)
+
+        # UI構築
+        self._setup_ui()
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+
+    def _setup_ui(self):
+        """UIを構築"""
+        layout = QVBoxLayout(self)
+
+        tabs = QTabWidget()
+        tabs.addTab(self._create_latency_tab(), "処理時間")
+        tabs.addTab(self._create_counter_tab(), "キャッシュ・プロセス")
+        tabs.addTab(self._create_job_tab(), "ジョブ")
+        layout.addWidget(tabs, stretch=1)
+
+        button_layout = QHBoxLayout()
+        self.uptime_label = QLabel("")
+        button_layout.addWidget(self.uptime_label)
+        button_layout.addStretch()
+
+        export_button = QPushButton("JSONに書き出す...")
+        export_button.clicked.connect(self._on_export_clicked)
+        button_layout.addWidget(export_button)
+
+        reset_button = QPushButton("リセット")
+        reset_button.clicked.connect(self._on_reset_clicked)
+        button_layout.addWidget(reset_button)
+
+        close_button = QPushButton("閉じる")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def _create_latency_tab(self) -> QWidget:
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.latency_tree = self._create_tree(
+            ["操作", "回数", "p50", "p95", "p99", "最大", "合計"]
+        )
+        self.latency_tree.currentItemChanged.connect(self._update_histogram)
+        splitter.addWidget(self.latency_tree)
+        self.histogram = HistogramWidget()
+        splitter.addWidget(self.histogram)
+        splitter.setSizes([400, 160])
+        return splitter
+
+    def _create_counter_tab(self) -> QWidget:
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.addWidget(QLabel("キャッシュ"))
+        self.cache_tree = self._create_tree(
+            ["キャッシュ", "ヒット", "ミス", "ヒット率"]
+        )
+        layout.addWidget(self.cache_tree)
+        layout.addWidget(QLabel("回数(spawn.* は起動したgitプロセスの数)"))
+        self.counter_tree = self._create_tree(["項目", "回数"])
+        layout.addWidget(self.counter_tree)
+        return widget
+
+    def _create_job_tab(self) -> QWidget:
+        self.job_tree = self._create_tree(
+            [
+                "優先度",
+                "待機中",
+                "実行中",
+                "完了",
+                "失敗",
+                "中断",
+                "平均待ち",
+                "最大待ち",
+            ]
+        )
+        self.job_tree.setSortingEnabled(False)
+        return self.job_tree
+
+    @staticmethod
+    def _create_tree(headers) -> QTreeWidget:
+        tree = QTreeWidget()
+        tree.setHeaderLabels(headers)
+        tree.setRootIsDecorated(False)
+        tree.setSortingEnabled(True)
+        tree.setUniformRowHeights(True)
+        tree.header().resizeSection(0, 260)
+        return tree
+
+    # ==================== 表示の更新 ====================
+
+    def refresh(self):
+        """最新の集計結果を表示"""
+        self._snapshot = metrics.snapshot()
+        self.uptime_label.setText(f"計測時間: {self._snapshot['uptime']:.0f} 秒")
+
+        rows = []
+        for name, stats in self._snapshot["latency"].items():
+            rows.append(
+                (
+                    name,
+                    (stats["count"], str(stats["count"])),
+                    *(
+                        (stats[key], _format_seconds(stats[key]))
+                        for key in ("p50", "p95", "p99", "max", "total")
+                    ),
+                )
+            )
+        self._fill(self.latency_tree, rows)
+        self._update_histogram()
+
+        self._fill(
+            self.cache_tree,
+            [
+                (
+                    name,
+                    (stats["hits"], str(stats["hits"])),
+                    (stats["misses"], str(stats["misses"])),
+                    (stats["hit_rate"], f"{stats['hit_rate'] * 100:.1f}%"),
+                )
+                for name, stats in self._snapshot["caches"].items()
+            ],
+        )
+        self._fill(
+            self.counter_tree,
+            [
+                (name, (value, str(value)))
+                for name, value in self._snapshot["counters"].items()
+            ],
+        )
+
+        job_rows = []
+        for priority, stats in self.controller.git.job_metrics().items():
+            job_rows.append(
+                (
+                    priority,
+                    *(
+                        (stats[key], str(stats[key]))
+                        for key in (
+                            "queued",
+                            "running",
+                            "completed",
+                            "failed",
+                            "cancelled",
+                        )
+                    ),
+                    (stats["wait_avg"], _format_seconds(stats["wait_avg"])),
+                    (stats["wait_max"], _format_seconds(stats["wait_max"])),
+                )
+            )
+        self._fill(self.job_tree, job_rows)
+
+    @staticmethod
+    def _fill(tree: QTreeWidget, rows):
+        """
+        行を差し替える(選択中の行は維持する)
+
+        Args:
+            rows: (名前, (値, 表示文字列), ...) のリスト
+        """
+        current = tree.currentItem()
+        current_name = current.text(0) if current is not None else None
+        sorting = tree.isSortingEnabled()
+        tree.setSortingEnabled(False)
+        tree.clear()
+        for name, *values in rows:
+            item = _SortItem([name, *(text for _, text in values)])
+            for column, (value, _) in enumerate(values, start=1):
+                item.setData(column, Qt.ItemDataRole.UserRole, value)
+                item.setTextAlignment(
+                    column, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                )
+            tree.addTopLevelItem(item)
+            if name == current_name:
+                tree.setCurrentItem(item)
+        tree.setSortingEnabled(sorting)
+
+    def _update_histogram(self, *args):
+        item = self.latency_tree.currentItem()
+        stats: Optional[dict] = None
+        if item is not None:
+            stats = self._snapshot.get("latency", {}).get(item.text(0))
+        if stats is None:
+            self.histogram.set_histogram("", {})
+            return
+        self.histogram.set_histogram(
+            f"{item.text(0)}  ({stats['count']} 回)", stats["histogram"]
+        )
+
+    # ==================== 操作 ====================
+
+    def _on_export_clicked(self):
+        default_name = datetime.now().strftime("leafgit-metrics-%Y%m%d-%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "JSONに書き出す", default_name, "JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            metrics.export_json(path, extra=self._environment())
+        except OSError as e:
+            logger.warning("計測結果の書き出しに失敗: %s", e)
+            QMessageBox.warning(self, "エラー", f"書き出しに失敗しました: {e}")
+            return
+        logger.info("計測結果を書き出しました: %s", path)
+
+    def _environment(self) -> dict:
+        """計測結果と一緒に書き出す環境の情報"""
+        return {
+            "exported_at": datetime.now().isoformat(timespec="seconds"),
+            "version": QApplication.applicationVersion(),
+            "platform": platform.platform(),
+            "python": sys.version,
+            "jobs": self.controller.git.job_metrics(),
+        }
+
+    def _on_reset_clicked(self):
+        metrics.reset()
+        self.refresh()
+
+    def showEvent(self, event):
+        """表示している間だけ定期的に更新する"""
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
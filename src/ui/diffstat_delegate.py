@@ -0,0 +1,104 @@
+"""変更一覧の各行の右端に行数の増減を描画するデリゲート"""
+
+from typing import Callable, Optional
+
+from PySide6.QtCore import QRect, QSize, Qt
+from PySide6.QtGui import QColor, QPalette
+from PySide6.QtWidgets import (
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+)
+
+from models.diffstat import DiffStat
+
+ADDED_COLOR = QColor("#2e9e44")
+DELETED_COLOR = QColor("#d03c3c")
+BINARY_COLOR = QColor("#888888")
+
+
+class DiffStatDelegate(QStyledItemDelegate):
+    """
+    行の文字列(パス)はそのままに、右端に "+12 −3" を描画する
+
+    変更量は行のデータとしては持たず、描画のたびに lookup で引く
+    (集計が進むたびに全行を書き換えなくて済むように)
+    """
+
+    SPACING = 12
+
+    def __init__(self, lookup: Callable[[str], Optional[DiffStat]], parent=None):
+        """
+        Args:
+            lookup: パスから集計済みの DiffStat を返す関数(未集計ならNone)
+        """
+        super().__init__(parent)
+        self._lookup = lookup
+
+    def paint(self, painter, option, index):
+        stat = self._lookup(index.data(Qt.ItemDataRole.DisplayRole) or "")
+        if stat is None:
+            super().paint(painter, option, index)
+            return
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        metrics = opt.fontMetrics
+        parts = self._label_parts(stat)
+        stat_width = sum(metrics.horizontalAdvance(text) for text, _ in parts)
+        stat_width += metrics.horizontalAdvance(" ") * (len(parts) - 1)
+
+        # パスは変更量と重ならない幅で省略表示する
+        path = opt.text
+        text_rect = QRect(opt.rect)
+        text_rect.setRight(opt.rect.right() - stat_width - self.SPACING)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(
+            QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget
+        )
+
+        selected = bool(opt.state & QStyle.StateFlag.State_Selected)
+        text_role = (
+            QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text
+        )
+        painter.save()
+        painter.setFont(opt.font)
+        painter.setPen(opt.palette.color(text_role))
+        margin = style.pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin) + 1
+        text_rect.adjust(margin, 0, 0, 0)
+        painter.drawText(
+            text_rect,
+            Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft,
+            metrics.elidedText(path, Qt.TextElideMode.ElideMiddle, text_rect.width()),
+        )
+
+        x = opt.rect.right() - stat_width - margin
+        for text, color in parts:
+            painter.setPen(opt.palette.color(text_role) if selected else color)
+            width = metrics.horizontalAdvance(text)
+            painter.drawText(
+                QRect(x, opt.rect.top(), width, opt.rect.height()),
+                Qt.AlignmentFlag.AlignVCenter,
+                text,
+            )
+            x += width + metrics.horizontalAdvance(" ")
+        painter.restore()
+
+    def sizeHint(self, option, index) -> QSize:
+        hint = super().sizeHint(option, index)
+        stat = self._lookup(index.data(Qt.ItemDataRole.DisplayRole) or "")
+        if stat is not None:
+            hint.setWidth(
+                hint.width()
+                + option.fontMetrics.horizontalAdvance(stat.label())
+                + self.SPACING
+            )
+        return hint
+
+    @staticmethod
+    def _label_parts(stat: DiffStat):
+        if stat.binary:
+            return [("bin", BINARY_COLOR)]
+        return [(f"+{stat.added}", ADDED_COLOR), (f"−{stat.deleted}", DELETED_COLOR)]
@@ -0,0 +1,226 @@
+"""変更ファイルツリーを遅延展開で表示するためのQtモデル"""
+
+from typing import List, Optional
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor
+
+from models.file_tree import FileTreeNode, apply_status_delta
+from models.submodule import SubmoduleStatus
+
+# ステータスごとの表示色
+_STATUS_COLORS = {
+    "Staged": QColor(Qt.GlobalColor.green),
+    "Modified": QColor(Qt.GlobalColor.yellow),
+    "Untracked": QColor(Qt.GlobalColor.red),
+    "Deleted": QColor(Qt.GlobalColor.darkRed),
+}
+
+
+class ChangedFileTreeModel(QAbstractItemModel):
+    """
+    FileTreeNode を元にしたツリーモデル
+
+    子ノードは展開時に fetchMore() で FETCH_BATCH 件ずつ追加されるため、
+    大量の子を持つディレクトリを展開してもUIが固まらない。
+    """
+
+    FETCH_BATCH = 500
+    _HEADERS = ["ファイル", "状態"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = FileTreeNode("", "")
+        self._loaded = {}  # id(node) -> 読み込み済みの子の数
+
+    # ==================== データ設定 ====================
+
+    def set_root(self, root: Optional[FileTreeNode]):
+        """ツリー全体を差し替える"""
+        self.beginResetModel()
+        self._root = root if root is not None else FileTreeNode("", "")
+        self._loaded = {}
+        self.endResetModel()
+
+    def clear(self):
+        """ツリーを空にする"""
+        self.set_root(None)
+
+    def apply_delta(self, delta) -> bool:
+        """
+        ステータスの差分をその場で反映
+
+        Returns:
+            bool: 反映できた場合True。ノードの追加・削除を伴う場合はFalse
+                (呼び出し側で set_root() による再構築が必要)
+        """
+        changed = apply_status_delta(self._root, delta)
+        if changed is None:
+            return False
+        last_column = len(self._HEADERS) - 1
+        for node in changed:
+            parent_node = node.parent
+            # ルートや、まだ展開されていない位置のノードは通知不要
+            if parent_node is None:
+                continue
+            if node.row >= self._loaded.get(id(parent_node), 0):
+                continue
+            self.dataChanged.emit(
+                self.createIndex(node.row, 0, node),
+                self.createIndex(node.row, last_column, node),
+            )
+        return True
+
+    def expanded_paths(self, view) -> List[str]:
+        """ビューで展開されているディレクトリのパスを取得"""
+        paths = []
+        stack = [QModelIndex()]
+        while stack:
+            parent = stack.pop()
+            for row in range(self.rowCount(parent)):
+                index = self.index(row, 0, parent)
+                if view.isExpanded(index):
+                    paths.append(self.node_from_index(index).path)
+                    stack.append(index)
+        return paths
+
+    def restore_expanded(self, view, paths: List[str]):
+        """expanded_paths() で保存した展開状態を復元"""
+        for path in paths:
+            parent = QModelIndex()
+            for name in path.split("/"):
+                if self.canFetchMore(parent):
+                    self.fetchMore(parent)
+                child = self.node_from_index(parent).child(name)
+                if child is None or child.row >= self.rowCount(parent):
+                    break
+                parent = self.index(child.row, 0, parent)
+            else:
+                view.expand(parent)
+
+    def node_from_index(self, index: QModelIndex) -> FileTreeNode:
+        """インデックスに対応するノードを取得"""
+        if index.isValid():
+            return index.internalPointer()
+        return self._root
+
+    def file_paths_for(self, indexes: List[QModelIndex]) -> List[str]:
+        """
+        選択されたインデックスに含まれるファイルパスを取得
+
+        ディレクトリが選択された場合は配下のファイルをすべて含める。
+        サブモジュールの中のファイルは親リポジトリでは操作できないため含めない
+        """
+        paths = {}
+        for index in indexes:
+            if index.column() != 0:
+                continue
+            node = self.node_from_index(index)
+            if node.in_submodule():
+                continue
+            for file_node in node.iter_files(submodules=False):
+                paths[file_node.path] = None
+        return list(paths)
+
+    # ==================== QAbstractItemModel ====================
+
+    def index(self, row, column, parent=QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        parent_node = self.node_from_index(parent)
+        children = parent_node.sorted_children()
+        if row >= len(children):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index=QModelIndex()) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        parent_node = node.parent
+        if parent_node is None or parent_node is self._root:
+            return QModelIndex()
+        return self.createIndex(parent_node.row, 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        node = self.node_from_index(parent)
+        return self._loaded.get(id(node), 0)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(self._HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        node = self.node_from_index(parent)
+        return node.child_count > 0
+
+    def canFetchMore(self, parent) -> bool:
+        node = self.node_from_index(parent)
+        return self._loaded.get(id(node), 0) < node.child_count
+
+    def fetchMore(self, parent):
+        node = self.node_from_index(parent)
+        loaded = self._loaded.get(id(node), 0)
+        remaining = node.child_count - loaded
+        if remaining <= 0:
+            return
+        count = min(self.FETCH_BATCH, remaining)
+        # 初回展開時に子ノードを並び替える
+        node.sorted_children()
+        self.beginInsertRows(parent, loaded, loaded + count - 1)
+        self._loaded[id(node)] = loaded + count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node: FileTreeNode = index.internalPointer()
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return node.name
+            if node.submodule is not None:
+                return ", ".join(
+                    [*node.statuses, f"サブモジュール: {node.submodule.state}"]
+                )
+            if node.is_dir:
+                return f"{node.file_count} 件"
+            return ", ".join(node.statuses)
+
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if node.submodule is not None:
+                return _submodule_tooltip(node.submodule)
+            if node.is_dir:
+                return "\n".join(
+                    f"{label}: {count}" for label, count in node.counts.items()
+                )
+            return node.path
+
+        if role == Qt.ItemDataRole.ForegroundRole and column == 1:
+            if node.statuses:
+                color = _STATUS_COLORS.get(node.statuses[0])
+                if color is not None:
+                    return QBrush(color)
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self._HEADERS[section]
+        return None
+
+
+def _submodule_tooltip(status: SubmoduleStatus) -> str:
+    """サブモジュールのノードのツールチップ"""
+    lines = [f"サブモジュール: {status.path}", f"状態: {status.state}"]
+    if status.head:
+        lines.append(f"コミット: {status.head[:8]}")
+    if status.initialized and status.error is None:
+        lines.append(f"ブランチ: {status.branch or '(detached HEAD)'}")
+    if status.error:
+        lines.append(f"エラー: {status.error}")
+    return "\n".join(lines)
@@ -1,6 +1,9 @@
 """メインウィンドウの実装"""
 
+import logging
+import os
 from datetime import datetime
+from typing import List, Optional
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -15,6 +18,8 @@ from PySide6.QtWidgets import (
     QComboBox,
     QTreeWidget,
     QTreeWidgetItem,
+    QTreeView,
+    QAbstractItemView,
     QTextEdit,
     QPlainTextEdit,
     QGroupBox,
@@ -24,23 +29,37 @@ from PySide6.QtWidgets import (
     QFileDialog,
     QMessageBox,
     QListWidget,
-    QListWidgetItem,
     QInputDialog,
     QDialog,
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QAction
+from PySide6.QtCore import Qt, QEvent, QSettings, QTimer
+from PySide6.QtGui import QAction, QActionGroup
 
 from core.app_controller import AppController
-from models import CommandResult
-from utils import get_logger
+from models import CommandResult, build_file_tree
+from utils import (
+    get_logger,
+    get_log_level,
+    set_log_level,
+    metrics,
+    tracing,
+    LOG_LEVELS,
+)
 
 from PySide6.QtGui import QClipboard
 from PySide6.QtWidgets import QApplication
 
 from models.glossary import GlossaryTerm
+from models.stage import StageScan, format_size
+from ui.dialogs.blame_dialog import BlameDialog
+from ui.dialogs.content_search_dialog import ContentSearchDialog
 from ui.dialogs.glossary_dialog import GlossaryDetailDialog
+from ui.dialogs.history_search_dialog import HistorySearchDialog
 from ui.dialogs.merge_dialog import MergeDialog
+from ui.dialogs.metrics_dialog import MetricsDialog
+from ui.diffstat_delegate import DiffStatDelegate
+from ui.file_tree_model import ChangedFileTreeModel
+from ui.update_throttler import UpdateThrottler
 
 logger = get_logger(__name__)
 
@@ -48,11 +67,24 @@ logger = get_logger(__name__)
 class MainWindow(QMainWindow):
     """LeafGitのメインウィンドウ"""
 
+    # これを超える件数の差分はリストを作り直した方が速い
+    _LIST_DELTA_LIMIT = 200
+
+    # ステージ前の確認に列挙するファイルの数
+    _STAGE_WARNING_LIMIT = 10
+
     def __init__(self, controller: AppController):
         super().__init__()
         self.controller = controller
 
         self.setWindowTitle("LeafGit")
+        self.blame_dialog: Optional[BlameDialog] = None
+        self.history_search_dialog: Optional[HistorySearchDialog] = None
+        self.content_search_dialog: Optional[ContentSearchDialog] = None
+        self.metrics_dialog: Optional[MetricsDialog] = None
+        self.glossary_dialog: Optional[GlossaryDetailDialog] = None
+        # バックグラウンドの書き込み中は使えなくする操作
+        self._write_controls: List = []
         self.setMinimumSize(1000, 700)
 
         self._setup_menu_bar()
@@ -63,13 +95,45 @@ class MainWindow(QMainWindow):
 
     def _connect_signals(self):
         """Controllerのシグナルを接続"""
+        # 連続して届く履歴・ファイル状態の更新は1フレームにまとめて反映する
+        self._throttler = UpdateThrottler(self)
+        self._throttler.history_ready.connect(self._add_to_command_history)
+        self._throttler.status_ready.connect(self._apply_status_delta)
+        self._throttler.rebuild_requested.connect(self._update_file_tree)
+        tracing.watch_signals(self._throttler, "UpdateThrottler")
+
         # Controller -> UI
         self.controller.repository_opened.connect(self._on_repository_opened)
         self.controller.repository_closed.connect(self._on_repository_closed)
         self.controller.command_executed.connect(self._on_command_executed)
+        self.controller.command_output.connect(self._on_command_output)
+        self.controller.commit_finished.connect(self._on_commit_finished)
         self.controller.files_changed.connect(self._on_files_changed)
+        self.controller.status_changed.connect(self._on_status_changed)
         self.controller.branch_changed.connect(self._on_branch_changed)
+        self.controller.remote_status_changed.connect(self._on_remote_status_changed)
+        self.controller.status_stale_changed.connect(self._on_status_stale_changed)
         self.controller.error_occurred.connect(self._on_error_occurred)
+        self.controller.stale_lock_detected.connect(self._on_stale_lock_detected)
+        self.controller.stage_progress.connect(self._on_stage_progress)
+        self.controller.stage_finished.connect(self._on_stage_finished)
+        self.controller.write_busy_changed.connect(self._on_write_busy_changed)
+        self.controller.git.diffstat.stats_ready.connect(self._on_diffstat_ready)
+        self.controller.git.submodules.status_ready.connect(self._on_submodules_changed)
+        self.controller.git.submodules.finished.connect(self._on_submodules_changed)
+        self.controller.git.worktrees.worktrees_ready.connect(
+            self._on_worktrees_changed
+        )
+
+        # 変更一覧の行数の増減は、一覧の更新やスクロールが落ち着いてから集計する
+        self._diffstat_timer = QTimer(self)
+        self._diffstat_timer.setSingleShot(True)
+        self._diffstat_timer.setInterval(100)
+        self._diffstat_timer.timeout.connect(self._request_diffstats)
+        for list_widget in (self.staged_list, self.unstaged_list):
+            list_widget.verticalScrollBar().valueChanged.connect(
+                self._diffstat_timer.start
+            )
 
     def _setup_menu_bar(self):
         """メニューバーの設定"""
@@ -91,11 +155,14 @@ class MainWindow(QMainWindow):
         clone_repo_action.setShortcut("Ctrl+Shift+C")
         file_menu.addAction(clone_repo_action)
 
+        self.recent_menu = file_menu.addMenu("最近使ったリポジトリ(&E)")
+        self.recent_menu.aboutToShow.connect(self._populate_recent_menu)
+
         file_menu.addSeparator()
 
         update_action = QAction("更新(&R)", self)
         update_action.setShortcut("Ctrl+R")
-        update_action.triggered.connect(self._update_file_tree)
+        update_action.triggered.connect(self.controller.git.refresh_status)
         file_menu.addAction(update_action)
 
         close_repo_action = QAction("リポジトリを閉じる(&L)", self)
@@ -118,6 +185,26 @@ class MainWindow(QMainWindow):
         commit_action.setShortcut("Ctrl+Return")
         commit_action.triggered.connect(self._on_commit)
         git_menu.addAction(commit_action)
+        self._write_controls.append(commit_action)
+
+        large_file_action = QAction("大きなファイルの確認(&L)...", self)
+        large_file_action.triggered.connect(self._on_set_large_file_threshold)
+        git_menu.addAction(large_file_action)
+
+        blame_action = QAction("Blame(行ごとの変更履歴)(&L)...", self)
+        blame_action.setShortcut("Ctrl+Shift+B")
+        blame_action.triggered.connect(lambda: self._show_blame())
+        git_menu.addAction(blame_action)
+
+        history_search_action = QAction("履歴を検索(&H)...", self)
+        history_search_action.setShortcut("Ctrl+Shift+H")
+        history_search_action.triggered.connect(self._show_history_search)
+        git_menu.addAction(history_search_action)
+
+        content_search_action = QAction("リポジトリ内を検索(&F)...", self)
+        content_search_action.setShortcut("Ctrl+Shift+F")
+        content_search_action.triggered.connect(self._show_content_search)
+        git_menu.addAction(content_search_action)
 
         remote_menu = git_menu.addMenu("リモート(&R)")
 
@@ -134,6 +221,26 @@ class MainWindow(QMainWindow):
         pull_action.setShortcut("Ctrl+Shift+L")
         pull_action.triggered.connect(self._on_pull)
         remote_menu.addAction(pull_action)
+        self._write_controls.append(pull_action)
+
+        remote_menu.addSeparator()
+
+        fetch_action = QAction("今すぐフェッチ(&F)", self)
+        fetch_action.triggered.connect(self.controller.git.fetch_now)
+        remote_menu.addAction(fetch_action)
+
+        fetch_interval_action = QAction("自動フェッチの間隔(&I)...", self)
+        fetch_interval_action.triggered.connect(self._on_set_fetch_interval)
+        remote_menu.addAction(fetch_interval_action)
+
+        self.recurse_submodules_action = QAction(
+            "サブモジュールもフェッチ・プル(&S)", self
+        )
+        self.recurse_submodules_action.setCheckable(True)
+        self.recurse_submodules_action.toggled.connect(
+            self._on_recurse_submodules_toggled
+        )
+        remote_menu.addAction(self.recurse_submodules_action)
 
         branch_menu = git_menu.addMenu("ブランチ(&B)")
         create_branch_action = QAction("新規ブランチ(&N)", self)
@@ -144,6 +251,10 @@ class MainWindow(QMainWindow):
         merge_branch_action = QAction("ブランチをマージ(&M)", self)
         merge_branch_action.triggered.connect(self._on_merge_clicked)
         branch_menu.addAction(merge_branch_action)
+        self._write_controls += [create_branch_action, merge_branch_action]
+
+        self.worktree_menu = git_menu.addMenu("ワークツリー(&W)")
+        self.worktree_menu.aboutToShow.connect(self._on_worktree_menu_shown)
 
         # 表示メニュー
         view_menu = menubar.addMenu("表示(&V)")
@@ -158,6 +269,33 @@ class MainWindow(QMainWindow):
         toggle_history_action.setChecked(True)
         view_menu.addAction(toggle_history_action)
 
+        view_menu.addSeparator()
+
+        metrics_action = QAction("パフォーマンス(&P)...", self)
+        metrics_action.triggered.connect(self._show_metrics)
+        view_menu.addAction(metrics_action)
+
+        self.trace_action = QAction("トレースを記録(&T)", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(tracing.is_enabled())
+        self.trace_action.toggled.connect(self._on_trace_toggled)
+        view_menu.addAction(self.trace_action)
+
+        # ログレベル(実行中に切り替え可能)
+        log_level_menu = view_menu.addMenu("ログレベル(&L)")
+        log_level_group = QActionGroup(self)
+        log_level_group.setExclusive(True)
+        current_level = get_log_level()
+        for level_name, level in LOG_LEVELS.items():
+            level_action = QAction(level_name, self)
+            level_action.setCheckable(True)
+            level_action.setChecked(level == current_level)
+            level_action.triggered.connect(
+                lambda checked, lv=level: self._on_log_level_selected(lv)
+            )
+            log_level_group.addAction(level_action)
+            log_level_menu.addAction(level_action)
+
         # ヘルプメニュー
         help_menu = menubar.addMenu("ヘルプ(&H)")
 
@@ -245,13 +383,18 @@ class MainWindow(QMainWindow):
         files_group = QGroupBox("変更ファイル")
         files_layout = QVBoxLayout(files_group)
 
-        self.file_tree = QTreeWidget()
-        self.file_tree.setHeaderLabels(["ファイル", "状態"])
-        self.file_tree.setRootIsDecorated(False)
-
-        # サンプルデータ
-        sample_item = QTreeWidgetItem(["src/main.py", "変更"])
-        self.file_tree.addTopLevelItem(sample_item)
+        # ディレクトリ階層で表示し、子は展開時に読み込む
+        self.file_tree_model = ChangedFileTreeModel(self)
+        self.file_tree = QTreeView()
+        self.file_tree.setModel(self.file_tree_model)
+        self.file_tree.setUniformRowHeights(True)
+        self.file_tree.setSelectionMode(
+            QAbstractItemView.SelectionMode.ExtendedSelection
+        )
+        self.file_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.file_tree.customContextMenuRequested.connect(
+            self._show_file_tree_context_menu
+        )
 
         files_layout.addWidget(self.file_tree)
         layout.addWidget(files_group)
@@ -327,12 +470,21 @@ class MainWindow(QMainWindow):
             self._show_unstaged_context_menu
         )
         self.unstaged_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        diffstat = self.controller.git.diffstat
+        self.unstaged_list.setItemDelegate(
+            DiffStatDelegate(
+                lambda path: diffstat.get("unstaged", path)
+                or diffstat.get("untracked", path),
+                self.unstaged_list,
+            )
+        )
         unstaged_layout.addWidget(self.unstaged_list)
 
         # Stageボタン
         stage_button = QPushButton("Stage Selected")
         stage_button.clicked.connect(self._stage_selected_files)
         unstaged_layout.addWidget(stage_button)
+        self._write_controls.append(stage_button)
 
         diff_tabs.addTab(unstaged_widget, "Unstaged")
 
@@ -350,12 +502,18 @@ class MainWindow(QMainWindow):
             self._show_staged_context_menu
         )
         self.staged_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.staged_list.setItemDelegate(
+            DiffStatDelegate(
+                lambda path: diffstat.get("staged", path), self.staged_list
+            )
+        )
         staged_layout.addWidget(self.staged_list)
 
         # Unstageボタン
         unstage_button = QPushButton("Unstage Selected")
         unstage_button.clicked.connect(self._unstage_selected_files)
         staged_layout.addWidget(unstage_button)
+        self._write_controls.append(unstage_button)
 
         diff_tabs.addTab(staged_widget, "Staged")
 
@@ -373,6 +531,10 @@ class MainWindow(QMainWindow):
 
         # ボタン
         button_layout = QHBoxLayout()
+
+        # コミットされる変更の合計
+        self.staged_stat_label = QLabel("")
+        button_layout.addWidget(self.staged_stat_label)
         button_layout.addStretch()
 
         self.stage_button = QPushButton("選択をステージ")
@@ -383,6 +545,7 @@ class MainWindow(QMainWindow):
         self.commit_button.setDefault(True)
         self.commit_button.clicked.connect(self._on_commit)
         button_layout.addWidget(self.commit_button)
+        self._write_controls += [self.stage_button, self.commit_button]
 
         commit_layout.addLayout(button_layout)
         layout.addWidget(commit_group)
@@ -463,10 +626,35 @@ class MainWindow(QMainWindow):
         self.operation_label = QLabel("")
         status_bar.addWidget(self.operation_label)
 
+        # 上流ブランチとの差分(バックグラウンドのfetchで更新)
+        self.remote_label = QLabel("")
+        self.remote_label.setToolTip("↑ 未プッシュのコミット / ↓ 未取り込みのコミット")
+        status_bar.addPermanentWidget(self.remote_label)
+
         # ブランチ情報
         self.branch_label = QLabel("ブランチ: -")
         status_bar.addPermanentWidget(self.branch_label)
 
+        # 自動fetchの間隔を復元
+        settings = QSettings()
+        interval = settings.value(
+            "fetch/interval",
+            self.controller.git.fetch_scheduler.DEFAULT_INTERVAL,
+            type=int,
+        )
+        self.controller.git.set_fetch_interval(interval)
+        self.recurse_submodules_action.setChecked(
+            settings.value("fetch/recurse_submodules", False, type=bool)
+        )
+
+        # ステージ前に確認するファイルサイズを復元
+        threshold = settings.value(
+            "stage/large_file_threshold",
+            self.controller.git.large_file_threshold // (1024 * 1024),
+            type=int,
+        )
+        self.controller.git.set_large_file_threshold(threshold * 1024 * 1024)
+
     # ==================== アクションハンドラ ====================
 
     def _on_open_repository(self):
@@ -485,6 +673,144 @@ class MainWindow(QMainWindow):
         if path:
             self.controller.git.init_repository(path)
 
+    def _populate_recent_menu(self):
+        """最近使ったリポジトリのメニューを作成"""
+        self.recent_menu.clear()
+        recent = self.controller.git.get_recent_repositories()
+        if not recent:
+            empty_action = self.recent_menu.addAction("(なし)")
+            empty_action.setEnabled(False)
+            return
+        for path in recent:
+            action = self.recent_menu.addAction(path)
+            action.triggered.connect(
+                lambda checked=False, p=path: self._open_recent_repository(p)
+            )
+
+    def _open_recent_repository(self, path: str):
+        """最近使ったリポジトリを開く"""
+        if self.controller.git.open_repository_cached(path) is None:
+            QMessageBox.warning(self, "エラー", f"リポジトリを開けませんでした\n{path}")
+
+    def _on_worktree_menu_shown(self):
+        """ワークツリーのメニューを開いた時に一覧と状態を取得し直す"""
+        self._populate_worktree_menu()
+        worktrees = self.controller.git.worktrees
+        if self.controller.git.is_repository_open and not worktrees.is_running:
+            worktrees.refresh()
+
+    def _on_worktrees_changed(self, worktrees: list):
+        """ワークツリーの状態を受け取った時の処理"""
+        if self.worktree_menu.isVisible():
+            self._populate_worktree_menu()
+
+    def _populate_worktree_menu(self):
+        """ワークツリーのメニューを作成"""
+        self.worktree_menu.clear()
+        if not self.controller.git.is_repository_open:
+            empty_action = self.worktree_menu.addAction("(リポジトリ未選択)")
+            empty_action.setEnabled(False)
+            return
+
+        worktrees = [w for w in self.controller.git.get_worktrees() if not w.bare]
+        current = os.path.realpath(self.controller.git.repository_path)
+        if not worktrees:
+            loading_action = self.worktree_menu.addAction("(取得中...)")
+            loading_action.setEnabled(False)
+        for worktree in worktrees:
+            action = self.worktree_menu.addAction(worktree.label)
+            action.setToolTip(worktree.path)
+            action.setCheckable(True)
+            if os.path.realpath(worktree.path) == current:
+                action.setChecked(True)
+                action.setEnabled(False)
+            elif worktree.prunable:
+                action.setEnabled(False)
+            else:
+                action.triggered.connect(
+                    lambda checked=False, p=worktree.path: self._on_switch_worktree(p)
+                )
+
+        self.worktree_menu.addSeparator()
+        add_action = self.worktree_menu.addAction("ワークツリーを追加(&A)...")
+        add_action.triggered.connect(self._on_add_worktree)
+        remove_action = self.worktree_menu.addAction("ワークツリーを削除(&R)...")
+        remove_action.setEnabled(len(worktrees) > 1)
+        remove_action.triggered.connect(self._on_remove_worktree)
+
+    def _on_switch_worktree(self, path: str):
+        """別のワークツリーに切り替える"""
+        result = self.controller.git.switch_worktree(path)
+        if not result.success:
+            QMessageBox.warning(self, "エラー", result.error_message)
+
+    def _on_add_worktree(self):
+        """ワークツリーを追加"""
+        branches = self.controller.git.get_branches()
+        branch, ok = QInputDialog.getItem(
+            self,
+            "ワークツリーを追加",
+            "チェックアウトするブランチ(新しい名前を入力すると作成):",
+            branches,
+            0,
+            True,
+        )
+        branch = branch.strip()
+        if not ok or not branch:
+            return
+        repo_path = os.path.normpath(self.controller.git.repository_path)
+        default_path = f"{repo_path}-{branch.replace('/', '-')}"
+        path, ok = QInputDialog.getText(
+            self, "ワークツリーを追加", "作成する場所:", text=default_path
+        )
+        if not ok or not path:
+            return
+        if branch in branches:
+            result = self.controller.git.add_worktree(path, branch=branch)
+        else:
+            result = self.controller.git.add_worktree(path, new_branch=branch)
+        if result is not None and not result.success:
+            QMessageBox.warning(self, "エラー", result.error_message)
+
+    def _on_remove_worktree(self):
+        """ワークツリーを削除"""
+        current = os.path.realpath(self.controller.git.repository_path)
+        candidates = {
+            worktree.label: worktree
+            for worktree in self.controller.git.get_worktrees()
+            if not worktree.is_main and os.path.realpath(worktree.path) != current
+        }
+        if not candidates:
+            QMessageBox.information(self, "情報", "削除できるワークツリーがありません")
+            return
+        label, ok = QInputDialog.getItem(
+            self,
+            "ワークツリーを削除",
+            "削除するワークツリー:",
+            list(candidates),
+            0,
+            False,
+        )
+        if not ok:
+            return
+        worktree = candidates[label]
+        force = False
+        if worktree.change_count:
+            reply = QMessageBox.question(
+                self,
+                "確認",
+                f"{worktree.path} には未コミットの変更が {worktree.change_count} 件"
+                "あります。\n変更を破棄して削除しますか？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No,
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            force = True
+        result = self.controller.git.remove_worktree(worktree.path, force=force)
+        if result is not None and not result.success:
+            QMessageBox.warning(self, "エラー", result.error_message)
+
     def _on_close_repository(self):
         """リポジトリを閉じる"""
         self.controller.git.close_repository()
@@ -496,7 +822,19 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "エラー", "コミットメッセージを入力してください")
             return
 
-        result = self.controller.git.commit(message)
+        if self.controller.git.is_writing:
+            return
+
+        # 完了は commit_finished で受け取る(フックがあるとバックグラウンドで実行される)
+        self.commit_button.setEnabled(False)
+        self.controller.git.commit(message)
+        if self.controller.git.is_committing:
+            self.operation_label.setText("コミット中(フックを実行しています)...")
+
+    def _on_commit_finished(self, result: CommandResult):
+        """コミットが完了した時の処理"""
+        self.commit_button.setEnabled(not self.controller.git.is_writing)
+        self.operation_label.setText("")
         if result.success:
             self.commit_message.clear()
 
@@ -510,15 +848,115 @@ class MainWindow(QMainWindow):
 
     def _on_stage_files(self):
         """選択ファイルをステージング"""
-        selected_items = self.file_tree.selectedItems()
-        if not selected_items:
+        selected_indexes = self.file_tree.selectionModel().selectedRows(0)
+        if not selected_indexes:
             QMessageBox.information(
                 self, "情報", "ステージするファイルを選択してください"
             )
             return
 
-        file_paths = [item.text(0) for item in selected_items]
-        self.controller.git.stage_files(file_paths)
+        file_paths = self.file_tree_model.file_paths_for(selected_indexes)
+        if not file_paths:
+            QMessageBox.information(
+                self, "情報", "サブモジュールの中のファイルはステージできません"
+            )
+            return
+        self._stage_files(file_paths)
+
+    def _stage_files(self, file_paths: List[str]) -> Optional[CommandResult]:
+        """
+        大きなファイル等が含まれていれば確認してからステージング
+
+        Returns:
+            CommandResult or None: 取り消した場合・バックグラウンドで実行した場合・
+                ロックの競合で再試行する場合はNone
+        """
+        if self.controller.git.is_writing:
+            QMessageBox.information(self, "情報", "他の書き込みが実行中です")
+            return None
+        scan = self.controller.git.check_stage(file_paths)
+        if scan.needs_confirmation and not self._confirm_stage(scan):
+            return None
+        result = self.controller.git.stage_files(file_paths, scan)
+        if result is None:
+            self.operation_label.setText(
+                f"ステージ中... (0 / {format_size(scan.total_size)})"
+            )
+        return result
+
+    def _confirm_stage(self, scan: StageScan) -> bool:
+        """大きなファイル・Git LFSのポインタファイルをステージしてよいか確認"""
+        lines = []
+        if scan.large_files:
+            lines.append(
+                f"{format_size(scan.threshold)} 以上のファイルが含まれています"
+                "(リポジトリが大きくなります。Git LFSの利用を検討してください):"
+            )
+            lines += [
+                f"  {path} ({format_size(scan.sizes[path])})"
+                for path in scan.large_files[: self._STAGE_WARNING_LIMIT]
+            ]
+            if len(scan.large_files) > self._STAGE_WARNING_LIMIT:
+                lines.append(
+                    f"  ...他 {len(scan.large_files) - self._STAGE_WARNING_LIMIT} 件"
+                )
+        if scan.lfs_pointers:
+            lines.append(
+                "Git LFSのポインタファイルが含まれています(ファイルの実体が"
+                "取得されていません。git lfs pull を実行してください):"
+            )
+            lines += [
+                f"  {path}" for path in scan.lfs_pointers[: self._STAGE_WARNING_LIMIT]
+            ]
+            if len(scan.lfs_pointers) > self._STAGE_WARNING_LIMIT:
+                lines.append(
+                    f"  ...他 {len(scan.lfs_pointers) - self._STAGE_WARNING_LIMIT} 件"
+                )
+        lines.append("\nステージしますか？")
+        reply = QMessageBox.question(
+            self,
+            "確認",
+            "\n".join(lines),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        return reply == QMessageBox.StandardButton.Yes
+
+    def _on_stage_progress(self, done: int, total: int):
+        """バックグラウンドのステージの進捗を表示"""
+        self.operation_label.setText(
+            f"ステージ中... ({format_size(done)} / {format_size(total)})"
+        )
+
+    def _on_write_busy_changed(self, busy: bool):
+        """バックグラウンドの書き込み中は、書き込む操作を無効にする"""
+        for control in self._write_controls:
+            control.setEnabled(not busy)
+
+    def _on_stage_finished(self, result: CommandResult):
+        """バックグラウンドのステージが完了した時の処理"""
+        if result.success:
+            self.operation_label.setText("✓ ファイルをステージしました")
+        else:
+            self.operation_label.setText("")
+            QMessageBox.critical(
+                self, "エラー", f"ステージに失敗しました\n{result.error_message}"
+            )
+
+    def _on_set_large_file_threshold(self):
+        """ステージ前に確認するファイルサイズを設定"""
+        current = self.controller.git.large_file_threshold // (1024 * 1024)
+        megabytes, ok = QInputDialog.getInt(
+            self,
+            "大きなファイルの確認",
+            "ステージ前に確認するサイズ(MB, 0で確認しない):",
+            current,
+            0,
+            1024 * 1024,
+        )
+        if ok:
+            self.controller.git.set_large_file_threshold(megabytes * 1024 * 1024)
+            QSettings().setValue("stage/large_file_threshold", megabytes)
 
     # TODO: ブランチ名のバリデーションを実装
 
@@ -529,7 +967,7 @@ class MainWindow(QMainWindow):
         )
         if ok and branch_name:
             result = self.controller.git.create_branch(branch_name)
-            if not result.success:
+            if result is not None and not result.success:
                 QMessageBox.warning(self, "エラー", result.error_message)
 
     def _on_checkout_branch(self):
@@ -541,7 +979,7 @@ class MainWindow(QMainWindow):
 
         branch_name = selected_items[0].text(0).removeprefix("● ").strip()
         result = self.controller.git.switch_branch(branch_name)
-        if not result.success:
+        if result is not None and not result.success:
             QMessageBox.warning(self, "エラー", result.error_message)
 
     # TODO: 削除確認ダイアログを追加
@@ -555,7 +993,7 @@ class MainWindow(QMainWindow):
 
         branch_name = selected_items[0].text(0).removeprefix("● ").strip()
         result = self.controller.git.delete_branch(branch_name)
-        if not result.success:
+        if result is not None and not result.success:
             QMessageBox.warning(self, "エラー", result.error_message)
 
     def _on_merge_branch(self):
@@ -569,7 +1007,7 @@ class MainWindow(QMainWindow):
 
         branch_name = selected_items[0].text(0).removeprefix("● ").strip()
         result = self.controller.git.merge_branch(branch_name)
-        if not result.success:
+        if result is not None and not result.success:
             QMessageBox.warning(self, "エラー", result.error_message)
 
     def _on_connect_remote(self):
@@ -586,12 +1024,38 @@ class MainWindow(QMainWindow):
             if not result.success:
                 QMessageBox.warning(self, "エラー", result.error_message)
 
+    def _on_set_fetch_interval(self):
+        """自動fetchの間隔を設定"""
+        current = self.controller.git.fetch_scheduler.interval // 60
+        minutes, ok = QInputDialog.getInt(
+            self,
+            "自動フェッチ",
+            "フェッチの間隔(分, 0で無効):",
+            current,
+            0,
+            24 * 60,
+        )
+        if ok:
+            self.controller.git.set_fetch_interval(minutes * 60)
+            QSettings().setValue("fetch/interval", minutes * 60)
+
+    def _on_recurse_submodules_toggled(self, enabled: bool):
+        """fetch/pull でサブモジュールも処理するかを切り替え"""
+        self.controller.git.set_recurse_submodules(enabled)
+        QSettings().setValue("fetch/recurse_submodules", enabled)
+
+    def _on_log_level_selected(self, level: int):
+        """ログレベルを変更"""
+        set_log_level(level)
+        logger.info("ログレベルを変更しました: %s", logging.getLevelName(level))
+
     # ==================== シグナルスロット ====================
 
     def _on_repository_opened(self, path: str):
         """リポジトリが開かれた時の処理"""
-        self.repo_label.setText(f"リポジトリ: {path}")
+        self._on_status_stale_changed(self.controller.git.is_status_stale)
         self.setWindowTitle(f"LeafGit - {path}")
+        self._throttler.discard_status()
         self._update_file_tree()
         self._update_branch_list()
 
@@ -599,122 +1063,262 @@ class MainWindow(QMainWindow):
         """リポジトリが閉じられた時の処理"""
         self.repo_label.setText("リポジトリ: 未選択")
         self.branch_label.setText("ブランチ: -")
+        self.remote_label.setText("")
         self.setWindowTitle("LeafGit")
-        self.file_tree.clear()
+        self._throttler.discard_status()
+        self.file_tree_model.clear()
         self.branch_tree.clear()
 
     def _on_command_executed(self, result: CommandResult):
         """コマンドが実行された時の処理"""
-        self._add_to_command_history(result)
+        self._throttler.add_history(result)
+
+    def _on_command_output(self, line: str):
+        """実行中のコマンドの出力を履歴に流す"""
+        self._throttler.add_history(line)
 
     def _on_files_changed(self, files: list):
         """ファイル状態が変化した時の処理"""
-        self._update_file_tree()
+        self._throttler.request_rebuild()
+
+    def _on_submodules_changed(self, *_):
+        """サブモジュールの状態を受け取った時の処理"""
+        self._throttler.request_rebuild()
+
+    def _on_status_changed(self, delta):
+        """ファイル状態の差分を受け取った時の処理"""
+        self._throttler.add_delta(delta)
+
+    @metrics.timed("ui.apply_status_delta")
+    def _apply_status_delta(self, delta):
+        """ファイル状態の差分を反映(全体を再構築しない)"""
+        if not self.file_tree_model.apply_delta(delta):
+            self._update_file_tree()
+            return
+
+        if delta.size > self._LIST_DELTA_LIMIT:
+            self._update_change_lists(self.controller.git.get_changed_files())
+            return
+
+        self._apply_list_delta(
+            self.staged_list,
+            delta.removed.get("staged", []),
+            delta.added.get("staged", []),
+        )
+        unstaged_keys = ("unstaged", "untracked", "deleted")
+        self._apply_list_delta(
+            self.unstaged_list,
+            [p for key in unstaged_keys for p in delta.removed.get(key, [])],
+            [p for key in unstaged_keys for p in delta.added.get(key, [])],
+        )
 
     def _on_branch_changed(self, branch_name: str):
         """ブランチが変化した時の処理"""
         self.branch_label.setText(f"ブランチ: {branch_name}")
         self._update_branch_list()
 
+    def _on_status_stale_changed(self, stale: bool):
+        """キャッシュ表示中かどうかが変化した時の処理"""
+        path = self.controller.git.repository_path
+        if path is None:
+            return
+        suffix = " (前回の状態を表示中・確認しています...)" if stale else ""
+        self.repo_label.setText(f"リポジトリ: {path}{suffix}")
+
+    def closeEvent(self, event):
+        """終了時に現在の状態を保存(次回起動時に即座に表示するため)"""
+        self.controller.git.save_state()
+        super().closeEvent(event)
+
+    def _on_remote_status_changed(self, status):
+        """上流ブランチとの差分が更新された時の処理"""
+        if status is None or status.get("ahead") is None:
+            self.remote_label.setText("")
+            return
+        self.remote_label.setText(f"↑{status['ahead']} ↓{status['behind']}")
+
+    def changeEvent(self, event):
+        """最小化中はバックグラウンドのfetchを止める"""
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.controller.git.fetch_scheduler.set_minimized(self.isMinimized())
+        super().changeEvent(event)
+
     def _on_error_occurred(self, error_message: str):
         """エラーが発生した時の処理"""
         QMessageBox.warning(self, "エラー", error_message)
 
+    def _on_stale_lock_detected(self, lock):
+        """異常終了したgitのロックファイルが残っている時に削除するか確認"""
+        answer = QMessageBox.question(
+            self,
+            "ロックファイル",
+            f"{lock.path} が {lock.age / 60:.0f}分前から残っています。\n"
+            "このリポジトリでgitは実行されていないため、"
+            "異常終了したgitの残骸と思われます。\n\n削除しますか?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        if answer == QMessageBox.StandardButton.Yes:
+            self.controller.git.remove_stale_lock()
+
     # ==================== UI更新メソッド ====================
 
-    def _add_to_command_history(self, result: CommandResult):
-        """コマンド履歴に追加"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        status_icon = "✓" if result.success else "✗"
+    @metrics.timed("ui.command_history")
+    def _add_to_command_history(self, items: list):
+        """
+        コマンド履歴にまとめて追記
 
-        # 色付きHTMLでコマンド行を作成
-        if result.success:
-            color = "#00ff00"  # 緑
-        else:
-            color = "#ff5555"  # 赤
+        Args:
+            items: CommandResult または実行中のコマンドの出力行(str)のリスト
+        """
+        lines = []
+        added = 0
+        for item in items:
+            if isinstance(item, str):
+                lines.append(f"    │ {item}")
+                continue
+            lines.extend(self._format_history_entry(item))
+            added += 1
+
+        # 表示できる行数を超える分は追記しても捨てられるだけなので省く
+        limit = self.command_history.maximumBlockCount()
+        if limit > 0 and len(lines) > limit:
+            lines = lines[-limit:]
+        self.command_history.appendPlainText("\n".join(lines))
 
-        # プレーンテキストで追加（色は付けられないがシンプル）
-        line = f"[{timestamp}] {status_icon} {result.command}"
+        # 履歴カウンターを更新
+        if added:
+            self.history_count += added
+            self.history_count_label.setText(f"{self.history_count} 件")
 
-        # 履歴に追加
-        self.command_history.appendPlainText(line)
+        # 最新のコマンドに自動スクロール
+        scrollbar = self.command_history.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def _format_history_entry(self, result: CommandResult) -> list:
+        """コマンド履歴に表示する1件分の行"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        status_icon = "✓" if result.success else "✗"
+        lines = [f"[{timestamp}] {status_icon} {result.command}"]
 
         # 説明があれば追加
         if result.description:
-            self.command_history.appendPlainText(f"    ├─ {result.description}")
+            lines.append(f"    ├─ {result.description}")
+
+        # フックの実行時間(git commit をサブプロセスで実行した場合)
+        if isinstance(result.data, dict):
+            for hook, seconds in result.data.get("hooks", {}).items():
+                lines.append(f"    ├─ フック {hook}: {seconds:.2f}秒")
+
+        # 他のgitのロックの解放を待った時間
+        if result.lock_wait:
+            lines.append(f"    ├─ ロック待ち: {result.lock_wait:.2f}秒")
 
         # エラーメッセージがあれば追加
         if result.error_message:
-            self.command_history.appendPlainText(
-                f"    └─ エラー: {result.error_message}"
-            )
+            lines.append(f"    └─ エラー: {result.error_message}")
 
         # 空行を追加（読みやすさ向上）
-        self.command_history.appendPlainText("")
-
-        # 履歴カウンターを更新
-        self.history_count += 1
-        self.history_count_label.setText(f"{self.history_count} 件")
-
-        # 最新のコマンドに自動スクロール
-        scrollbar = self.command_history.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        lines.append("")
+        return lines
 
+    @metrics.timed("ui.update_file_tree")
     def _update_file_tree(self):
         """ファイルツリーを更新"""
-        self.file_tree.clear()
+        if not self.controller.git.is_repository_open:
+            self.file_tree_model.clear()
+            self.unstaged_list.clear()
+            self.staged_list.clear()
+            self._diffstat_timer.start()
+            return
+
+        files = self.controller.git.get_changed_files()
+
+        # 左サイドバーのツリー(ステータス取得ごとに一度だけ構築)
+        expanded = self.file_tree_model.expanded_paths(self.file_tree)
+        submodules = self.controller.git.submodules.statuses().values()
+        self.file_tree_model.set_root(build_file_tree(files, submodules))
+        self.file_tree_model.restore_expanded(self.file_tree, expanded)
+
+        self._update_change_lists(files)
+
+    def _update_change_lists(self, files: dict):
+        """Staged/Unstagedリストを再構築"""
         self.unstaged_list.clear()
         self.staged_list.clear()
 
+        # Stagedリスト
+        self.staged_list.addItems(files["staged"])
+
+        # Unstagedリスト(変更・未追跡・削除)
+        self.unstaged_list.addItems(files["unstaged"])
+        self.unstaged_list.addItems(files["untracked"])
+        self.unstaged_list.addItems(files["deleted"])
+        self._diffstat_timer.start()
+
+    def _apply_list_delta(self, list_widget: QListWidget, removed, added):
+        """リストに差分だけを反映"""
+        for path in removed:
+            for item in list_widget.findItems(path, Qt.MatchFlag.MatchExactly):
+                list_widget.takeItem(list_widget.row(item))
+        existing = set()
+        if added:
+            existing = {
+                item.text()
+                for path in added
+                for item in list_widget.findItems(path, Qt.MatchFlag.MatchExactly)
+            }
+        list_widget.addItems([path for path in added if path not in existing])
+        self._diffstat_timer.start()
+
+    def _request_diffstats(self):
+        """変更一覧の行数の増減の集計を要求(画面に見えている行を優先)"""
         if not self.controller.git.is_repository_open:
+            self.staged_stat_label.setText("")
             return
-
         files = self.controller.git.get_changed_files()
+        diffstat = self.controller.git.diffstat
+        diffstat.request(
+            "staged", files["staged"], self._visible_paths(self.staged_list)
+        )
+        visible = self._visible_paths(self.unstaged_list)
+        diffstat.request("unstaged", files["unstaged"] + files["deleted"], visible)
+        diffstat.request("untracked", files["untracked"], visible)
+        self._update_staged_stat_label()
+
+    def _visible_paths(self, list_widget: QListWidget) -> list:
+        """リストで画面に見えている行のパス"""
+        viewport = list_widget.viewport().rect()
+        first = list_widget.indexAt(viewport.topLeft()).row()
+        if first < 0:
+            return []
+        last = list_widget.indexAt(viewport.bottomLeft()).row()
+        if last < 0:
+            last = list_widget.count() - 1
+        return [list_widget.item(row).text() for row in range(first, last + 1)]
+
+    def _on_diffstat_ready(self, kind: str):
+        """行数の増減の集計が進んだ時の処理"""
+        if kind == "staged":
+            self.staged_list.viewport().update()
+            self._update_staged_stat_label()
+        else:
+            self.unstaged_list.viewport().update()
 
-        # ステージされたファイル
-        for file_path in files["staged"]:
-            # 左サイドバーのツリー
-            item = QTreeWidgetItem([file_path, "Staged"])
-            item.setForeground(1, Qt.GlobalColor.green)
-            self.file_tree.addTopLevelItem(item)
-
-            # Stagedリスト
-            list_item = QListWidgetItem(file_path)
-            self.staged_list.addItem(list_item)
-
-        # ステージされていない変更
-        for file_path in files["unstaged"]:
-            # 左サイドバーのツリー
-            item = QTreeWidgetItem([file_path, "Modified"])
-            item.setForeground(1, Qt.GlobalColor.yellow)
-            self.file_tree.addTopLevelItem(item)
-
-            # Unstagedリスト
-            list_item = QListWidgetItem(file_path)
-            self.unstaged_list.addItem(list_item)
-
-        # 未追跡ファイル
-        for file_path in files["untracked"]:
-            # 左サイドバーのツリー
-            item = QTreeWidgetItem([file_path, "Untracked"])
-            item.setForeground(1, Qt.GlobalColor.red)
-            self.file_tree.addTopLevelItem(item)
-
-            # Unstagedリスト
-            list_item = QListWidgetItem(file_path)
-            self.unstaged_list.addItem(list_item)
-
-        # 削除されたファイル
-        for file_path in files["deleted"]:
-            # 左サイドバーのツリー
-            item = QTreeWidgetItem([file_path, "Deleted"])
-            item.setForeground(1, Qt.GlobalColor.darkRed)
-            self.file_tree.addTopLevelItem(item)
-
-            # Unstagedリスト
-            list_item = QListWidgetItem(file_path)
-            self.unstaged_list.addItem(list_item)
+    def _update_staged_stat_label(self):
+        """コミットエリアにステージ済みの変更の合計を表示"""
+        count = self.staged_list.count()
+        if count == 0:
+            self.staged_stat_label.setText("")
+            return
+        diffstat = self.controller.git.diffstat
+        total = diffstat.total("staged")
+        suffix = "" if diffstat.is_complete("staged") else " (集計中...)"
+        self.staged_stat_label.setText(
+            f"{count} ファイル  +{total.added} −{total.deleted}{suffix}"
+        )
 
+    @metrics.timed("ui.update_branch_list")
     def _update_branch_list(self):
         """ブランチ一覧を更新"""
         self.branch_tree.clear()
@@ -742,7 +1346,9 @@ class MainWindow(QMainWindow):
             return
 
         file_paths = [item.text() for item in selected_items]
-        result = self.controller.git.stage_files(file_paths)
+        result = self._stage_files(file_paths)
+        if result is None:
+            return
 
         if result.success:
             self.operation_label.setText(
@@ -762,6 +1368,9 @@ class MainWindow(QMainWindow):
 
         file_paths = [item.text() for item in selected_items]
         result = self.controller.git.unstage_files(file_paths)
+        if result is None:
+            # 他のgitのロックが外れるのを待って再試行している(失敗はエラーで通知される)
+            return
 
         if result.success:
             self.operation_label.setText(
@@ -794,6 +1403,21 @@ class MainWindow(QMainWindow):
 
         menu.exec(self.staged_list.mapToGlobal(position))
 
+    def _show_file_tree_context_menu(self, position):
+        """ファイルツリーのコンテキストメニューを表示"""
+        index = self.file_tree.indexAt(position)
+        if not index.isValid():
+            return
+        node = self.file_tree_model.node_from_index(index)
+        if node.is_dir or node.submodule is not None or node.in_submodule():
+            return
+
+        menu = QMenu(self)
+        blame_action = menu.addAction("Blame(行ごとの変更履歴)")
+        blame_action.triggered.connect(lambda: self._show_blame(node.path))
+
+        menu.exec(self.file_tree.viewport().mapToGlobal(position))
+
     def _show_branch_context_menu(self, position):
         """ブランチ一覧のコンテキストメニューを表示"""
         selected_item = self.branch_tree.selectedItems()
@@ -883,12 +1507,82 @@ class MainWindow(QMainWindow):
             self._show_glossary_detail(term)
 
     def _show_glossary_detail(self, term: GlossaryTerm):
-        """用語集の詳細ダイアログを表示"""
-        # 全用語をControllerから取得
-        all_terms = self.controller.glossary.get_all_glossary_terms()
-        dialog = GlossaryDetailDialog(term, all_terms, self)
-        dialog.show()
-        self.current_dialog = dialog
+        """用語集の詳細ダイアログを表示(開いていれば用語を切り替える)"""
+        if self.glossary_dialog is None:
+            self.glossary_dialog = GlossaryDetailDialog(parent=self)
+        self.glossary_dialog.show_term(term)
+        self.glossary_dialog.show()
+        self.glossary_dialog.raise_()
+
+    # ==================== 履歴の参照 ====================
+
+    def _show_blame(self, file_path: Optional[str] = None):
+        """Blameダイアログを表示(開いていればファイルを切り替える)"""
+        if not self.controller.git.is_repository_open:
+            QMessageBox.information(self, "情報", "リポジトリを開いてください")
+            return
+        if self.blame_dialog is None:
+            self.blame_dialog = BlameDialog(self.controller, parent=self)
+            self.controller.repository_closed.connect(self.blame_dialog.close)
+        if file_path:
+            self.blame_dialog.show_file(file_path)
+        self.blame_dialog.show()
+        self.blame_dialog.raise_()
+
+    def _show_history_search(self):
+        """履歴検索ダイアログを表示"""
+        if not self.controller.git.is_repository_open:
+            QMessageBox.information(self, "情報", "リポジトリを開いてください")
+            return
+        if self.history_search_dialog is None:
+            self.history_search_dialog = HistorySearchDialog(self.controller, self)
+            self.controller.repository_closed.connect(self.history_search_dialog.close)
+        self.history_search_dialog.show()
+        self.history_search_dialog.raise_()
+        self.history_search_dialog.query_edit.setFocus()
+
+    def _show_content_search(self):
+        """リポジトリ内検索ダイアログを表示"""
+        if not self.controller.git.is_repository_open:
+            QMessageBox.information(self, "情報", "リポジトリを開いてください")
+            return
+        if self.content_search_dialog is None:
+            self.content_search_dialog = ContentSearchDialog(self.controller, self)
+            self.controller.repository_closed.connect(self.content_search_dialog.close)
+        self.content_search_dialog.show()
+        self.content_search_dialog.raise_()
+        self.content_search_dialog.query_edit.setFocus()
+
+    def _show_metrics(self):
+        """パフォーマンス計測ダイアログを表示"""
+        if self.metrics_dialog is None:
+            self.metrics_dialog = MetricsDialog(self.controller, self)
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+
+    def _on_trace_toggled(self, checked: bool):
+        """トレースの記録を開始・終了(終了時にJSONに書き出す)"""
+        if checked:
+            tracing.start()
+            self.operation_label.setText("トレースを記録しています...")
+            logger.info("トレースの記録を開始しました")
+            return
+
+        default_name = datetime.now().strftime("leafgit-trace-%Y%m%d-%H%M%S.json")
+        path, _ = QFileDialog.getSaveFileName(
+            self, "トレースを書き出す", default_name, "Chrome Trace (*.json)"
+        )
+        try:
+            count = tracing.stop(path or None)
+        except OSError as e:
+            logger.warning("トレースの書き出しに失敗: %s", e)
+            QMessageBox.warning(self, "エラー", f"書き出しに失敗しました: {e}")
+            return
+        if path:
+            logger.info("トレースを書き出しました(%d件): %s", count, path)
+            self.operation_label.setText(f"✓ トレースを書き出しました: {path}")
+        else:
+            self.operation_label.setText("")
 
     # ==================== ブランチ ====================
 
@@ -903,5 +1597,5 @@ class MainWindow(QMainWindow):
             source_branch = dialog.source_combo.currentText()
             target_branch = dialog.target_combo.currentText()
             result = self.controller.git.merge_branch(source_branch, target_branch)
-            if not result.success:
+            if result is not None and not result.success:
                 QMessageBox.warning(self, "エラー", result.error_message)
@@ -0,0 +1,93 @@
+"""短時間に大量に届く更新を画面の描画間隔ごとにまとめて反映する"""
+
+from typing import List
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QGuiApplication
+
+from models.status import StatusDelta
+
+# 画面のリフレッシュレートが取得できない場合の値(Hz)
+_DEFAULT_REFRESH_RATE = 60.0
+
+
+class UpdateThrottler(QObject):
+    """
+    コマンド履歴への追記とファイル状態の更新を1フレームに1回にまとめる
+
+    ステージングのループやバックグラウンドジョブから結果が連続して届いても、
+    履歴はまとめて1回で追記し、状態の差分は合成して1回だけ反映する。
+    全体の再構築が要求された場合は、それまでの差分は捨てて再構築だけを行う
+    """
+
+    history_ready = Signal(list)  # CommandResult または出力行(str)のリスト
+    status_ready = Signal(object)  # 合成した StatusDelta
+    rebuild_requested = Signal()  # ファイル一覧の再構築
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._history: List[object] = []
+        self._deltas: List[StatusDelta] = []
+        self._rebuild = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self._frame_interval())
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._history or self._deltas or self._rebuild)
+
+    def add_history(self, item):
+        """コマンド履歴に追記する項目(CommandResult または出力行)"""
+        self._history.append(item)
+        self._schedule()
+
+    def add_delta(self, delta: StatusDelta):
+        """ファイル状態の差分"""
+        if not self._rebuild:
+            self._deltas.append(delta)
+        self._schedule()
+
+    def request_rebuild(self):
+        """ファイル一覧の再構築を要求(溜まっている差分は不要になる)"""
+        self._rebuild = True
+        self._deltas = []
+        self._schedule()
+
+    def discard_status(self):
+        """溜まっているファイル状態の更新を捨てる(リポジトリを切り替えた時)"""
+        self._deltas = []
+        self._rebuild = False
+
+    def flush(self):
+        """溜まっている更新をすぐに反映"""
+        self._timer.stop()
+        history, self._history = self._history, []
+        deltas, self._deltas = self._deltas, []
+        rebuild, self._rebuild = self._rebuild, False
+
+        if history:
+            self.history_ready.emit(history)
+        if rebuild:
+            self.rebuild_requested.emit()
+        elif deltas:
+            delta = StatusDelta.combine(deltas)
+            if delta:
+                self.status_ready.emit(delta)
+
+    # ==================== プライベートメソッド ====================
+
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    @staticmethod
+    def _frame_interval() -> int:
+        """1フレームの時間(ミリ秒)"""
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0
+        if rate <= 0:
+            rate = _DEFAULT_REFRESH_RATE
+        return max(1, round(1000 / rate))
@@ -1,5 +1,24 @@
 """ユーティリティモジュール"""
 
-from .logger import setup_logger, get_logger
+from .logger import (
+    setup_logger,
+    get_logger,
+    set_log_level,
+    get_log_level,
+    shutdown_logger,
+    LOG_LEVELS,
+)
+from .paths import get_data_dir
+from . import metrics, tracing
 
-__all__ = ["setup_logger", "get_logger"]
+__all__ = [
+    "setup_logger",
+    "get_logger",
+    "set_log_level",
+    "get_log_level",
+    "shutdown_logger",
+    "LOG_LEVELS",
+    "get_data_dir",
+    "metrics",
+    "tracing",
+]
@@ -1,21 +1,74 @@
 """ロギング設定"""
 
+import atexit
+import json
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
+from .paths import get_log_dir
 
-def setup_logger(name: str = "leafgit", level: int = logging.INFO) -> logging.Logger:
+# ログファイルのローテーション設定
+LOG_FILE_NAME = "leafgit.log"
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# 表示メニューから選べるログレベル
+LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+_listener: Optional[QueueListener] = None
+_log_file: Optional[Path] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1レコードを1行のJSONとして出力するフォーマッタ"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logger(
+    name: str = "leafgit",
+    level: int = logging.INFO,
+    log_file: Optional[str] = None,
+    json_format: bool = False,
+    console: bool = True,
+) -> logging.Logger:
     """
     アプリケーションのロガーを設定
 
+    ロガーにはQueueHandlerのみを付け、ファイル書き込みやコンソール出力は
+    QueueListenerのスレッドで行う(呼び出し側のスレッドをブロックしない)
+
     Args:
         name: ロガーの名前
         level: ログレベル（DEBUG, INFO, WARNING, ERROR, CRITICAL）
+        log_file: ログファイルのパス(省略時はデータディレクトリ配下)
+        json_format: TrueならJSON Lines形式でファイルに出力
+        console: Falseなら標準出力には出さない
 
     Returns:
         logging.Logger: 設定されたロガー
     """
+    global _listener, _log_file
+
     # ルートロガーを設定（全てのloggerに適用される）
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
@@ -24,18 +77,42 @@ def setup_logger(name: str = "leafgit", level: int = logging.INFO) -> logging.Lo
     if root_logger.handlers:
         return logging.getLogger(name)
 
-    # コンソールハンドラ
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-
-    # フォーマット
-    formatter = logging.Formatter(
+    text_formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
-    console_handler.setFormatter(formatter)
 
-    root_logger.addHandler(console_handler)
+    handlers = []
+
+    # ファイルハンドラ(ローテーション)
+    try:
+        _log_file = Path(log_file) if log_file else get_log_dir() / LOG_FILE_NAME
+        file_handler = RotatingFileHandler(
+            _log_file,
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            delay=True,
+        )
+        file_handler.setFormatter(
+            JsonLinesFormatter() if json_format else text_formatter
+        )
+        handlers.append(file_handler)
+    except OSError:
+        _log_file = None
+
+    # コンソールハンドラ(windowedビルドではstdoutが無い)
+    if console and sys.stdout is not None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(text_formatter)
+        handlers.append(console_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logger)
 
     # GitPythonのログを抑制（WARNINGレベル以上のみ表示）
     logging.getLogger("git").setLevel(logging.WARNING)
@@ -46,6 +123,34 @@ def setup_logger(name: str = "leafgit", level: int = logging.INFO) -> logging.Lo
     return logging.getLogger(name)
 
 
+def set_log_level(level: int):
+    """
+    実行中にログレベルを変更
+
+    Args:
+        level: 新しいログレベル
+    """
+    logging.getLogger().setLevel(level)
+
+
+def get_log_level() -> int:
+    """現在のログレベルを取得"""
+    return logging.getLogger().level
+
+
+def get_log_file() -> Optional[Path]:
+    """ログファイルのパスを取得(ファイル出力が無効な場合はNone)"""
+    return _log_file
+
+
+def shutdown_logger():
+    """キューに残ったログを書き出してリスナーを停止"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(name: str = "leafgit") -> logging.Logger:
     """
     既存のロガーを取得
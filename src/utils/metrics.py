@@ -0,0 +1,224 @@
+"""処理時間・回数・キャッシュのヒット率をプロセス内で集計する
+
+どのスレッドから記録してもよい。記録は数マイクロ秒で済むよう、
+処理時間は個々の値を残さず対数目盛りのヒストグラムに数えるだけにしている
+"""
+
+import bisect
+import functools
+import json
+import threading
+import time
+import types
+from contextlib import ContextDecorator
+from typing import Dict, List
+
+from . import tracing
+
+# ヒストグラムの区間の上端(秒)。0.1ミリ秒から約100秒まで、1.25倍ずつ
+_BUCKET_BOUNDS: List[float] = []
+_bound = 0.0001
+while _bound < 100:
+    _BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+del _bound
+
+_lock = threading.Lock()
+_latencies: Dict[str, "LatencyHistogram"] = {}
+_counters: Dict[str, int] = {}
+_caches: Dict[str, List[int]] = {}  # 名前 -> [ヒット数, ミス数]
+_started_at = time.time()
+
+
+class LatencyHistogram:
+    """1つの操作の処理時間の分布"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        q パーセンタイルの値(秒)
+
+        値が入っている区間の上端を返す(最大値を超える場合は最大値)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                bound = _BUCKET_BOUNDS[i] if i < len(_BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            # 空の区間は省き、{区間の上端(秒): 件数} で出力する
+            "histogram": {
+                (str(_BUCKET_BOUNDS[i]) if i < len(_BUCKET_BOUNDS) else "inf"): n
+                for i, n in enumerate(self.counts)
+                if n
+            },
+        }
+
+
+class timed(ContextDecorator):
+    """
+    処理時間を記録する(with文またはデコレータとして使う)
+
+    使用例:
+        with timed("status.refresh"):
+            ...
+
+        @timed("ui.update_file_tree")
+        def _update_file_tree(self): ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        record_latency(self.name, end - self._start)
+        tracing.complete(self.name, _category(self.name), self._start, end)
+        return False
+
+    def _recreate_cm(self):
+        # デコレータとして使う場合、呼び出しごとに開始時刻を分ける
+        return timed(self.name)
+
+
+def record_latency(name: str, seconds: float):
+    """処理時間を記録"""
+    with _lock:
+        histogram = _latencies.get(name)
+        if histogram is None:
+            histogram = _latencies[name] = LatencyHistogram()
+        histogram.add(seconds)
+
+
+def increment(name: str, value: int = 1):
+    """回数を加算"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def record_cache(name: str, hits: int = 0, misses: int = 0):
+    """キャッシュのヒット・ミスを記録"""
+    with _lock:
+        entry = _caches.get(name)
+        if entry is None:
+            entry = _caches[name] = [0, 0]
+        entry[0] += hits
+        entry[1] += misses
+
+
+def instrument_methods(prefix: str):
+    """
+    クラスの公開メソッドすべての処理時間を "<prefix>.<メソッド名>" で記録する
+    クラスデコレータ(プロパティやシグナルは対象外)
+    """
+
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or not isinstance(value, types.FunctionType):
+                continue
+            setattr(cls, attr, _wrap(f"{prefix}.{attr}", value))
+        return cls
+
+    return decorate
+
+
+def _wrap(name: str, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            record_latency(name, end - start)
+            tracing.complete(name, category, start, end)
+
+    category = _category(name)
+    return wrapper
+
+
+def _category(name: str) -> str:
+    """トレースの分類(名前の最初の "." より前)"""
+    return name.split(".", 1)[0]
+
+
+def snapshot() -> dict:
+    """
+    現在の集計結果
+
+    Returns:
+        dict: {'uptime', 'latency': {名前: {...}}, 'counters': {名前: 回数},
+            'caches': {名前: {'hits', 'misses', 'hit_rate'}}}
+    """
+    with _lock:
+        latency = {name: h.to_dict() for name, h in _latencies.items()}
+        counters = dict(_counters)
+        caches = {
+            name: {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            }
+            for name, (hits, misses) in _caches.items()
+        }
+    return {
+        "uptime": time.time() - _started_at,
+        "latency": latency,
+        "counters": counters,
+        "caches": caches,
+    }
+
+
+def export_json(path: str, extra: dict = None):
+    """
+    集計結果をJSONファイルに書き出す(不具合報告用)
+
+    Args:
+        path: 出力先
+        extra: 一緒に書き出す情報(環境、ジョブのキュー等)
+    """
+    data = snapshot()
+    if extra:
+        data.update(extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def reset():
+    """集計結果をすべて消去"""
+    global _started_at
+    with _lock:
+        _latencies.clear()
+        _counters.clear()
+        _caches.clear()
+        _started_at = time.time()
@@ -0,0 +1,37 @@
+"""アプリケーションが使用するディレクトリ"""
+
+import os
+import sys
+from pathlib import Path
+
+
+def get_data_dir() -> Path:
+    """
+    ユーザーごとのデータ保存ディレクトリを取得
+
+    環境変数 LEAFGIT_DATA_DIR が設定されていればそれを優先する
+
+    Returns:
+        Path: 作成済みのディレクトリ
+    """
+    override = os.environ.get("LEAFGIT_DATA_DIR")
+    if override:
+        path = Path(override)
+    elif sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        path = Path(base) / "LeafGit"
+    elif sys.platform == "darwin":
+        path = Path.home() / "Library" / "Application Support" / "LeafGit"
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+        path = Path(base) / "leafgit"
+
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def get_log_dir() -> Path:
+    """ログファイルの保存ディレクトリを取得"""
+    path = get_data_dir() / "logs"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
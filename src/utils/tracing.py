@@ -0,0 +1,268 @@
+"""操作のタイムラインを Chrome trace-event 形式で記録する
+
+「2秒固まった」といった報告の原因を調べるため、コントローラの操作・gitプロセス・
+シグナルの送出・ウィジェットの再構築を、実行したスレッドごとに記録する。
+書き出したJSONは Perfetto (https://ui.perfetto.dev) や chrome://tracing で開ける。
+
+既定では記録しない。記録していない間の呼び出しはフラグを1つ確認するだけで戻る
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from PySide6.QtCore import QObject
+
+# メモリを使い切らないよう、これを超えた分は捨てる(件数だけ数える)
+MAX_EVENTS = 1_000_000
+
+_enabled = False
+_lock = threading.Lock()
+_events: List[dict] = []
+_dropped = 0
+_thread_names: Dict[int, str] = {}
+_origin = time.perf_counter()
+_flow_ids = 0
+
+# シグナルを記録する QObject と、記録中に接続したスロット
+# (Qtを使わないバッチ処理からも import できるよう、PySide6 は使う時に読み込む)
+_watched: "weakref.WeakKeyDictionary[QObject, str]" = weakref.WeakKeyDictionary()
+_connections: List[tuple] = []  # (SignalInstance, スロット)
+
+_NULL_SPAN = nullcontext()
+
+
+def is_enabled() -> bool:
+    """記録中かどうか"""
+    return _enabled
+
+
+def start():
+    """記録を開始(それまでの記録は消去する)"""
+    global _enabled, _dropped, _origin
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
+        _dropped = 0
+        _origin = time.perf_counter()
+        _enabled = True
+    for obj, prefix in list(_watched.items()):
+        _connect_signals(obj, prefix)
+
+
+def stop(path: Optional[str] = None) -> int:
+    """
+    記録を終了
+
+    Args:
+        path: 指定すると記録をJSONファイルに書き出す
+
+    Returns:
+        int: 記録したイベントの数
+    """
+    global _enabled
+    _enabled = False
+    _disconnect_signals()
+    if path is not None:
+        export(path)
+    with _lock:
+        return len(_events)
+
+
+def export(path: str):
+    """記録を Chrome trace-event 形式のJSONファイルに書き出す"""
+    pid = os.getpid()
+    with _lock:
+        events = list(_events)
+        names = dict(_thread_names)
+        dropped = _dropped
+    metadata = [
+        {"ph": "M", "name": "process_name", "pid": pid, "args": {"name": "LeafGit"}}
+    ]
+    for tid, name in names.items():
+        metadata.append(
+            {
+                "ph": "M",
+                "name": "thread_name",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+        )
+    for event in events:
+        event["pid"] = pid
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "traceEvents": metadata + events,
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": dropped},
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+
+# ==================== イベントの記録 ====================
+
+
+def complete(name: str, category: str, start: float, end: float, args: dict = None):
+    """
+    開始から終了までの区間を記録
+
+    Args:
+        start, end: time.perf_counter() の値
+    """
+    if not _enabled:
+        return
+    event = {
+        "ph": "X",
+        "name": name,
+        "cat": category,
+        "ts": (start - _origin) * 1e6,
+        "dur": (end - start) * 1e6,
+    }
+    if args:
+        event["args"] = args
+    _append(event)
+
+
+def instant(name: str, category: str, args: dict = None):
+    """瞬間的な出来事(シグナルの送出等)を記録"""
+    if not _enabled:
+        return
+    event = {
+        "ph": "i",
+        "s": "t",
+        "name": name,
+        "cat": category,
+        "ts": (time.perf_counter() - _origin) * 1e6,
+    }
+    if args:
+        event["args"] = args
+    _append(event)
+
+
+def span(name: str, category: str, args: dict = None):
+    """
+    with文の区間を記録する
+
+    使用例:
+        with tracing.span("git status", "git"):
+            ...
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _span(name, category, args)
+
+
+@contextmanager
+def _span(name: str, category: str, args: Optional[dict]):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        complete(name, category, start_time, time.perf_counter(), args)
+
+
+def flow_start(name: str, category: str) -> Optional[int]:
+    """
+    スレッドをまたぐ処理の起点を記録(ワーカーからGUIスレッドへの通知等)
+
+    Returns:
+        int: flow_end() に渡すID。記録していなければNone
+    """
+    global _flow_ids
+    if not _enabled:
+        return None
+    with _lock:
+        _flow_ids += 1
+        flow_id = _flow_ids
+    _append(_flow_event("s", name, category, flow_id))
+    return flow_id
+
+
+def flow_end(flow_id: Optional[int], name: str, category: str):
+    """flow_start() で記録した起点の行き先を記録"""
+    if flow_id is None or not _enabled:
+        return
+    _append(_flow_event("f", name, category, flow_id))
+
+
+def _flow_event(phase: str, name: str, category: str, flow_id: int) -> dict:
+    event = {
+        "ph": phase,
+        "name": name,
+        "cat": category,
+        "id": flow_id,
+        "ts": (time.perf_counter() - _origin) * 1e6,
+    }
+    if phase == "f":
+        # この時点で実行中の区間(受け取ったコールバック)に結び付ける
+        event["bp"] = "e"
+    return event
+
+
+def _append(event: dict):
+    global _dropped
+    tid = threading.get_ident()
+    event["tid"] = tid
+    with _lock:
+        if len(_events) >= MAX_EVENTS:
+            _dropped += 1
+            return
+        _events.append(event)
+        if tid not in _thread_names:
+            _thread_names[tid] = threading.current_thread().name
+
+
+# ==================== シグナル ====================
+
+
+def watch_signals(obj: "QObject", prefix: str):
+    """
+    QObject のシグナルの送出を "<prefix>.<シグナル名>" で記録する
+
+    スロットを接続するのは記録している間だけなので、記録していない時の負荷はない
+    """
+    _watched[obj] = prefix
+    if _enabled:
+        _connect_signals(obj, prefix)
+
+
+def _connect_signals(obj: "QObject", prefix: str):
+    from PySide6.QtCore import QObject, Qt, Signal
+
+    for attr in dir(type(obj)):
+        if attr.startswith("_") or hasattr(QObject, attr):
+            continue
+        if not isinstance(getattr(type(obj), attr), Signal):
+            continue
+        name = f"{prefix}.{attr}"
+
+        def slot(*args, name=name):
+            instant(name, "signal")
+
+        try:
+            signal = getattr(obj, attr)
+            # 送出したスレッドで記録する
+            signal.connect(slot, Qt.ConnectionType.DirectConnection)
+        except RuntimeError:
+            # 既に破棄されている
+            return
+        _connections.append((signal, slot))
+
+
+def _disconnect_signals():
+    while _connections:
+        signal, slot = _connections.pop()
+        try:
+            signal.disconnect(slot)
+        except (RuntimeError, TypeError):
+            # 送出元が既に破棄されている
+            pass